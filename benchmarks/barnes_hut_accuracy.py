@@ -0,0 +1,80 @@
+"""
+Barnes-Hut accuracy vs speed against the direct sum.
+
+    python -m benchmarks.barnes_hut_accuracy [--bodies 2000 20000 100000]
+        [--theta 0.3 0.5 0.7 1.0] [--sample 1000]
+
+For each body count the reference accelerations of ``--sample`` random
+bodies are computed exactly against all N sources, and the Barnes-Hut
+relative force error |a_bh - a| / |a| is reported as median / 99th
+percentile / max together with the time per force evaluation. The direct
+time is measured when N <= 20000 and extrapolated from the sample otherwise.
+"""
+import argparse
+import time
+
+import numpy as np
+
+from physics.barnes_hut import barnes_hut_accelerations
+from physics.initial import plummer
+from physics.nbody import direct_accelerations
+
+SOFTENING = 0.01
+
+
+def reference(positions, masses, targets):
+    """Exact accelerations of ``targets`` from all bodies (chunked, vectorised)."""
+    eps2 = SOFTENING * SOFTENING
+    out = np.empty((targets.size, 3))
+    for start in range(0, targets.size, 64):
+        idx = targets[start : start + 64]
+        d = positions[None, :, :] - positions[idx, None, :]
+        r2 = np.einsum("ijk,ijk->ij", d, d) + eps2
+        w = masses[None, :] / (r2 * np.sqrt(r2))
+        w[np.arange(idx.size), idx] = 0.0
+        out[start : start + 64] = np.einsum("ij,ijk->ik", w, d)
+    return out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bodies", type=int, nargs="+", default=[2000, 20000, 100000])
+    parser.add_argument("--theta", type=float, nargs="+", default=[0.3, 0.5, 0.7, 1.0])
+    parser.add_argument("--sample", type=int, default=1000)
+    args = parser.parse_args()
+
+    print(f"{'bodies':>8} {'theta':>6} {'median':>9} {'p99':>9} {'max':>9} {'time s':>8} {'speedup':>8}")
+    for n in args.bodies:
+        rng = np.random.default_rng(0)
+        state = plummer(n, rng)
+        targets = rng.choice(n, size=min(args.sample, n), replace=False)
+
+        started = time.perf_counter()
+        exact = reference(state.positions, state.masses, targets)
+        sample_time = time.perf_counter() - started
+        if n <= 20000:
+            started = time.perf_counter()
+            direct_accelerations(state.positions, state.masses, softening=SOFTENING)
+            direct_time = time.perf_counter() - started
+            label = "direct"
+        else:
+            direct_time = sample_time * n / targets.size
+            label = "direct (est.)"
+        print(f"{n:>8} {label:>6} {'':>9} {'':>9} {'':>9} {direct_time:>8.3f} {1.0:>8.2f}")
+
+        norm = np.linalg.norm(exact, axis=1)
+        for theta in args.theta:
+            started = time.perf_counter()
+            approx = barnes_hut_accelerations(
+                state.positions, state.masses, softening=SOFTENING, theta=theta
+            )
+            elapsed = time.perf_counter() - started
+            err = np.linalg.norm(approx[targets] - exact, axis=1) / norm
+            print(
+                f"{n:>8} {theta:>6.2f} {np.median(err):>9.2e} {np.percentile(err, 99):>9.2e}"
+                f" {err.max():>9.2e} {elapsed:>8.3f} {direct_time / elapsed:>8.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
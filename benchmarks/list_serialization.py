@@ -0,0 +1,150 @@
+"""
+Per-request cost of the list endpoints at page size 100.
+
+    python -m benchmarks.list_serialization [--rows 1000] [--requests 300]
+
+Seeds a scratch SQLite database, disables the response cache and calls each
+list endpoint in-process (httpx ``ASGITransport``, no network) so the
+numbers are dominated by query, row hydration and JSON serialization.
+Reports mean / p50 / p99 milliseconds per request.
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+
+def _configure(directory: str) -> None:
+    # 모듈이 import 시점에 환경 변수를 읽으므로 앱을 import 하기 전에 설정
+    os.environ.update(
+        DB_MODE="async",
+        DATABASE_URL=f"sqlite:///{directory}/bench.db",
+        RESPONSE_CACHE_BYTES="0",
+        JOB_WORKER="off",
+    )
+
+
+def _seed(rows: int) -> dict:
+    from datetime import datetime, timedelta
+
+    from sqlalchemy import insert
+
+    import database
+    from database import Base, SessionLocal, engine
+    from models.article import Article
+    from models.simulation_like import Simulation
+    from models.simulation_run import SimulationRun
+    from models.user import User
+    from schemas.simulation import SimulationParams
+    from utils.security import create_access_token
+
+    database.engine.echo = False
+    database.async_engine.echo = False
+    Base.metadata.create_all(bind=engine)
+    now = datetime.utcnow()
+    params = SimulationParams(n_bodies=1000, method="barnes_hut").model_dump()
+    with SessionLocal() as db:
+        user = User(username="bench", email="bench@x.com", created_at=now)
+        db.add(user)
+        db.flush()
+        db.execute(
+            insert(Article),
+            [
+                {
+                    "title": f"article {i}",
+                    "content": "lorem ipsum dolor sit amet " * 40,
+                    "is_public": True,
+                    "author_id": user.id,
+                    "created_at": now - timedelta(seconds=i),
+                    "updated_at": now - timedelta(seconds=i),
+                }
+                for i in range(rows)
+            ],
+        )
+        db.execute(
+            insert(Simulation),
+            [
+                {
+                    "title": f"simulation {i}",
+                    "params": params,
+                    "is_public": True,
+                    "owner_id": user.id,
+                    "like_count": i % 50,
+                    "created_at": now - timedelta(seconds=i),
+                    "updated_at": now - timedelta(seconds=i),
+                }
+                for i in range(rows)
+            ],
+        )
+        db.execute(
+            insert(SimulationRun),
+            [
+                {
+                    "simulation_id": 1,
+                    "user_id": user.id,
+                    "status": "succeeded",
+                    "params": params,
+                    "params_hash": "0" * 64,
+                    "progress": 1.0,
+                    "steps_done": 1000,
+                    "result": {"steps": 1000, "energy_error": 1e-6},
+                    "created_at": now,
+                    "started_at": now,
+                    "finished_at": now,
+                }
+                for _ in range(rows)
+            ],
+        )
+        db.commit()
+        return {"Authorization": f"Bearer {create_access_token({'sub': str(user.id)})}"}
+
+
+ENDPOINTS = [
+    ("articles", "/api/articles/", {"size": 100}, False),
+    ("simulations", "/api/simulations/", {"size": 100}, False),
+    ("simulations likes", "/api/simulations/", {"size": 100, "sort": "likes"}, False),
+    ("runs", "/api/simulations/1/runs", {"size": 100}, True),
+]
+
+
+async def _bench(headers: dict, requests: int) -> None:
+    import httpx
+    import numpy as np
+
+    import main
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        print(f"{'endpoint':>18} {'mean':>8} {'p50':>8} {'p99':>8} {'bytes':>8}")
+        for name, path, query, auth in ENDPOINTS:
+            kwargs = {"params": query, "headers": headers if auth else {}}
+            for _ in range(20):
+                response = await client.get(path, **kwargs)
+                response.raise_for_status()
+            latencies = []
+            for _ in range(requests):
+                started = time.perf_counter()
+                response = await client.get(path, **kwargs)
+                latencies.append(time.perf_counter() - started)
+            ms = np.array(latencies) * 1000.0
+            print(
+                f"{name:>18} {ms.mean():>7.2f}ms {np.percentile(ms, 50):>7.2f}ms"
+                f" {np.percentile(ms, 99):>7.2f}ms {len(response.content):>8}"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=300)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        _configure(directory)
+        headers = _seed(args.rows)
+        asyncio.run(_bench(headers, args.requests))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+list_simulations latency while a burst of logins is being verified.
+
+    python -m benchmarks.login_burst [--logins 200] [--concurrency 50]
+        [--requests 300] [--rounds 12]
+
+Starts the API with uvicorn on a scratch SQLite database once per password
+pool setup and measures ``GET /api/simulations/`` p50/p99, first idle and
+then while ``--concurrency`` clients keep logging in:
+
+* ``threadpool``: bcrypt on 40 threads in the API process (the old
+  ``run_in_threadpool`` behaviour)
+* ``process``: the dedicated, lower-priority process pool
+"""
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+import numpy as np
+
+SETUPS = {
+    "threadpool": {"PASSWORD_POOL": "thread", "PASSWORD_POOL_WORKERS": "40"},
+    "process": {"PASSWORD_POOL": "process"},
+}
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _start_server(env: dict, port: int) -> subprocess.Popen:
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        env={**os.environ, **env},
+        stdout=subprocess.DEVNULL,
+    )
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/", timeout=1)
+            return proc
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError("server did not start")
+
+
+async def _measure(client: httpx.AsyncClient, count: int) -> np.ndarray:
+    latencies = []
+    for _ in range(count):
+        started = time.perf_counter()
+        response = await client.get("/api/simulations/")
+        latencies.append(time.perf_counter() - started)
+        response.raise_for_status()
+        await asyncio.sleep(0.005)
+    return np.array(latencies) * 1000.0
+
+
+async def _login_loop(client: httpx.AsyncClient, remaining: list, stop: asyncio.Event) -> None:
+    while not stop.is_set() and remaining[0] > 0:
+        remaining[0] -= 1
+        await client.post("/api/auth/login", json={"email": "bench@x.com", "password": "secret1"})
+
+
+async def _scenario(base_url: str, args) -> dict:
+    limits = httpx.Limits(max_connections=args.concurrency + 10)
+    async with httpx.AsyncClient(base_url=base_url, timeout=120, limits=limits) as client:
+        response = await client.post(
+            "/api/auth/register",
+            json={
+                "user_in": {"username": "bench", "email": "bench@x.com", "created_at": "2024-01-01T00:00:00"},
+                "password": "secret1",
+            },
+        )
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        for i in range(20):
+            await client.post(
+                "/api/simulations/",
+                json={"title": f"s{i}", "params": {"n_bodies": 2}, "is_public": True},
+                headers=headers,
+            )
+
+        idle = await _measure(client, args.requests)
+
+        stop = asyncio.Event()
+        remaining = [args.logins]
+        started = time.perf_counter()
+        logins = [
+            asyncio.create_task(_login_loop(client, remaining, stop)) for _ in range(args.concurrency)
+        ]
+        busy = await _measure(client, args.requests)
+        stop.set()
+        await asyncio.gather(*logins)
+        login_rate = (args.logins - remaining[0]) / (time.perf_counter() - started)
+
+    return {"idle": idle, "burst": busy, "login_rate": login_rate}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--rounds", type=int, default=12)
+    args = parser.parse_args()
+
+    print(f"{'setup':>11} {'idle p50':>9} {'idle p99':>9} {'burst p50':>10} {'burst p99':>10} {'logins/s':>9}")
+    for name, setup in SETUPS.items():
+        with tempfile.TemporaryDirectory() as tmp:
+            env = {
+                **setup,
+                "BCRYPT_ROUNDS": str(args.rounds),
+                "DB_MODE": "async",
+                "DB_CREATE_ALL": "true",
+                "DATABASE_URL": f"sqlite:///{tmp}/bench.db",
+                "JOB_WORKER": "off",
+            }
+            port = _free_port()
+            proc = _start_server(env, port)
+            try:
+                result = asyncio.run(_scenario(f"http://127.0.0.1:{port}", args))
+            finally:
+                proc.terminate()
+                proc.wait()
+        idle, burst = result["idle"], result["burst"]
+        print(
+            f"{name:>11} {np.percentile(idle, 50):>8.1f}ms {np.percentile(idle, 99):>8.1f}ms"
+            f" {np.percentile(burst, 50):>9.1f}ms {np.percentile(burst, 99):>9.1f}ms"
+            f" {result['login_rate']:>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
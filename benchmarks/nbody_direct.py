@@ -0,0 +1,41 @@
+"""
+Direct-sum N-body throughput.
+
+    python -m benchmarks.nbody_direct [--bodies 1000 10000] [--steps 5]
+
+Reports leapfrog steps/second (one force evaluation per step) for a Plummer
+sphere at each body count.
+"""
+import argparse
+import time
+
+from physics import acceleration_for, initial_state, leapfrog
+from schemas.simulation import SimulationParams
+
+
+def bench(n_bodies: int, steps: int) -> float:
+    params = SimulationParams(n_bodies=n_bodies, steps=steps, dt=0.001, softening=0.01)
+    state = initial_state(params)
+    accel = acceleration_for(params)
+    state.accelerations = accel(state.positions, state.masses)
+
+    started = time.perf_counter()
+    for _ in leapfrog(state, accel, params.dt, steps, output_stride=steps):
+        pass
+    return steps / (time.perf_counter() - started)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bodies", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--steps", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'bodies':>8} {'steps/s':>10} {'pairs/s':>12}")
+    for n in args.bodies:
+        rate = bench(n, args.steps)
+        print(f"{n:>8} {rate:>10.2f} {rate * n * n:>12.3e}")
+
+
+if __name__ == "__main__":
+    main()
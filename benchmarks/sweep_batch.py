@@ -0,0 +1,48 @@
+"""
+Batched parameter sweep vs running each scene on its own.
+
+    python -m benchmarks.sweep_batch [--scenes 16 64 256] [--bodies 2 16 64]
+        [--steps 200]
+
+Each sweep varies ``G`` over ``--scenes`` values of a Plummer scene. Reports
+scenes/second for ``physics.batch.run_batch`` and for a loop over
+``physics.run``, plus the speedup.
+"""
+import argparse
+import time
+
+from physics import run
+from physics.batch import expand_sweep, run_batch
+from schemas.simulation import SimulationParams, SweepRange
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scenes", type=int, nargs="+", default=[16, 64, 256])
+    parser.add_argument("--bodies", type=int, nargs="+", default=[2, 16, 64])
+    parser.add_argument("--steps", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'scenes':>7} {'bodies':>7} {'batch sc/s':>11} {'loop sc/s':>10} {'speedup':>8}")
+    for n in args.bodies:
+        base = SimulationParams(n_bodies=n, steps=args.steps, output_stride=args.steps)
+        for count in args.scenes:
+            scenes, _ = expand_sweep(base, {"G": SweepRange(start=0.5, stop=2.0, num=count)})
+
+            started = time.perf_counter()
+            run_batch(scenes)
+            batch = time.perf_counter() - started
+
+            started = time.perf_counter()
+            for params in scenes:
+                run(params)
+            loop = time.perf_counter() - started
+
+            print(
+                f"{count:>7} {n:>7} {count / batch:>11.1f} {count / loop:>10.1f}"
+                f" {loop / batch:>8.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,169 @@
-import os
-from sqlalchemy import create_engine
+from typing import Literal, Optional
+
+from pydantic import Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import QueuePool
 
-DB_USER = os.getenv("DB_USER", "root")
-DB_PASS = os.getenv("DB_PASS", "")
-DB_HOST = os.getenv("DB_HOST", "db")
-DB_PORT = os.getenv("DB_PORT", "3306")
-DB_NAME = os.getenv("DB_NAME", "gravity_db")
+from utils.metrics import instrument_engine, timed_pool_class
 
-DATABASE_URL = (
-    f"mysql+pymysql://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
-)
 
-engine = create_engine(
-    DATABASE_URL,
-    echo=True,
-    pool_pre_ping=True,
-)
+class DatabaseSettings(BaseSettings):
+    """
+    Connection and pool settings from ``DB_*`` environment variables.
+
+    Pool limits are per engine per process: every uvicorn worker and every
+    job worker opens up to ``pool_size + max_overflow`` connections.
+    """
+
+    model_config = SettingsConfigDict(env_prefix="DB_", extra="ignore")
+
+    user: str = "root"
+    password: str = Field("", validation_alias="DB_PASS")
+    host: str = "db"
+    port: int = 3306
+    name: str = "gravity_db"
+    # "async": aiomysql/aiosqlite 로 이벤트 루프에서 바로 처리
+    # "sync": 기존 pymysql 세션을 threadpool 에서 실행 (벤치마크 비교용)
+    mode: Literal["async", "sync"] = "async"
+    # 로컬에서는 DATABASE_URL=sqlite:///./gravity.db 처럼 덮어쓸 수 있음
+    database_url: Optional[str] = Field(None, validation_alias="DATABASE_URL")
+    async_database_url: Optional[str] = Field(None, validation_alias="ASYNC_DATABASE_URL")
+    # 읽기 전용 replica (없으면 모든 읽기가 primary). 로컬에서는 SQLite 파일 하나를 더 두고 테스트
+    replica_url: Optional[str] = Field(None, validation_alias="DATABASE_REPLICA_URL")
+    async_replica_url: Optional[str] = Field(None, validation_alias="ASYNC_DATABASE_REPLICA_URL")
+    # 쓰기 뒤 이 시간(초) 동안 그 토큰의 읽기는 primary 로 (replica 복제 지연보다 길게)
+    replica_sticky_seconds: float = Field(5.0, ge=0)
+    # replica 연결 실패 뒤 이 시간(초) 동안 primary 로 읽고 다시 시도
+    replica_retry_seconds: float = Field(10.0, gt=0)
+
+    pool_size: int = Field(5, ge=1)
+    max_overflow: int = Field(10, ge=0)
+    # 연결을 못 받으면 이 시간(초) 뒤 TimeoutError
+    pool_timeout: float = Field(10.0, gt=0)
+    # 서버 wait_timeout(MySQL 기본 8시간)/프록시 idle timeout 보다 짧게: 오래된 연결은 checkout 때 새로 연결
+    pool_recycle: int = 1800
+    # checkout 마다 ping 하는 대신 recycle + 끊김 오류 시 pool 무효화로 처리. 불안정한 네트워크에서만 켠다
+    pool_pre_ping: bool = False
+    pool_use_lifo: bool = False
+    connect_timeout: int = Field(5, ge=1)
+    # 모든 SQL 출력은 디버깅용. 평소에는 utils/metrics.py 의 느린 쿼리 로그를 본다
+    sql_echo: bool = Field(False, validation_alias="SQL_ECHO")
+
+    @property
+    def url(self) -> str:
+        return self.database_url or (
+            f"mysql+pymysql://{self.user}:{self.password}@{self.host}:{self.port}/{self.name}"
+        )
+
+
+_ASYNC_DRIVERS = {
+    "mysql": "mysql+aiomysql",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def to_async_url(url: str) -> str:
+    """Swap the sync DBAPI driver in ``url`` for its asyncio counterpart."""
+    parsed = make_url(url)
+    drivername = _ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if drivername is None:
+        raise ValueError(f"No async driver configured for {parsed.drivername!r}")
+    return parsed.set(drivername=drivername).render_as_string(hide_password=False)
+
+
+_READ_ONLY_STATEMENTS = {
+    "mysql": "SET SESSION TRANSACTION READ ONLY",
+    "sqlite": "PRAGMA query_only = ON",
+}
+
+
+def create_db_engine(
+    url: str, settings: DatabaseSettings, label: str, is_async: bool = False, read_only: bool = False
+):
+    """
+    Engine for ``url`` with the pool configured from ``settings``.
+
+    ``label`` names the pool in ``/metrics``. A connection that fails with a
+    disconnect error is invalidated together with every older connection
+    in the pool, so a database restart costs one failed statement per
+    worker instead of a ping on every checkout. ``read_only`` connections
+    reject writes, so a replica session cannot be used to modify data.
+    SQLite connections enforce foreign keys like MySQL does.
+    """
+    parsed = make_url(url)
+    # dialect 기본 pool (MySQL/SQLite 파일: QueuePool, async 는 AsyncAdaptedQueuePool, SQLite 메모리: 단일 연결)
+    pool_class = parsed.get_dialect().get_pool_class(parsed)
+    options = {
+        "echo": settings.sql_echo,
+        "poolclass": timed_pool_class(pool_class, label),
+        "pool_pre_ping": settings.pool_pre_ping,
+        "pool_recycle": settings.pool_recycle,
+    }
+    if issubclass(pool_class, QueuePool):
+        options.update(
+            pool_size=settings.pool_size,
+            max_overflow=settings.max_overflow,
+            pool_timeout=settings.pool_timeout,
+            pool_use_lifo=settings.pool_use_lifo,
+        )
+    if parsed.get_backend_name() == "mysql":
+        options["connect_args"] = {"connect_timeout": settings.connect_timeout}
+
+    engine = (create_async_engine if is_async else create_engine)(url, **options)
+    statements = []
+    if parsed.get_backend_name() == "sqlite":
+        # SQLite 는 연결마다 켜야 외래 키(ON DELETE CASCADE)가 동작한다
+        statements.append("PRAGMA foreign_keys = ON")
+    if read_only:
+        statements.append(_READ_ONLY_STATEMENTS[parsed.get_backend_name()])
+    if statements:
+
+        @event.listens_for(engine.sync_engine if is_async else engine, "connect")
+        def _on_connect(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            for statement in statements:
+                cursor.execute(statement)
+            cursor.close()
+
+    instrument_engine(engine, label)
+    return engine
+
+
+settings = DatabaseSettings()
+
+DB_MODE = settings.mode
+DATABASE_URL = settings.url
+ASYNC_DATABASE_URL = settings.async_database_url or to_async_url(DATABASE_URL)
+
+engine = create_db_engine(DATABASE_URL, settings, "sync")
+async_engine = create_db_engine(ASYNC_DATABASE_URL, settings, "async", is_async=True)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-Base = declarative_base()
\ No newline at end of file
+# commit 뒤에 속성이 만료되면 직렬화 중 lazy load(=암묵적 IO)가 일어나므로 끈다
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False
+)
+
+# replica 가 없으면 None: utils/dependencies.get_read_db 가 primary 로 읽는다
+replica_engine = async_replica_engine = None
+ReplicaSessionLocal = AsyncReplicaSessionLocal = None
+if settings.replica_url:
+    replica_engine = create_db_engine(settings.replica_url, settings, "replica-sync", read_only=True)
+    async_replica_engine = create_db_engine(
+        settings.async_replica_url or to_async_url(settings.replica_url),
+        settings,
+        "replica-async",
+        is_async=True,
+        read_only=True,
+    )
+    ReplicaSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=replica_engine)
+    AsyncReplicaSessionLocal = async_sessionmaker(
+        bind=async_replica_engine, autoflush=False, expire_on_commit=False
+    )
+
+Base = declarative_base()
@@ -0,0 +1,22 @@
+from .queue import (
+    ACTIVE_STATUSES,
+    CANCELLED,
+    FAILED,
+    FINISHED_STATUSES,
+    QUEUED,
+    RUNNING,
+    SUCCEEDED,
+)
+from .worker import JobWorker, execute_run
+
+__all__ = [
+    "ACTIVE_STATUSES",
+    "CANCELLED",
+    "FAILED",
+    "FINISHED_STATUSES",
+    "JobWorker",
+    "QUEUED",
+    "RUNNING",
+    "SUCCEEDED",
+    "execute_run",
+]
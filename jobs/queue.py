@@ -0,0 +1,135 @@
+import os
+from datetime import datetime, timedelta
+
+from sqlalchemy import case, func, select, update
+
+from models.simulation_run import SimulationRun
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+ACTIVE_STATUSES = (QUEUED, RUNNING)
+FINISHED_STATUSES = (SUCCEEDED, FAILED, CANCELLED)
+
+# 유저별 제한: 대기+실행 중인 작업 수 / 동시에 실행되는 작업 수
+MAX_ACTIVE_RUNS_PER_USER = int(os.getenv("MAX_ACTIVE_RUNS_PER_USER", "5"))
+MAX_RUNNING_RUNS_PER_USER = int(os.getenv("MAX_RUNNING_RUNS_PER_USER", "2"))
+# 이 시간 동안 heartbeat 가 없는 running 작업은 worker 가 죽은 것으로 보고 다시 대기열로
+JOB_STALE_SECONDS = int(os.getenv("JOB_STALE_SECONDS", "120"))
+
+# 아래 함수들은 statement 만 만들어서 sync Session / AsyncSession 양쪽에서 그대로 실행한다
+
+
+def active_run_count(user_id: int):
+    return select(func.count(SimulationRun.id)).where(
+        SimulationRun.user_id == user_id, SimulationRun.status.in_(ACTIVE_STATUSES)
+    )
+
+
+def claim_run(run_id: int, worker: str):
+    """Conditional UPDATE queued -> running; rowcount 1 means this worker owns the run."""
+    now = datetime.utcnow()
+    return (
+        update(SimulationRun)
+        .where(SimulationRun.id == run_id, SimulationRun.status == QUEUED)
+        .values(status=RUNNING, worker=worker, started_at=now, heartbeat_at=now)
+        .execution_options(synchronize_session=False)
+    )
+
+
+# 진행/완료 기록은 heartbeat 처럼 지금 작업을 가진 worker 만 (requeue 뒤 늦게 온 이전 worker 가 덮어쓰지 않도록)
+# rowcount 0 이면 작업이 다른 worker 에게 넘어갔거나 지워진 것
+
+
+def report_progress(run_id: int, steps_done: int, total_steps: int, worker: str):
+    return (
+        update(SimulationRun)
+        .where(SimulationRun.id == run_id, SimulationRun.worker == worker)
+        .values(steps_done=steps_done, progress=steps_done / total_steps)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def resumed_from(run_id: int, step: int, total_steps: int, worker: str):
+    return (
+        update(SimulationRun)
+        .where(SimulationRun.id == run_id, SimulationRun.worker == worker)
+        .values(resumed_from_step=step, steps_done=step, progress=step / total_steps)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def heartbeat(run_ids, worker: str):
+    return (
+        update(SimulationRun)
+        .where(SimulationRun.id.in_(run_ids), SimulationRun.worker == worker)
+        .values(heartbeat_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+
+
+def finish_run(run_id: int, status: str, worker: str, result=None, error=None):
+    return (
+        update(SimulationRun)
+        .where(
+            SimulationRun.id == run_id,
+            SimulationRun.status == RUNNING,
+            SimulationRun.worker == worker,
+        )
+        .values(status=status, result=result, error=error, finished_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+
+
+def cancel_queued(run_id: int):
+    """Cancel a run that no worker has claimed yet (takes effect immediately)."""
+    return (
+        update(SimulationRun)
+        .where(SimulationRun.id == run_id, SimulationRun.status == QUEUED)
+        .values(status=CANCELLED, cancel_requested=True, finished_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+
+
+def request_cancel(run_id: int):
+    """Flag a running run; the worker stops at its next output frame."""
+    return (
+        update(SimulationRun)
+        .where(SimulationRun.id == run_id, SimulationRun.status == RUNNING)
+        .values(cancel_requested=True)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def requeue_stale(exclude_worker: str):
+    cutoff = datetime.utcnow() - timedelta(seconds=JOB_STALE_SECONDS)
+    return (
+        update(SimulationRun)
+        .where(
+            SimulationRun.status == RUNNING,
+            SimulationRun.heartbeat_at < cutoff,
+            SimulationRun.worker != exclude_worker,
+        )
+        .values(
+            # 취소 요청이 들어와 있던 작업은 다시 돌리지 않고 취소로 마무리
+            status=case((SimulationRun.cancel_requested.is_(True), CANCELLED), else_=QUEUED),
+            worker=None,
+            started_at=None,
+            progress=0.0,
+            steps_done=0,
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+def resume_totals():
+    """Finished worker runs: count, resumed count, steps computed, steps skipped by resuming."""
+    return select(
+        func.count(SimulationRun.id),
+        func.count(SimulationRun.id).filter(SimulationRun.resumed_from_step > 0),
+        func.coalesce(func.sum(SimulationRun.steps_done - SimulationRun.resumed_from_step), 0),
+        func.coalesce(func.sum(SimulationRun.resumed_from_step), 0),
+    ).where(SimulationRun.status == SUCCEEDED, SimulationRun.cached.is_(False))
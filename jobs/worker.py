@@ -0,0 +1,401 @@
+"""
+Simulation job worker.
+
+    python -m jobs.worker [--processes 4] [--poll-interval 1.0]
+
+A dispatcher thread polls ``simulation_runs`` for queued rows, claims them
+with a conditional UPDATE (so several workers can share one queue table)
+and executes each claimed run in a ``ProcessPoolExecutor``. The same
+worker can be embedded in the API process with ``JOB_WORKER=embedded``
+for local development against SQLite. Every ``TRENDING_REFRESH_SECONDS``
+it also refreshes the ``sort=trending`` ranking (``utils.trending``).
+"""
+import argparse
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Dict, Optional
+
+import numpy as np
+from sqlalchemy import func, select
+
+from database import SessionLocal, engine
+from jobs.queue import (
+    CANCELLED,
+    FAILED,
+    MAX_RUNNING_RUNS_PER_USER,
+    QUEUED,
+    RUNNING,
+    SUCCEEDED,
+    claim_run,
+    finish_run,
+    heartbeat,
+    report_progress,
+    requeue_stale,
+    resumed_from,
+)
+from models.simulation_run import SimulationRun
+from physics import initial_state, run as run_nbody, total_energy
+from schemas.simulation import SimulationParams
+from utils.checkpoints import CHECKPOINT_INTERVAL_SECONDS, latest_checkpoint, save_checkpoint
+from utils.result_cache import result_cache, trajectory_key
+from utils.streaming import (
+    FLAG_ABORTED,
+    FLAG_FINAL,
+    LIVE_MAX_FPS,
+    encode_frame,
+    publish_live_frame,
+    remove_live_frame,
+)
+from utils.trajectory import (
+    FIELDS,
+    TRAJECTORY_MAX_BYTES,
+    TrajectoryReader,
+    TrajectoryWriter,
+    estimated_bytes,
+    frame_count,
+    trajectory_path,
+)
+from utils.trending import TRENDING_REFRESH_SECONDS, refresh_trending
+
+logger = logging.getLogger(__name__)
+
+JOB_PROCESSES = int(os.getenv("JOB_PROCESSES", str(os.cpu_count() or 1)))
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "1.0"))
+# 진행률 UPDATE 최소 간격 (frame 마다 쓰면 DB 가 병목)
+PROGRESS_INTERVAL = 0.5
+# 이보다 큰 실행은 최종 위치/속도를 결과에 넣지 않는다 (요약만 저장)
+RESULT_STATE_MAX_BODIES = 5000
+# 끝난 실행의 live frame 파일을 지우기 전 대기 시간 (시청자가 마지막 frame 을 받을 시간)
+LIVE_LINGER_SECONDS = 10.0
+
+
+class RunCancelled(Exception):
+    pass
+
+
+class RunLost(Exception):
+    """The run was requeued to another worker (or deleted) while this one computed it."""
+
+
+def _init_pool_process() -> None:
+    # fork 로 물려받은 커넥션을 부모와 공유하지 않도록 풀만 버린다
+    engine.dispose(close=False)
+
+
+def _resume_point(params: SimulationParams, key: str, record: bool):
+    """
+    Latest usable checkpoint for ``params``: (state, meta, source trajectory
+    path, frame indices to copy), or ``None`` to start from t=0.
+
+    When frames are recorded, the frames up to the checkpoint must come from
+    the trajectory of the run that wrote it (finished file, or the synced
+    partial file of a crashed attempt). If that file lacks any of them, for
+    example because the output stride got finer, resuming would leave a gap,
+    so the run starts over instead.
+    """
+    found = latest_checkpoint(key, params.steps)
+    if found is None:
+        return None
+    state, meta = found
+    if not record:
+        return state, meta, None, None
+
+    stride, last = params.output_stride, state.step
+    for source in (trajectory_path(meta["params_hash"]), meta.get("partial")):
+        if not source or not os.path.exists(source):
+            continue
+        try:
+            reader = TrajectoryReader(source)
+        except (OSError, ValueError):
+            continue
+        steps = np.asarray(reader.steps)
+        wanted = (steps <= last) & ((steps % stride == 0) | (steps == params.steps))
+        expected = last // stride + 1 + (1 if last == params.steps and last % stride else 0)
+        if wanted.sum() == expected:
+            return state, meta, source, np.flatnonzero(wanted)
+    return None
+
+
+def execute_run(run_id: int, worker: str) -> str:
+    """Execute one claimed run inside a pool process and persist its outcome."""
+    db = SessionLocal()
+    try:
+        raw_params, params_hash = db.execute(
+            select(SimulationRun.params, SimulationRun.params_hash).where(
+                SimulationRun.id == run_id
+            )
+        ).one()
+        params = SimulationParams.model_validate(raw_params)
+        db.commit()
+        key = trajectory_key(params)
+        max_frames = frame_count(params.steps, params.output_stride)
+        # 너무 큰 trajectory 는 저장하지 않고 요약 결과만 남긴다
+        record = estimated_bytes(params.n_bodies, max_frames) <= TRAJECTORY_MAX_BYTES
+
+        resume = _resume_point(params, key, record)
+        if resume is not None:
+            state, meta, source, copy_frames = resume
+            energy_start = meta["energy_start"]
+            db.execute(resumed_from(run_id, state.step, params.steps, worker))
+            db.commit()
+        else:
+            state, source, copy_frames = initial_state(params), None, None
+            energy_start = total_energy(state, params)
+
+        writer = None
+        if record:
+            path = trajectory_path(params_hash)
+            writer = TrajectoryWriter(
+                path,
+                state.masses,
+                max_frames,
+                meta={"params_hash": params_hash, "dt": params.dt},
+                tmp_path=f"{path}.{run_id}.{uuid.uuid4().hex[:8]}.partial",
+            )
+            if source is not None:
+                reader = TrajectoryReader(source)
+                for block in range(0, copy_frames.size, 64):
+                    frames = copy_frames[block : block + 64]
+                    data = reader.read(range(frames[0], frames[-1] + 1), FIELDS)
+                    for frame in frames:
+                        row = data[frame - frames[0]]
+                        writer.append(
+                            int(reader.steps[frame]), float(reader.times[frame]), row[0], row[1]
+                        )
+
+        last_report = last_live = last_checkpoint = time.monotonic()
+        frame_index = 0 if writer is None else len(writer.steps)
+
+        def on_frame(state) -> None:
+            nonlocal last_report, last_live, last_checkpoint, frame_index
+            now = time.monotonic()
+            final = state.step == params.steps
+            if final or now - last_live >= 1.0 / LIVE_MAX_FPS:
+                last_live = now
+                publish_live_frame(
+                    run_id,
+                    encode_frame(
+                        frame_index,
+                        state.step,
+                        state.time,
+                        state.positions,
+                        flags=FLAG_FINAL if final else 0,
+                    ),
+                )
+            frame_index += 1
+            if writer is not None:
+                writer.append(state.step, state.time, state.positions, state.velocities)
+            # 주기적으로, 그리고 마지막 스텝에서 (연장 실행이 이어 받도록) 체크포인트
+            if state.step > 0 and (final or now - last_checkpoint >= CHECKPOINT_INTERVAL_SECONDS):
+                last_checkpoint = now
+                if writer is not None:
+                    writer.sync()
+                save_checkpoint(
+                    key,
+                    state,
+                    {
+                        "energy_start": energy_start,
+                        "params_hash": params_hash,
+                        "output_stride": params.output_stride,
+                        "partial": None if writer is None else writer.tmp_path,
+                    },
+                )
+            if now - last_report < PROGRESS_INTERVAL:
+                return
+            last_report = now
+            if db.execute(report_progress(run_id, state.step, params.steps, worker)).rowcount == 0:
+                # heartbeat 가 늦어 다른 worker 에게 넘어갔거나 실행 기록이 지워짐 (계정 삭제 등)
+                db.commit()
+                raise RunLost()
+            cancel = db.scalar(
+                select(SimulationRun.cancel_requested).where(SimulationRun.id == run_id)
+            )
+            db.commit()
+            if cancel:
+                raise RunCancelled()
+
+        try:
+            if resume is None:
+                on_frame(state)
+            result = run_nbody(params, on_frame=on_frame, start=state, energy_start=energy_start)
+            if writer is not None:
+                writer.close()
+        except RunCancelled:
+            if writer is not None:
+                writer.abort()
+            publish_live_frame(run_id, encode_frame(frame_index, 0, 0.0, None, FLAG_ABORTED))
+            db.rollback()
+            db.execute(finish_run(run_id, CANCELLED, worker))
+            db.commit()
+            return CANCELLED
+        except RunLost:
+            # 새 worker 가 같은 run_id 로 live frame 을 내보내므로 중단 frame 은 보내지 않는다
+            logger.warning("run %s: no longer owned by %s, stopping", run_id, worker)
+            if writer is not None:
+                writer.abort()
+            db.rollback()
+            return QUEUED
+        except Exception as e:
+            logger.exception("run %s failed", run_id)
+            if writer is not None:
+                writer.abort()
+            publish_live_frame(run_id, encode_frame(frame_index, 0, 0.0, None, FLAG_ABORTED))
+            db.rollback()
+            db.execute(finish_run(run_id, FAILED, worker, error=f"{type(e).__name__}: {e}"))
+            db.commit()
+            return FAILED
+
+        # 죽은 이전 시도의 partial 파일은 이어 받았으니 정리
+        if source is not None and source.endswith(".partial"):
+            try:
+                os.remove(source)
+            except OSError:
+                pass
+        if result["n_bodies"] > RESULT_STATE_MAX_BODIES:
+            result.pop("positions")
+            result.pop("velocities")
+        result["trajectory"] = writer is not None
+        db.execute(report_progress(run_id, result["steps"], params.steps, worker))
+        db.execute(finish_run(run_id, SUCCEEDED, worker, result=result))
+        db.commit()
+        # 같은 파라미터의 다음 요청은 큐를 거치지 않고 바로 응답 (pool 프로세스라 디스크 계층만)
+        try:
+            result_cache.set(params_hash, result, memory=False)
+        except OSError:
+            logger.exception("run %s: result cache store failed", run_id)
+        return SUCCEEDED
+    finally:
+        db.close()
+
+
+class JobWorker:
+    """Polls the queue table and feeds claimed runs to a process pool."""
+
+    def __init__(
+        self, processes: int = JOB_PROCESSES, poll_interval: float = JOB_POLL_INTERVAL
+    ):
+        self.processes = processes
+        self.poll_interval = poll_interval
+        self.name = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.pool: Optional[ProcessPoolExecutor] = None
+        self.futures: Dict[int, Future] = {}
+        self.finished_at: Dict[int, float] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.trending_refreshed_at = float("-inf")
+
+    def poll_once(self) -> int:
+        """Reap finished runs, refresh heartbeats and claim new work; returns runs claimed."""
+        now = time.monotonic()
+        for run_id, finished in list(self.finished_at.items()):
+            if now - finished >= LIVE_LINGER_SECONDS:
+                remove_live_frame(run_id)
+                del self.finished_at[run_id]
+        for run_id, future in list(self.futures.items()):
+            if future.done():
+                del self.futures[run_id]
+                self.finished_at[run_id] = now
+                if future.exception() is not None:
+                    # 프로세스 자체가 죽은 경우 (BrokenProcessPool 등)
+                    logger.error("run %s: pool process died", run_id, exc_info=future.exception())
+                    with SessionLocal() as db:
+                        db.execute(finish_run(run_id, FAILED, self.name, error=repr(future.exception())))
+                        db.commit()
+
+        free = self.processes - len(self.futures)
+        claimed = []
+        with SessionLocal() as db:
+            if self.futures:
+                db.execute(heartbeat(list(self.futures), self.name))
+            db.execute(requeue_stale(self.name))
+            db.commit()
+            if free <= 0:
+                return 0
+
+            running = dict(
+                db.execute(
+                    select(SimulationRun.user_id, func.count(SimulationRun.id))
+                    .where(SimulationRun.status == RUNNING)
+                    .group_by(SimulationRun.user_id)
+                ).all()
+            )
+            candidates = db.execute(
+                select(SimulationRun.id, SimulationRun.user_id)
+                .where(SimulationRun.status == QUEUED)
+                .order_by(SimulationRun.id)
+                .limit(free * 4)
+            ).all()
+            for run_id, user_id in candidates:
+                if len(claimed) == free:
+                    break
+                # 유저별 동시 실행 제한: 넘으면 다음 폴링까지 대기열에 남겨 둔다
+                if running.get(user_id, 0) >= MAX_RUNNING_RUNS_PER_USER:
+                    continue
+                if db.execute(claim_run(run_id, self.name)).rowcount == 1:
+                    running[user_id] = running.get(user_id, 0) + 1
+                    claimed.append(run_id)
+                db.commit()
+
+        for run_id in claimed:
+            self.futures[run_id] = self.pool.submit(execute_run, run_id, self.name)
+        return len(claimed)
+
+    def refresh_trending_if_due(self) -> None:
+        now = time.monotonic()
+        if TRENDING_REFRESH_SECONDS <= 0 or now - self.trending_refreshed_at < TRENDING_REFRESH_SECONDS:
+            return
+        self.trending_refreshed_at = now
+        with SessionLocal() as db:
+            refresh_trending(db)
+
+    def run_forever(self) -> None:
+        self.pool = ProcessPoolExecutor(self.processes, initializer=_init_pool_process)
+        try:
+            while not self._stop.is_set():
+                try:
+                    claimed = self.poll_once()
+                except Exception:
+                    logger.exception("job worker poll failed")
+                    claimed = 0
+                try:
+                    self.refresh_trending_if_due()
+                except Exception:
+                    logger.exception("trending refresh failed")
+                # 방금 작업을 가져왔으면 바로 한 번 더 확인
+                if not claimed:
+                    self._stop.wait(self.poll_interval)
+        finally:
+            self.pool.shutdown(wait=True, cancel_futures=True)
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self.run_forever, name="job-worker", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="시뮬레이션 실행 worker")
+    parser.add_argument("--processes", type=int, default=JOB_PROCESSES)
+    parser.add_argument("--poll-interval", type=float, default=JOB_POLL_INTERVAL)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    worker = JobWorker(args.processes, args.poll_interval)
+    logger.info("job worker started: %s (processes=%d)", worker.name, args.processes)
+    try:
+        worker.run_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,27 +1,86 @@
+import os
+
 import uvicorn
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, status
+from fastapi.responses import JSONResponse, PlainTextResponse
 from sqlalchemy.exc import OperationalError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+import models  # noqa: F401  (create_all 이 모든 테이블을 알도록 등록)
+from database import Base, DB_MODE, engine
+from jobs import JobWorker
+from routers import router
+from utils.likes import like_batcher
+from utils.metrics import PROMETHEUS_MEDIA_TYPE, MetricsMiddleware, registry
+from utils.passwords import password_pool
+from utils.search import ensure_search_index
 
-from database import engine
+DB_CREATE_ALL = os.getenv("DB_CREATE_ALL", "false").lower() == "true"
+# embedded: API 프로세스 안에서 worker 실행 (로컬 개발용), off: `python -m jobs.worker` 를 따로 띄움
+JOB_WORKER = os.getenv("JOB_WORKER", "off").lower()
+job_worker = JobWorker() if JOB_WORKER == "embedded" else None
 
 app = FastAPI()
+app.add_middleware(MetricsMiddleware)
+app.include_router(router)
+
+
+@app.exception_handler(PoolTimeoutError)
+async def pool_timeout_handler(request: Request, exc: PoolTimeoutError):
+    # DB_POOL_TIMEOUT 안에 연결을 못 받음: 500 대신 재시도 가능한 503
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "요청이 많아 처리할 수 없습니다. 잠시 후 다시 시도하세요."},
+        headers={"Retry-After": "1"},
+    )
 
 
 @app.on_event("startup")
 def test_db_connection():
     try:
         with engine.connect() as conn:
-            print("DB 연결 성공")
+            print(f"DB 연결 성공 (DB_MODE={DB_MODE})")
+        if DB_CREATE_ALL:
+            Base.metadata.create_all(bind=engine)
+        with engine.begin() as conn:
+            indexed = ensure_search_index(conn)
+        if indexed:
+            print(f"검색 인덱스에 기존 게시글 {indexed}건 추가")
     except OperationalError as e:
         print("DB 연결 실패 (OperationalError):", e)
     except Exception as e:
         print("DB 연결 실패 (기타 오류):", e)
 
 
+@app.on_event("startup")
+def start_job_worker():
+    if job_worker is not None:
+        job_worker.start()
+
+
+@app.on_event("shutdown")
+def stop_job_worker():
+    if job_worker is not None:
+        job_worker.stop()
+    password_pool.shutdown()
+
+
+@app.on_event("shutdown")
+async def flush_likes():
+    # 아직 기록 안 된 like/unlike 를 종료 전에 기록
+    await like_batcher.close()
+
+
 @app.get("/")
 def root():
     return {"message": "Gravity backend running"}
 
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    # Prometheus scrape 용 (라우트 템플릿별 요청 수/지연/SQL/직렬화/응답 크기)
+    return PlainTextResponse(registry.render(), media_type=PROMETHEUS_MEDIA_TYPE)
+
+
 if __name__ == "__main__":
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
@@ -0,0 +1,9 @@
+-- 기존 MySQL DB: simulations.like_count 카운터와 sort=likes 인덱스. 한 번만 실행:
+--   mysql -u $DB_USER -p $DB_NAME < migrations/0001_simulation_like_count.sql
+-- 추가된 like_count 는 모두 0 이므로, migrations 를 다 적용한 뒤 한 번
+--   python -m utils.likes
+-- 로 simulation_likes 에서 다시 센다 (id 구간별로 나눠 commit). 안 하면 sort=likes 가 전부 0 으로 정렬된다.
+
+ALTER TABLE simulations
+    ADD COLUMN like_count INTEGER NOT NULL DEFAULT '0' AFTER is_public,
+    ADD INDEX ix_simulations_public_likes (is_public, like_count, created_at, id);
@@ -0,0 +1,66 @@
+-- 기존 MySQL DB: simulations.data/data2 -> params(JSON), sweep 컬럼, simulation_runs 테이블
+-- 새 DB 는 DB_CREATE_ALL=true 로 만들면 필요 없음. 한 번만 실행:
+--   mysql -u $DB_USER -p $DB_NAME < migrations/0002_simulation_params.sql
+
+-- 1) params 를 NULL 허용으로 추가하고 기존 행을 채운 뒤 NOT NULL 로
+ALTER TABLE simulations ADD COLUMN params JSON NULL AFTER title;
+
+-- data/data2 는 의미가 정해지지 않은 정수 자리였으므로 기본 SimulationParams 로 바꾸고,
+-- 원래 값은 params.legacy 에 남긴다 (SimulationParams 는 모르는 키를 무시)
+UPDATE simulations
+SET params = JSON_OBJECT(
+    'bodies', CAST('null' AS JSON),
+    'n_bodies', 2,
+    'distribution', 'plummer',
+    'seed', 0,
+    'total_mass', 1.0,
+    'G', 1.0,
+    'dt', 0.01,
+    'steps', 1000,
+    'softening', 0.01,
+    'output_stride', 10,
+    'method', 'direct',
+    'theta', 0.5,
+    'legacy', JSON_OBJECT('data', data, 'data2', data2)
+)
+WHERE params IS NULL;
+
+ALTER TABLE simulations
+    MODIFY COLUMN params JSON NOT NULL,
+    DROP COLUMN data,
+    DROP COLUMN data2;
+
+-- 2) parameter sweep 묶음
+ALTER TABLE simulations
+    ADD COLUMN sweep_id VARCHAR(32) NULL,
+    ADD COLUMN sweep_index INTEGER NULL,
+    ADD INDEX ix_simulations_sweep_id (sweep_id);
+
+-- 3) 실행 대기열/기록 (jobs/queue.py, jobs/worker.py)
+CREATE TABLE IF NOT EXISTS simulation_runs (
+    id INTEGER NOT NULL AUTO_INCREMENT,
+    simulation_id INTEGER NOT NULL,
+    user_id INTEGER NOT NULL,
+    status VARCHAR(16) NOT NULL,
+    params JSON NOT NULL,
+    params_hash VARCHAR(64) NOT NULL,
+    cached BOOL NOT NULL,
+    progress FLOAT NOT NULL,
+    steps_done INTEGER NOT NULL,
+    resumed_from_step INTEGER NOT NULL DEFAULT '0',
+    cancel_requested BOOL NOT NULL,
+    worker VARCHAR(64),
+    heartbeat_at DATETIME,
+    result JSON,
+    error TEXT,
+    created_at DATETIME NOT NULL,
+    started_at DATETIME,
+    finished_at DATETIME,
+    PRIMARY KEY (id),
+    INDEX ix_simulation_runs_id (id),
+    INDEX ix_simulation_runs_status_id (status, id),
+    INDEX ix_simulation_runs_user_status (user_id, status),
+    INDEX ix_simulation_runs_simulation (simulation_id, id),
+    FOREIGN KEY (simulation_id) REFERENCES simulations (id) ON DELETE CASCADE,
+    FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE
+);
@@ -1,11 +1,17 @@
 from .user import User
 from .article import Article
-from .simulation import Simulation
-from .simulation_like import SimulationLike
+# 파일명과 클래스가 뒤바뀌어 있음 (requirements.md 참고)
+from .simulation_like import Simulation
+from .simulation import SimulationLike
+from .simulation_run import SimulationRun
+from .simulation_trending import SimulationTrending, TrendingState
 
 __all__ = [
     "User",
     "Article",
     "Simulation",
     "SimulationLike",
+    "SimulationRun",
+    "SimulationTrending",
+    "TrendingState",
 ]
\ No newline at end of file
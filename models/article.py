@@ -2,7 +2,7 @@
 
 from datetime import datetime
 
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 
 from database import Base
@@ -33,6 +33,24 @@ class Article(Base):
     )
 
     # 누가 쓴 글인지 (옵션 – 필요 없으면 제거)
-    author_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    author_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=True)
+
+    # 공개 목록 keyset 페이지네이션: WHERE is_public ORDER BY created_at DESC, id DESC
+    # export: WHERE is_public ORDER BY updated_at, id (updated_since / cursor 로 range scan)
+    # 검색(q): MySQL FULLTEXT + ngram 파서 (한글은 띄어쓰기 단위로 안 잘리므로)
+    #          SQLite 는 utils/search.py 의 FTS5 테이블을 사용
+    # 계정 삭제/CASCADE: WHERE author_id = ?
+    __table_args__ = (
+        Index("ix_articles_public_created", "is_public", "created_at", "id"),
+        Index("ix_articles_public_updated", "is_public", "updated_at", "id"),
+        Index("ix_articles_author", "author_id", "id"),
+        Index(
+            "ft_articles_title_content",
+            "title",
+            "content",
+            mysql_prefix="FULLTEXT",
+            mysql_with_parser="ngram",
+        ).ddl_if(dialect="mysql"),
+    )
 
     author = relationship("User", back_populates="articles")
@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import Column, Integer, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 
 from database import Base
@@ -12,14 +12,19 @@ class SimulationLike(Base):
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
 
     # 누가 / 어떤 시뮬레이션에 좋아요 했는지
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    simulation_id = Column(Integer, ForeignKey("simulations.id"), nullable=False)
+    # 유저/시뮬레이션이 지워지면 DB 가 같이 지운다 (ON DELETE CASCADE)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    simulation_id = Column(Integer, ForeignKey("simulations.id", ondelete="CASCADE"), nullable=False)
 
     created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
 
-    # 한 유저가 한 시뮬레이션에 여러 번 좋아요 못 누르게
+    # 한 유저가 한 시뮬레이션에 여러 번 좋아요 못 누르게 (user_id 로 찾을 때도 이 인덱스)
+    # 시뮬레이션 삭제/CASCADE: WHERE simulation_id IN (...)
+    # trending 갱신: WHERE created_at >= ? AND created_at < ? (지난 갱신 이후 좋아요만)
     __table_args__ = (
         UniqueConstraint("user_id", "simulation_id", name="uq_user_simulation_like"),
+        Index("ix_simulation_likes_simulation", "simulation_id"),
+        Index("ix_simulation_likes_created", "created_at"),
     )
 
     user = relationship("User", back_populates="likes")
@@ -2,7 +2,7 @@
 
 from datetime import datetime
 
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Index, JSON
 from sqlalchemy.orm import relationship
 
 from database import Base
@@ -17,14 +17,16 @@ class Simulation(Base):
     # DTO: simulation.title
     title = Column(String(255), nullable=False)
 
-    # DTO: simulationResiter.data, data2
-    # 실제로는 float / json / text 등으로 바뀔 수도 있음
-    data = Column(Integer, nullable=False)
-    data2 = Column(Integer, nullable=False)
+    # DTO: simulationResiter.params (schemas.simulation.SimulationParams)
+    params = Column(JSON, nullable=False)
 
     # DTO: simulationResiter.is_public
     is_public = Column(Boolean, nullable=False, default=True)
 
+    # 좋아요 수 (simulation_likes insert/delete 와 같은 트랜잭션에서 증감)
+    # 어긋나면 `python -m utils.likes` 로 재계산
+    like_count = Column(Integer, nullable=False, default=0, server_default="0")
+
     # 생성/수정 시간 (추가 필드)
     created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
     updated_at = Column(
@@ -34,8 +36,29 @@ class Simulation(Base):
         onupdate=datetime.utcnow,
     )
 
+    # parameter sweep 으로 한꺼번에 만들어진 경우 그 묶음 id 와 순번
+    sweep_id = Column(String(32), nullable=True, index=True)
+    sweep_index = Column(Integer, nullable=True)
+
     # 어떤 유저의 시뮬레이션인지 (옵션)
-    owner_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    owner_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=True)
+
+    # 공개 목록 keyset 페이지네이션: WHERE is_public ORDER BY created_at DESC, id DESC
+    # sort=likes: WHERE is_public ORDER BY like_count DESC, created_at DESC, id DESC
+    # export: WHERE is_public ORDER BY updated_at, id
+    # 계정 삭제/CASCADE: WHERE owner_id = ?
+    __table_args__ = (
+        Index("ix_simulations_public_created", "is_public", "created_at", "id"),
+        Index("ix_simulations_public_updated", "is_public", "updated_at", "id"),
+        Index("ix_simulations_public_likes", "is_public", "like_count", "created_at", "id"),
+        Index("ix_simulations_owner", "owner_id", "id"),
+    )
 
     owner = relationship("User", back_populates="simulations")
-    likes = relationship("SimulationLike", back_populates="simulation", cascade="all, delete-orphan")
+    # passive_deletes: 지울 때 자식을 읽어 오지 않고 DB 의 ON DELETE CASCADE 에 맡긴다
+    likes = relationship(
+        "SimulationLike", back_populates="simulation", cascade="all, delete-orphan", passive_deletes=True
+    )
+    runs = relationship(
+        "SimulationRun", back_populates="simulation", cascade="all, delete-orphan", passive_deletes=True
+    )
@@ -0,0 +1,66 @@
+# app/models/simulation_run.py
+
+from datetime import datetime
+
+from sqlalchemy import (
+    Boolean,
+    Column,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    JSON,
+    String,
+    Text,
+)
+from sqlalchemy.orm import relationship
+
+from database import Base
+
+
+class SimulationRun(Base):
+    __tablename__ = "simulation_runs"
+
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+
+    simulation_id = Column(Integer, ForeignKey("simulations.id", ondelete="CASCADE"), nullable=False)
+    # 실행을 요청한 유저 (유저별 동시 실행 제한 기준)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+
+    # queued -> running -> succeeded / failed / cancelled (jobs.queue 참고)
+    status = Column(String(16), nullable=False, default="queued")
+
+    # 요청 시점의 Simulation.params 스냅샷 (실행 중 수정돼도 결과가 섞이지 않게)
+    params = Column(JSON, nullable=False)
+    # utils.result_cache.params_key (params + ENGINE_VERSION 해시), 결과 캐시 키
+    params_hash = Column(String(64), nullable=False)
+    # 결과 캐시에서 바로 채워진 실행이면 True (worker 를 거치지 않음)
+    cached = Column(Boolean, nullable=False, default=False)
+
+    progress = Column(Float, nullable=False, default=0.0)
+    steps_done = Column(Integer, nullable=False, default=0)
+    # 체크포인트에서 이어 받은 경우 그 step (0 이면 처음부터 계산)
+    resumed_from_step = Column(Integer, nullable=False, default=0, server_default="0")
+    cancel_requested = Column(Boolean, nullable=False, default=False)
+
+    # 어떤 worker 가 가져갔는지 / 마지막 생존 신호 (죽은 worker 의 작업 재투입용)
+    worker = Column(String(64), nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)
+
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    # worker 폴링: WHERE status='queued' ORDER BY id
+    # 유저별 제한: WHERE user_id=? AND status IN (...)
+    __table_args__ = (
+        Index("ix_simulation_runs_status_id", "status", "id"),
+        Index("ix_simulation_runs_user_status", "user_id", "status"),
+        Index("ix_simulation_runs_simulation", "simulation_id", "id"),
+    )
+
+    simulation = relationship("Simulation", back_populates="runs")
@@ -0,0 +1,40 @@
+# app/models/simulation_trending.py
+
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Index, Integer
+
+from database import Base
+
+
+class SimulationTrending(Base):
+    """Precomputed ``sort=trending`` ranking, refreshed by ``utils.trending``."""
+
+    __tablename__ = "simulation_trending"
+
+    simulation_id = Column(
+        Integer, ForeignKey("simulations.id", ondelete="CASCADE"), primary_key=True
+    )
+
+    # log(sum(exp((좋아요 시각 - TRENDING_EPOCH) / tau))): 시각이 기준점에 고정돼 있어서
+    # 새 좋아요가 없으면 다시 쓸 필요가 없고, 값의 순서가 곧 현재 감쇠 점수의 순서
+    score = Column(Float, nullable=False)
+
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    # sort=trending: ORDER BY score DESC, simulation_id DESC 를 그대로 따라 읽는 index scan
+    __table_args__ = (
+        Index("ix_simulation_trending_score", "score", "simulation_id"),
+    )
+
+
+class TrendingState(Base):
+    """Single row (``id=1``): how far ``simulation_likes`` has been folded into the ranking."""
+
+    __tablename__ = "trending_state"
+
+    id = Column(Integer, primary_key=True)
+
+    # created_at 이 이 시각보다 이른 좋아요는 모두 반영됨
+    liked_before = Column(DateTime, nullable=False)
+    refreshed_at = Column(DateTime, nullable=False)
@@ -31,6 +31,10 @@ class User(Base):
     )
 
     # 관계 설정 (옵션)
-    articles = relationship("Article", back_populates="author", cascade="all, delete-orphan")
-    simulations = relationship("Simulation", back_populates="owner", cascade="all, delete-orphan")
-    likes = relationship("SimulationLike", back_populates="user", cascade="all, delete-orphan")
+    # passive_deletes: 유저를 지울 때 자식 행을 메모리로 읽지 않고 DB 의 ON DELETE CASCADE 에 맡긴다
+    # 큰 계정은 utils/purge.py 가 조각 단위로 먼저 지운다
+    articles = relationship("Article", back_populates="author", cascade="all, delete-orphan", passive_deletes=True)
+    simulations = relationship(
+        "Simulation", back_populates="owner", cascade="all, delete-orphan", passive_deletes=True
+    )
+    likes = relationship("SimulationLike", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
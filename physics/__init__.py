@@ -0,0 +1,18 @@
+from .nbody import State, direct_accelerations, leapfrog
+from .barnes_hut import barnes_hut_accelerations
+from .engine import acceleration_for, initial_state, run, total_energy
+
+# 적분기/힘 계산이 바뀌어 같은 파라미터의 결과가 달라지면 올릴 것
+ENGINE_VERSION = "1"
+
+__all__ = [
+    "ENGINE_VERSION",
+    "State",
+    "acceleration_for",
+    "barnes_hut_accelerations",
+    "direct_accelerations",
+    "initial_state",
+    "leapfrog",
+    "run",
+    "total_energy",
+]
@@ -0,0 +1,245 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+# 축당 비트 수. 21 * 3 = 63 비트 Morton 키
+MAX_DEPTH = 21
+# 이 수 이하의 body 만 남은 셀은 더 쪼개지 않는다 (가까우면 body 단위 직접 합)
+LEAF_SIZE = 16
+# 함께 트리를 순회하는 sink group 크기 (Morton 순서로 연속된 body)
+GROUP_SIZE = 16
+# 한 번에 interaction list 를 만드는 group 수
+GROUP_CHUNK = 256
+
+
+@dataclass
+class Octree:
+    """
+    Flat, array-backed octree over Morton-sorted bodies.
+
+    Node ``k`` covers sorted bodies ``start[k]:stop[k]``; its children are the
+    nodes ``child_first[k] : child_first[k] + child_count[k]``. Leaves have
+    ``child_count == 0``. Nodes are stored level by level, root first.
+    """
+
+    order: np.ndarray  # sorted position -> original body index
+    mass: np.ndarray
+    com: np.ndarray
+    size: np.ndarray  # cell side length
+    start: np.ndarray
+    stop: np.ndarray
+    child_first: np.ndarray
+    child_count: np.ndarray
+
+
+def _spread_bits(v: np.ndarray) -> np.ndarray:
+    v = v.astype(np.uint64)
+    v = (v | (v << np.uint64(32))) & np.uint64(0x1F00000000FFFF)
+    v = (v | (v << np.uint64(16))) & np.uint64(0x1F0000FF0000FF)
+    v = (v | (v << np.uint64(8))) & np.uint64(0x100F00F00F00F00F)
+    v = (v | (v << np.uint64(4))) & np.uint64(0x10C30C30C30C30C3)
+    v = (v | (v << np.uint64(2))) & np.uint64(0x1249249249249249)
+    return v
+
+
+def morton_keys(positions: np.ndarray, max_depth: int = MAX_DEPTH):
+    lo = positions.min(axis=0)
+    span = float((positions.max(axis=0) - lo).max())
+    span = span * (1.0 + 1e-9) if span > 0 else 1.0
+    cells = 1 << max_depth
+    ijk = np.minimum(((positions - lo) * (cells / span)).astype(np.int64), cells - 1)
+    keys = (
+        _spread_bits(ijk[:, 0])
+        | (_spread_bits(ijk[:, 1]) << np.uint64(1))
+        | (_spread_bits(ijk[:, 2]) << np.uint64(2))
+    )
+    return keys, span
+
+
+def build_octree(
+    positions: np.ndarray,
+    masses: np.ndarray,
+    leaf_size: int = LEAF_SIZE,
+    max_depth: int = MAX_DEPTH,
+) -> Octree:
+    n = masses.shape[0]
+    keys, span = morton_keys(positions, max_depth)
+    order = np.argsort(keys, kind="stable")
+    keys = keys[order]
+    m = masses[order]
+    mx = positions[order] * m[:, None]
+
+    levels = []
+    # leaf_size 보다 많이 모여 있는 노드에 속한 body 만 다음 레벨로 내려간다
+    active = np.arange(n)
+    for level in range(max_depth + 1):
+        prefix = keys[active] >> np.uint64(3 * (max_depth - level))
+        first = np.flatnonzero(np.r_[True, prefix[1:] != prefix[:-1]])
+        counts = np.diff(np.r_[first, active.size])
+        node_mass = np.add.reduceat(m[active], first)
+        levels.append(
+            {
+                "prefix": prefix[first],
+                "mass": node_mass,
+                "com": np.add.reduceat(mx[active], first, axis=0) / node_mass[:, None],
+                "start": active[first],
+                "stop": active[first + counts - 1] + 1,
+                "size": np.full(first.size, span / (1 << level)),
+            }
+        )
+        active = active[np.repeat(counts > leaf_size, counts)]
+        if active.size == 0:
+            break
+
+    offsets = np.cumsum([0] + [lvl["mass"].size for lvl in levels])
+    total = offsets[-1]
+    child_first = np.full(total, -1, dtype=np.int64)
+    child_count = np.zeros(total, dtype=np.int64)
+    for depth in range(len(levels) - 1):
+        parents, children = levels[depth], levels[depth + 1]
+        parent = np.searchsorted(parents["prefix"], children["prefix"] >> np.uint64(3))
+        unique, first_child, count = np.unique(parent, return_index=True, return_counts=True)
+        child_first[offsets[depth] + unique] = offsets[depth + 1] + first_child
+        child_count[offsets[depth] + unique] = count
+
+    def stack(name):
+        return np.concatenate([lvl[name] for lvl in levels])
+
+    return Octree(
+        order=order,
+        mass=stack("mass"),
+        com=stack("com"),
+        size=stack("size"),
+        start=stack("start"),
+        stop=stack("stop"),
+        child_first=child_first,
+        child_count=child_count,
+    )
+
+
+def _expand(parent, first, count):
+    """(parent, k) pairs for every k in first:first+count, per parent pair."""
+    out = np.repeat(parent, count)
+    base = np.repeat(np.cumsum(count) - count, count)
+    return out, np.repeat(first, count) + (np.arange(out.size) - base)
+
+
+def _interaction_lists(
+    tree, sorted_pos, sorted_mass, group_start, group_stop, center, radius, groups, theta
+):
+    """
+    Walk the tree for ``groups`` together, one level per iteration.
+
+    Returns the sources of each group sorted by group: (group, position,
+    mass, body) where ``body`` is the sorted body index for near-field
+    sources and -1 for accepted cells.
+    """
+    src_group, src_pos, src_mass, src_body = [], [], [], []
+    group, node = groups, np.zeros(groups.size, dtype=np.int64)
+    while group.size:
+        dist = np.linalg.norm(tree.com[node] - center[group], axis=1)
+        contains = (tree.start[node] < group_stop[group]) & (group_start[group] < tree.stop[node])
+        accept = ~contains & (tree.size[node] < theta * (dist - radius[group]))
+        src_group.append(group[accept])
+        src_pos.append(tree.com[node[accept]])
+        src_mass.append(tree.mass[node[accept]])
+        src_body.append(np.full(accept.sum(), -1, dtype=np.int64))
+
+        leaf = ~accept & (tree.child_count[node] == 0)
+        near_group, body = _expand(
+            group[leaf], tree.start[node[leaf]], tree.stop[node[leaf]] - tree.start[node[leaf]]
+        )
+        src_group.append(near_group)
+        src_pos.append(sorted_pos[body])
+        src_mass.append(sorted_mass[body])
+        src_body.append(body)
+
+        inner = ~accept & ~leaf
+        group, node = _expand(
+            group[inner], tree.child_first[node[inner]], tree.child_count[node[inner]]
+        )
+
+    src_group = np.concatenate(src_group)
+    order = np.argsort(src_group, kind="stable")
+    return (
+        src_group[order],
+        np.concatenate(src_pos)[order],
+        np.concatenate(src_mass)[order],
+        np.concatenate(src_body)[order],
+    )
+
+
+def barnes_hut_accelerations(
+    positions: np.ndarray,
+    masses: np.ndarray,
+    G: float = 1.0,
+    softening: float = 0.0,
+    theta: float = 0.5,
+    leaf_size: int = LEAF_SIZE,
+    group_size: int = GROUP_SIZE,
+) -> np.ndarray:
+    """
+    O(N log N) Barnes-Hut accelerations with opening angle ``theta``.
+
+    Uses the grouped variant (Barnes 1990): runs of ``group_size`` bodies in
+    Morton order form sink groups that walk the tree together. A cell is
+    taken as a point mass when ``size < theta * (distance - group radius)``
+    and it holds none of the group's bodies; otherwise an inner cell is
+    replaced by its children and a leaf by its bodies, summed directly.
+
+    The walk handles all (group, cell) pairs of a tree level in one set of
+    array operations, and each group's interaction list is then evaluated
+    with the same Gram-matrix kernel as ``direct_accelerations``, so no
+    Python loop runs per body, per cell or per pair. ``theta=0`` reduces to
+    the direct sum.
+    """
+    tree = build_octree(positions, masses, leaf_size)
+    sorted_pos = positions[tree.order]
+    sorted_mass = masses[tree.order]
+    eps2 = softening * softening
+
+    n = masses.shape[0]
+    n_groups = -(-n // group_size)
+    group_start = np.arange(n_groups) * group_size
+    group_stop = np.minimum(group_start + group_size, n)
+    # 마지막 group 의 남는 칸은 마지막 body 를 복제해서 채운다
+    slot = np.minimum(np.arange(n_groups * group_size), n - 1).reshape(n_groups, group_size)
+    sinks = sorted_pos[slot]  # (groups, group_size, 3)
+    lo, hi = sinks.min(axis=1), sinks.max(axis=1)
+    center = 0.5 * (lo + hi)
+    radius = 0.5 * np.linalg.norm(hi - lo, axis=1)
+
+    acc = np.empty_like(sinks)
+    # interaction list 메모리를 제한하기 위해 group 단위로 나눠서 순회
+    for chunk_start in range(0, n_groups, GROUP_CHUNK):
+        groups = np.arange(chunk_start, min(chunk_start + GROUP_CHUNK, n_groups))
+        src_group, src_pos, src_mass, src_body = _interaction_lists(
+            tree, sorted_pos, sorted_mass, group_start, group_stop, center, radius, groups, theta
+        )
+        # 모든 group 은 최소한 자기 leaf 를 near source 로 가진다
+        bounds = np.searchsorted(src_group, np.r_[groups, groups[-1] + 1])
+
+        for i, g in enumerate(groups):
+            s0, s1 = bounds[i], bounds[i + 1]
+            src = src_pos[s0:s1] - center[g]
+            sink = sinks[g] - center[g]
+            w = src @ sink.T  # (sources, group_size)
+            w *= -2.0
+            w += np.einsum("ij,ij->i", src, src)[:, None]
+            w += np.einsum("ij,ij->i", sink, sink)[None, :]
+            np.maximum(w, 0.0, out=w)
+            w += eps2
+            self_pair = src_body[s0:s1, None] == slot[g][None, :]
+            w[self_pair] = 1.0
+            np.sqrt(w, out=w)
+            w *= w * w
+            np.divide(src_mass[s0:s1, None], w, out=w)
+            w[self_pair] = 0.0
+            # a_l = sum_s w_sl (x_s - x_l)
+            acc[g] = w.T @ src - w.sum(axis=0)[:, None] * sink
+
+    acc_sorted = acc.reshape(-1, 3)[:n]
+    out = np.empty_like(acc_sorted)
+    out[tree.order] = acc_sorted
+    out *= G
+    return out
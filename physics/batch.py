@@ -0,0 +1,202 @@
+import copy
+import itertools
+import time
+from typing import Dict, List, Sequence, Tuple, Union
+
+import numpy as np
+from pydantic import ValidationError
+
+from physics.engine import initial_state
+from physics.nbody import BLOCK_ELEMENTS, State, leapfrog
+from schemas.simulation import SimulationParams, SweepRange
+
+# 한 sweep 의 최대 장면 수
+SWEEP_MAX_SCENES = 256
+# 배치 적분은 모든 장면이 같은 배열 모양/스텝 수를 가져야 하므로 이 값들은 sweep 불가
+FIXED_FIELDS = ("n_bodies", "steps", "output_stride", "distribution", "method", "theta")
+
+
+def _set_path(data: dict, path: str, value: float) -> None:
+    keys = path.split(".")
+    if keys[0] in FIXED_FIELDS:
+        raise ValueError(f"{keys[0]} 는 sweep 할 수 없습니다.")
+    target = data
+    try:
+        for key in keys[:-1]:
+            target = target[int(key)] if isinstance(target, list) else target[key]
+        last = keys[-1]
+        if isinstance(target, list):
+            target[int(last)] = value
+        elif last in target and not isinstance(target[last], (dict, list)):
+            target[last] = value
+        else:
+            raise KeyError(last)
+    except (KeyError, IndexError, ValueError, TypeError):
+        raise ValueError(f"알 수 없는 sweep 경로: {path}")
+
+
+def expand_sweep(
+    base: SimulationParams, axes: Dict[str, Union[List[float], SweepRange]]
+) -> Tuple[List[SimulationParams], List[dict]]:
+    """
+    Cartesian product of ``axes`` applied to ``base``.
+
+    Axis keys are dotted paths into the params (``G``, ``dt``, ``seed``,
+    ``bodies.1.mass``, ``bodies.0.velocity.1`` ...). Returns the validated
+    params of every scene and the axis values that produced it.
+    """
+    if base.method != "direct":
+        raise ValueError("sweep 은 method=direct 만 지원합니다.")
+    names = list(axes)
+    values = [
+        np.linspace(axis.start, axis.stop, axis.num).tolist()
+        if isinstance(axis, SweepRange)
+        else list(axis)
+        for axis in axes.values()
+    ]
+    total = int(np.prod([len(v) for v in values])) if values else 1
+    if total > SWEEP_MAX_SCENES:
+        raise ValueError(f"sweep 장면 수는 최대 {SWEEP_MAX_SCENES}개입니다. (요청: {total})")
+
+    base_data = base.model_dump()
+    scenes, labels = [], []
+    for combo in itertools.product(*values):
+        data = copy.deepcopy(base_data)
+        for name, value in zip(names, combo):
+            _set_path(data, name, value)
+        try:
+            scenes.append(SimulationParams.model_validate(data))
+        except ValidationError as e:
+            raise ValueError(f"잘못된 sweep 값 {dict(zip(names, combo))}: {e.errors()[0]['msg']}")
+        labels.append(dict(zip(names, combo)))
+    return scenes, labels
+
+
+def batched_accelerations(
+    positions: np.ndarray, masses: np.ndarray, G: np.ndarray, softening: np.ndarray
+) -> np.ndarray:
+    """
+    ``direct_accelerations`` for a stack of independent scenes.
+
+    ``positions`` is (B, N, 3), ``masses`` (B, N), ``G`` and ``softening``
+    (B,). Every NumPy call covers a block of whole scenes (batched matmul on
+    the Gram form), so many small scenes cost a handful of large array
+    operations instead of a Python loop per scene.
+    """
+    b, n, _ = positions.shape
+    pos = positions - positions.mean(axis=1, keepdims=True)
+    sq = np.einsum("bij,bij->bi", pos, pos)
+    eps2 = softening * softening
+    diag = np.arange(n)
+    acc = np.empty_like(pos)
+    block = max(1, BLOCK_ELEMENTS // max(n * n, 1))
+
+    for start in range(0, b, block):
+        s = slice(start, min(start + block, b))
+        w = pos[s] @ pos[s].transpose(0, 2, 1)
+        w *= -2.0
+        w += sq[s, :, None]
+        w += sq[s, None, :]
+        np.maximum(w, 0.0, out=w)
+        w += eps2[s, None, None]
+        w[:, diag, diag] = 1.0
+        np.sqrt(w, out=w)
+        w *= w * w
+        np.divide(masses[s, None, :], w, out=w)
+        w[:, diag, diag] = 0.0
+        acc[s] = w @ pos[s] - w.sum(axis=2)[:, :, None] * pos[s]
+
+    acc *= G[:, None, None]
+    return acc
+
+
+def batched_energy(state: State, G: np.ndarray, softening: np.ndarray) -> np.ndarray:
+    """Total (kinetic + potential) energy of every scene, shape (B,)."""
+    kinetic = 0.5 * np.einsum("bi,bij,bij->b", state.masses, state.velocities, state.velocities)
+    b, n, _ = state.positions.shape
+    pos = state.positions - state.positions.mean(axis=1, keepdims=True)
+    sq = np.einsum("bij,bij->bi", pos, pos)
+    diag = np.arange(n)
+    potential = np.empty(b)
+    block = max(1, BLOCK_ELEMENTS // max(n * n, 1))
+    for start in range(0, b, block):
+        s = slice(start, min(start + block, b))
+        r2 = pos[s] @ pos[s].transpose(0, 2, 1)
+        r2 *= -2.0
+        r2 += sq[s, :, None]
+        r2 += sq[s, None, :]
+        np.maximum(r2, 0.0, out=r2)
+        r2 += (softening[s] * softening[s])[:, None, None]
+        r2[:, diag, diag] = np.inf
+        m = state.masses[s]
+        # 각 쌍을 두 번 셌으므로 절반
+        potential[s] = -0.5 * np.einsum("bi,bij,bj->b", m, 1.0 / np.sqrt(r2), m)
+    return kinetic + G * potential
+
+
+def run_batch(scenes: Sequence[SimulationParams]) -> List[dict]:
+    """
+    Integrate all ``scenes`` together and summarise each like ``engine.run``.
+
+    Scenes must share ``n_bodies``, ``steps`` and ``output_stride`` (see
+    ``expand_sweep``); ``dt``, ``G``, ``softening`` and the initial conditions
+    may differ per scene. The leapfrog itself is the single-scene one: with a
+    (B, 1, 1) ``dt`` every kick/drift already broadcasts over the batch.
+    """
+    first = scenes[0]
+    for params in scenes:
+        if (params.n_bodies, params.steps, params.output_stride) != (
+            first.n_bodies,
+            first.steps,
+            first.output_stride,
+        ):
+            raise ValueError("batch scenes must share n_bodies, steps and output_stride")
+
+    states = [initial_state(params) for params in scenes]
+    state = State(
+        positions=np.stack([s.positions for s in states]),
+        velocities=np.stack([s.velocities for s in states]),
+        masses=np.stack([s.masses for s in states]),
+    )
+    G = np.array([params.G for params in scenes])
+    softening = np.array([params.softening for params in scenes])
+    dt = np.array([params.dt for params in scenes])[:, None, None]
+
+    energy_start = batched_energy(state, G, softening)
+    started = time.perf_counter()
+    frames = 0
+    for _ in leapfrog(
+        state,
+        lambda positions, masses: batched_accelerations(positions, masses, G, softening),
+        dt,
+        first.steps,
+        first.output_stride,
+    ):
+        frames += 1
+    elapsed = time.perf_counter() - started
+    energy_end = batched_energy(state, G, softening)
+    times = np.broadcast_to(state.time, dt.shape).reshape(-1)
+
+    results = []
+    for i in range(len(scenes)):
+        results.append(
+            {
+                "n_bodies": first.n_bodies,
+                "steps": state.step,
+                "time": float(times[i]),
+                "frames": frames,
+                # 배치 전체의 시간을 장면 수로 나눈 값
+                "elapsed_seconds": elapsed / len(scenes),
+                "steps_per_second": state.step * len(scenes) / elapsed if elapsed > 0 else None,
+                "energy_start": float(energy_start[i]),
+                "energy_end": float(energy_end[i]),
+                "energy_error": (
+                    abs((energy_end[i] - energy_start[i]) / energy_start[i])
+                    if energy_start[i]
+                    else None
+                ),
+                "positions": state.positions[i].tolist(),
+                "velocities": state.velocities[i].tolist(),
+            }
+        )
+    return results
@@ -0,0 +1,98 @@
+import time
+from functools import partial
+from typing import Callable, Optional
+
+import numpy as np
+
+from physics.barnes_hut import barnes_hut_accelerations
+from physics.initial import DISTRIBUTIONS
+from physics.nbody import (
+    AccelerationFn,
+    State,
+    direct_accelerations,
+    kinetic_energy,
+    leapfrog,
+    potential_energy,
+)
+from schemas.simulation import SimulationParams
+
+
+def initial_state(params: SimulationParams) -> State:
+    if params.bodies is not None:
+        return State(
+            positions=np.array([body.position for body in params.bodies], dtype=np.float64),
+            velocities=np.array([body.velocity for body in params.bodies], dtype=np.float64),
+            masses=np.array([body.mass for body in params.bodies], dtype=np.float64),
+        )
+    rng = np.random.default_rng(params.seed)
+    generate = DISTRIBUTIONS[params.distribution]
+    return generate(params.n_bodies, rng, total_mass=params.total_mass, G=params.G)
+
+
+def acceleration_for(params: SimulationParams) -> AccelerationFn:
+    if params.method == "barnes_hut":
+        return partial(
+            barnes_hut_accelerations, G=params.G, softening=params.softening, theta=params.theta
+        )
+    return partial(direct_accelerations, G=params.G, softening=params.softening)
+
+
+def total_energy(state: State, params: SimulationParams) -> float:
+    return kinetic_energy(state.velocities, state.masses) + potential_energy(
+        state.positions, state.masses, G=params.G, softening=params.softening
+    )
+
+
+def run(
+    params: SimulationParams,
+    on_frame: Optional[Callable[[State], None]] = None,
+    start: Optional[State] = None,
+    energy_start: Optional[float] = None,
+) -> dict:
+    """
+    Integrate ``params`` up to ``params.steps`` and summarise the run.
+
+    ``on_frame`` is called with the live state once before the first step and
+    then every ``output_stride`` steps (and after the last step). Passing a
+    checkpointed ``start`` state (with its accelerations) resumes from
+    ``start.step`` exactly as if the run had never stopped; ``on_frame`` is
+    then not called for the already recorded start state, and
+    ``energy_start`` should be the energy at t=0.
+    """
+    state = start if start is not None else initial_state(params)
+    if energy_start is None:
+        energy_start = total_energy(state, params)
+    resumed_from = state.step
+
+    started = time.perf_counter()
+    if on_frame is not None and start is None:
+        on_frame(state)
+    frames = 0
+    for frame in leapfrog(
+        state,
+        acceleration_for(params),
+        params.dt,
+        params.steps - state.step,
+        params.output_stride,
+    ):
+        frames += 1
+        if on_frame is not None:
+            on_frame(frame)
+    elapsed = time.perf_counter() - started
+
+    energy_end = total_energy(state, params)
+    computed = state.step - resumed_from
+    return {
+        "n_bodies": state.n_bodies,
+        "steps": state.step,
+        "resumed_from_step": resumed_from,
+        "time": state.time,
+        "frames": frames,
+        "elapsed_seconds": elapsed,
+        "steps_per_second": computed / elapsed if elapsed > 0 else None,
+        "energy_start": energy_start,
+        "energy_end": energy_end,
+        "energy_error": abs((energy_end - energy_start) / energy_start) if energy_start else None,
+        "positions": state.positions.tolist(),
+        "velocities": state.velocities.tolist(),
+    }
@@ -0,0 +1,80 @@
+import numpy as np
+
+from physics.nbody import State
+
+
+def _random_directions(rng: np.random.Generator, n: int) -> np.ndarray:
+    v = rng.normal(size=(n, 3))
+    v /= np.linalg.norm(v, axis=1)[:, None]
+    return v
+
+
+def plummer(n: int, rng: np.random.Generator, total_mass: float = 1.0, G: float = 1.0) -> State:
+    """Plummer sphere in virial equilibrium (Aarseth, Henon & Wielen 1974 sampling)."""
+    masses = np.full(n, total_mass / n)
+    # 반경: 누적 질량 역함수, 바깥 꼬리는 잘라냄
+    x = rng.uniform(0.0, 0.999, size=n) ** (-2.0 / 3.0) - 1.0
+    radius = 1.0 / np.sqrt(x)
+    positions = radius[:, None] * _random_directions(rng, n)
+
+    # 속도: g(q) = q^2 (1 - q^2)^3.5 에 대한 rejection sampling (배치 단위)
+    q = np.empty(n)
+    pending = np.arange(n)
+    while pending.size:
+        trial = rng.uniform(0.0, 1.0, size=pending.size)
+        accept = rng.uniform(0.0, 0.1, size=pending.size) < trial**2 * (1.0 - trial**2) ** 3.5
+        q[pending[accept]] = trial[accept]
+        pending = pending[~accept]
+    escape = np.sqrt(2.0 * G * total_mass) * (1.0 + radius**2) ** -0.25
+    velocities = (q * escape)[:, None] * _random_directions(rng, n)
+
+    return _to_com_frame(State(positions, velocities, masses))
+
+
+def uniform(n: int, rng: np.random.Generator, total_mass: float = 1.0, G: float = 1.0) -> State:
+    """Cold uniform sphere of unit radius, bodies at rest."""
+    masses = np.full(n, total_mass / n)
+    radius = rng.uniform(0.0, 1.0, size=n) ** (1.0 / 3.0)
+    positions = radius[:, None] * _random_directions(rng, n)
+    return _to_com_frame(State(positions, np.zeros((n, 3)), masses))
+
+
+def disk(n: int, rng: np.random.Generator, total_mass: float = 1.0, G: float = 1.0) -> State:
+    """Thin exponential disk on circular orbits around a central mass holding half the total."""
+    central = 0.5 * total_mass
+    masses = np.full(n, (total_mass - central) / max(n - 1, 1))
+    masses[0] = central
+
+    radius = np.clip(rng.exponential(0.3, size=n), 0.05, None)
+    theta = rng.uniform(0.0, 2.0 * np.pi, size=n)
+    positions = np.stack(
+        [radius * np.cos(theta), radius * np.sin(theta), rng.normal(0.0, 0.01, size=n)], axis=1
+    )
+    # 0 번은 원점에 정지한 중심 질량
+    positions[0] = 0.0
+    # 안쪽 질량 (중심 + 더 안쪽 원반 천체) 으로 원궤도 속도 근사, 중심 질량은 한 번만 센다
+    disk_masses = masses[1:]
+    order = np.argsort(radius[1:])
+    enclosed = np.full(n, central)
+    enclosed[1:][order] += np.cumsum(disk_masses[order]) - disk_masses[order]
+    speed = np.sqrt(G * enclosed / radius)
+    velocities = np.stack(
+        [-speed * np.sin(theta), speed * np.cos(theta), np.zeros(n)], axis=1
+    )
+    velocities[0] = 0.0
+
+    return _to_com_frame(State(positions, velocities, masses))
+
+
+DISTRIBUTIONS = {
+    "plummer": plummer,
+    "uniform": uniform,
+    "disk": disk,
+}
+
+
+def _to_com_frame(state: State) -> State:
+    total = state.masses.sum()
+    state.positions -= (state.masses @ state.positions) / total
+    state.velocities -= (state.masses @ state.velocities) / total
+    return state
@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 
-from routers import auth, user, articles, simulations
+from routers import auth, user, articles, simulations, runs
 
 router = APIRouter(prefix="/api")
 
@@ -8,5 +8,6 @@ router.include_router(auth.router, prefix="/auth", tags=["auth"])
 router.include_router(user.router, prefix="/users", tags=["users"])
 router.include_router(articles.router, prefix="/articles", tags=["articles"])
 router.include_router(simulations.router, prefix="/simulations", tags=["simulations"])
+router.include_router(runs.router, prefix="/simulations", tags=["runs"])
 
 __all__ = ["router"]
@@ -1,20 +1,37 @@
+from datetime import datetime
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
-from sqlalchemy import or_
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from models.article import Article
 from models.user import User
-from schemas.article import ArticleCreate, ArticleUpdate, Articleresponse
-from utils.dependencies import get_db
-from utils.security import ALGORITHM, SECRET_KEY, get_current_user
-
-router = APIRouter()
-
-optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login", auto_error=False)
+from schemas.article import ArticleBatchResponse, ArticleCreate, ArticleRead, ArticleUpdate, Articleresponse
+from utils.batch import batch_results, parse_ids
+from utils.dependencies import get_async_db, get_read_db, replica_router
+from utils.export import NDJSON_MEDIA_TYPE, ndjson_export
+from utils.metrics import InstrumentedRoute
+from utils.pagination import NEXT_CURSOR_HEADER, encode_cursor, seek_after
+from utils.response_cache import item_tag, list_tag, make_etag, render, response_cache
+from utils.responses import ORJSONResponse
+from utils.search import get_search_backend
+from utils.security import get_current_user, get_optional_user
+
+router = APIRouter(route_class=InstrumentedRoute)
+
+
+# 목록은 ORM 객체를 만들지 않고 응답 필드 이름 그대로 Row 로 읽는다 (row._asdict() 가 곧 응답)
+_ARTICLE_COLUMNS = (
+    Article.id,
+    Article.title,
+    Article.content,
+    Article.is_public,
+    Article.author_id,
+    Article.created_at,
+    Article.updated_at,
+)
 
 
 def _serialize_article(article: Article) -> dict:
@@ -29,25 +46,10 @@ def _serialize_article(article: Article) -> dict:
     }
 
 
-def get_optional_user(
-    db: Session = Depends(get_db), token: Optional[str] = Depends(optional_oauth2_scheme)
-) -> Optional[User]:
-    if not token:
-        return None
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id = payload.get("sub")
-        if user_id is None:
-            return None
-    except JWTError:
-        return None
-    return db.query(User).filter(User.id == int(user_id)).first()
-
-
 @router.post("/", response_model=Articleresponse, status_code=status.HTTP_201_CREATED)
-def create_article(
+async def create_article(
     article_in: ArticleCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ):
     article = Article(
@@ -57,56 +59,145 @@ def create_article(
         author_id=current_user.id,
     )
     db.add(article)
-    db.commit()
-    db.refresh(article)
+    await db.flush()
+    await get_search_backend(db).index(db, article)
+    await db.commit()
+    await db.refresh(article)
+    if article.is_public:
+        response_cache.invalidate(list_tag("article"))
     return {"articleId": article.id}
 
 
-@router.get("/")
-def list_articles(
-    db: Session = Depends(get_db),
+@router.get("/", response_model=List[ArticleRead])
+async def list_articles(
+    request: Request,
+    db: AsyncSession = Depends(get_read_db),
     page: int = Query(1, ge=1),
     size: int = Query(10, ge=1, le=100),
-    q: Optional[str] = Query(None, description="검색어"),
-) -> List[dict]:
-    query = db.query(Article).filter(Article.is_public.is_(True))
+    q: Optional[str] = Query(None, description="검색어 (관련도순, page/size 로만 페이지네이션)"),
+    cursor: Optional[str] = Query(None, description="이전 응답의 X-Next-Cursor 값 (있으면 page 무시)"),
+):
     if q:
-        like = f"%{q}%"
-        query = query.filter(or_(Article.title.ilike(like), Article.content.ilike(like)))
-
-    articles = (
-        query.order_by(Article.created_at.desc())
-        .offset((page - 1) * size)
-        .limit(size)
-        .all()
+        if cursor:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail="검색 결과는 cursor 를 지원하지 않습니다."
+            )
+        articles = await get_search_backend(db).search(db, q, limit=size, offset=(page - 1) * size)
+        return ORJSONResponse([_serialize_article(article) for article in articles])
+
+    key = ("articles", page, size, cursor)
+    cached = response_cache.get(key)
+    if cached is not None:
+        return response_cache.respond(request, cached)
+    token = response_cache.begin()
+
+    query = select(*_ARTICLE_COLUMNS).where(Article.is_public.is_(True))
+    # ix_articles_public_created 순서와 동일하게 정렬해야 seek 가 인덱스를 탄다
+    query = query.order_by(Article.created_at.desc(), Article.id.desc())
+    if cursor:
+        query = query.where(seek_after([Article.created_at, Article.id], cursor))
+    else:
+        query = query.offset((page - 1) * size)
+
+    articles = (await db.execute(query.limit(size))).all()
+    headers = {}
+    if len(articles) == size:
+        last = articles[-1]
+        headers[NEXT_CURSOR_HEADER] = encode_cursor([last.created_at, last.id])
+    cached = render(
+        [article._asdict() for article in articles],
+        make_etag((article.id, article.updated_at) for article in articles),
+        headers,
     )
-    return [_serialize_article(article) for article in articles]
+    response_cache.store(
+        key,
+        cached,
+        [list_tag("article"), *(item_tag("article", article.id) for article in articles)],
+        token,
+        max_lag=replica_router.lag_window(db),
+    )
+    return response_cache.respond(request, cached, hit=False)
 
 
-@router.get("/{article_id}")
-def get_article(
+@router.get("/export", response_model=None, response_class=StreamingResponse)
+async def export_articles(
+    updated_since: Optional[datetime] = Query(None, description="이 시각 이후 수정된 글만"),
+    cursor: Optional[str] = Query(None, description="이전 export 마지막 줄의 next_cursor (이어받기)"),
+    gzip: bool = Query(False),
+):
+    """Every public article as NDJSON, oldest ``updated_at`` first."""
+    query = (
+        select(*_ARTICLE_COLUMNS)
+        .where(Article.is_public.is_(True))
+        .order_by(Article.updated_at, Article.id)
+    )
+    if updated_since is not None:
+        query = query.where(Article.updated_at >= updated_since)
+    if cursor:
+        query = query.where(seek_after([Article.updated_at, Article.id], cursor, descending=False))
+    return StreamingResponse(
+        ndjson_export(query, ("updated_at", "id"), gzip, cursor),
+        media_type=NDJSON_MEDIA_TYPE,
+        headers={"Content-Encoding": "gzip"} if gzip else None,
+    )
+
+
+@router.get("/batch", response_model=ArticleBatchResponse)
+async def get_articles_batch(
+    ids: str = Query(..., description="쉼표로 구분한 게시글 id (요청 순서대로 응답)"),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Optional[User] = Depends(get_optional_user),
+):
+    # 피드 화면의 글들을 IN 쿼리 한 번으로, 공개/작성자 규칙은 get_article 과 같다
+    article_ids = parse_ids(ids)
+    rows = await db.execute(select(*_ARTICLE_COLUMNS).where(Article.id.in_(sorted(set(article_ids)))))
+    viewer = current_user.id if current_user else None
+    results = batch_results(
+        article_ids,
+        {row.id: row._asdict() for row in rows},
+        "게시글을 찾을 수 없습니다.",
+        lambda row: row["is_public"] or (viewer is not None and row["author_id"] == viewer),
+        "비공개 게시글입니다.",
+    )
+    return ORJSONResponse({"results": results})
+
+
+@router.get("/{article_id}", response_model=ArticleRead)
+async def get_article(
     article_id: int,
-    db: Session = Depends(get_db),
+    request: Request,
+    db: AsyncSession = Depends(get_read_db),
     current_user: Optional[User] = Depends(get_optional_user),
 ):
-    article = db.query(Article).filter(Article.id == article_id).first()
+    # 공개 글만 캐시에 들어가므로 hit 이면 권한 확인도 필요 없다
+    key = item_tag("article", article_id)
+    cached = response_cache.get(key)
+    if cached is not None:
+        return response_cache.respond(request, cached)
+    token = response_cache.begin()
+
+    article = await db.get(Article, article_id)
     if not article:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="게시글을 찾을 수 없습니다.")
 
     if not article.is_public and (not current_user or current_user.id != article.author_id):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="비공개 게시글입니다.")
+    if not article.is_public:
+        return _serialize_article(article)
 
-    return _serialize_article(article)
+    cached = render(_serialize_article(article), make_etag([(article.id, article.updated_at)]))
+    response_cache.store(key, cached, [key], token, max_lag=replica_router.lag_window(db))
+    return response_cache.respond(request, cached, hit=False)
 
 
-@router.patch("/{article_id}")
-def update_article(
+@router.patch("/{article_id}", response_model=ArticleRead)
+async def update_article(
     article_id: int,
     article_in: ArticleUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ):
-    article = db.query(Article).filter(Article.id == article_id).first()
+    article = await db.get(Article, article_id)
     if not article:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="게시글을 찾을 수 없습니다.")
     if article.author_id != current_user.id:
@@ -115,23 +206,27 @@ def update_article(
     article.title = article_in.title
     article.content = article_in.content
     db.add(article)
-    db.commit()
-    db.refresh(article)
+    await get_search_backend(db).index(db, article)
+    await db.commit()
+    await db.refresh(article)
+    response_cache.invalidate(item_tag("article", article.id))
     return _serialize_article(article)
 
 
-@router.delete("/{article_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_article(
+@router.delete("/{article_id}", response_model=None, status_code=status.HTTP_204_NO_CONTENT)
+async def delete_article(
     article_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ):
-    article = db.query(Article).filter(Article.id == article_id).first()
+    article = await db.get(Article, article_id)
     if not article:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="게시글을 찾을 수 없습니다.")
     if article.author_id != current_user.id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="삭제 권한이 없습니다.")
 
-    db.delete(article)
-    db.commit()
+    await db.delete(article)
+    await get_search_backend(db).remove(db, article.id)
+    await db.commit()
+    response_cache.invalidate(item_tag("article", article_id), list_tag("article"))
     return None
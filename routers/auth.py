@@ -1,54 +1,69 @@
 from datetime import datetime
 
 from fastapi import APIRouter, Body, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from models.user import User
 from schemas.auth import Token, userLogin
 from schemas.user import userCreate
-from utils.dependencies import get_db
-from utils.security import create_access_token, hash_password, verify_password
+from utils.dependencies import get_async_db
+from utils.metrics import InstrumentedRoute
+from utils.passwords import hash_password_async, verify_password_async
+from utils.security import create_access_token
 
-router = APIRouter()
+router = APIRouter(route_class=InstrumentedRoute)
 
 
 @router.post("/register", response_model=Token, status_code=status.HTTP_201_CREATED)
-def register_user(
+async def register_user(
     user_in: userCreate,
     password: str = Body(..., embed=True, min_length=6),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    existing = db.query(User).filter(User.email == user_in.email).first()
+    existing = await db.scalar(select(User).where(User.email == user_in.email))
     if existing:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT, detail="이미 가입된 이메일입니다."
         )
+    # 해시 대기열에 있는 동안 DB 커넥션을 잡고 있지 않도록 읽기 트랜잭션을 닫는다
+    await db.commit()
 
     new_user = User(
         username=user_in.username,
         email=user_in.email,
-        hashed_password=hash_password(password),
+        # bcrypt 는 CPU 를 오래 잡으므로 전용 프로세스 풀에서 실행
+        hashed_password=await hash_password_async(password),
         created_at=user_in.created_at or datetime.utcnow(),
     )
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
 
     access_token = create_access_token({"sub": str(new_user.id)})
     return {"access_token": access_token, "token_type": "bearer"}
 
 
 @router.post("/login", response_model=Token)
-def login_user(login_in: userLogin, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == login_in.email).first()
+async def login_user(login_in: userLogin, db: AsyncSession = Depends(get_async_db)):
+    user = await db.scalar(select(User).where(User.email == login_in.email))
     if not user or not user.hashed_password:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="이메일 또는 비밀번호가 올바르지 않습니다."
         )
-    if not verify_password(login_in.password, user.hashed_password):
+    # 로그인 폭주 때 검증을 기다리는 요청들이 커넥션 풀을 다 차지하지 않도록 먼저 반납
+    # (expire_on_commit=False 라 user 는 그대로 쓸 수 있다)
+    await db.commit()
+    ok, new_hash = await verify_password_async(login_in.password, user.hashed_password)
+    if not ok:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="이메일 또는 비밀번호가 올바르지 않습니다."
         )
+    if new_hash is not None:
+        # BCRYPT_ROUNDS 가 바뀐 뒤 첫 로그인: 새 cost 로 저장
+        user.hashed_password = new_hash
+        await db.commit()
 
     access_token = create_access_token({"sub": str(user.id)})
     return {"access_token": access_token, "token_type": "bearer"}
+
@@ -0,0 +1,227 @@
+import os
+from datetime import datetime
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import SessionLocal
+from jobs.queue import (
+    FINISHED_STATUSES,
+    MAX_ACTIVE_RUNS_PER_USER,
+    QUEUED,
+    SUCCEEDED,
+    active_run_count,
+    cancel_queued,
+    request_cancel,
+    resume_totals,
+)
+from models.simulation_like import Simulation
+from models.simulation_run import SimulationRun
+from models.user import User
+from schemas.simulation import RunRead, SimulationParams
+from utils.cache import TTLCache
+from utils.dependencies import get_async_db
+from utils.metrics import InstrumentedRoute, exposition, registry
+from utils.responses import ORJSONResponse
+from utils.result_cache import params_key, result_cache
+from utils.security import get_current_user
+
+router = APIRouter(route_class=InstrumentedRoute)
+
+# 재개 통계는 simulation_runs 전체 집계라 scrape 마다 돌리지 않고 이 시간(초) 동안 재사용 (0 이면 매번)
+RESUME_METRICS_TTL_SECONDS = float(os.getenv("RESUME_METRICS_TTL_SECONDS", "300"))
+_resume_totals = TTLCache(1, RESUME_METRICS_TTL_SECONDS)
+
+
+def resume_metric_lines() -> List[str]:
+    """Checkpoint resume savings for /metrics, from the runs table (covers every worker process)."""
+    totals = _resume_totals.get("totals")
+    if totals is None:
+        # /metrics 는 threadpool 에서 렌더링되므로 sync 세션으로 집계
+        try:
+            with SessionLocal() as db:
+                totals = tuple(db.execute(resume_totals()).one())
+        except SQLAlchemyError:
+            # DB 에 못 닿으면 이 항목만 빠지고 나머지 지표는 그대로
+            return []
+        _resume_totals.set("totals", totals)
+    runs, resumed, computed, saved = totals
+    return [
+        *exposition("simulation_runs_succeeded", "gauge", "Succeeded worker runs (result cache hits excluded).", runs),
+        *exposition("simulation_runs_resumed", "gauge", "Succeeded worker runs resumed from a checkpoint.", resumed),
+        *exposition(
+            "simulation_run_steps", "gauge", "Integration steps of succeeded worker runs.",
+            {'source="computed"': computed, 'source="resumed"': saved},
+        ),
+    ]
+
+
+registry.add_collector(resume_metric_lines)
+
+
+# 목록용 컬럼 (결과 본문 제외), row._asdict() 가 곧 응답
+_RUN_LIST_COLUMNS = (
+    SimulationRun.id,
+    SimulationRun.simulation_id,
+    SimulationRun.status,
+    SimulationRun.cached,
+    SimulationRun.progress,
+    SimulationRun.steps_done,
+    SimulationRun.resumed_from_step,
+    SimulationRun.cancel_requested,
+    SimulationRun.error,
+    SimulationRun.created_at,
+    SimulationRun.started_at,
+    SimulationRun.finished_at,
+)
+
+
+def _serialize_run(run: SimulationRun) -> dict:
+    data = {
+        "id": run.id,
+        "simulation_id": run.simulation_id,
+        "status": run.status,
+        "cached": run.cached,
+        "progress": run.progress,
+        "steps_done": run.steps_done,
+        "resumed_from_step": run.resumed_from_step,
+        "cancel_requested": run.cancel_requested,
+        "error": run.error,
+        "created_at": run.created_at,
+        "started_at": run.started_at,
+        "finished_at": run.finished_at,
+    }
+    if run.status == SUCCEEDED:
+        data["result"] = run.result
+    return data
+
+
+async def _get_visible_simulation(db: AsyncSession, simulation_id: int, user: User) -> Simulation:
+    sim = await db.get(Simulation, simulation_id)
+    if not sim:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="시뮬레이션을 찾을 수 없습니다.")
+    if not sim.is_public and user.id != sim.owner_id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="비공개 시뮬레이션입니다.")
+    return sim
+
+
+async def _get_own_run(
+    db: AsyncSession, simulation_id: int, run_id: int, user: User
+) -> SimulationRun:
+    run = await db.get(SimulationRun, run_id)
+    if not run or run.simulation_id != simulation_id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="실행 기록을 찾을 수 없습니다.")
+    if run.user_id != user.id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="본인의 실행만 볼 수 있습니다.")
+    return run
+
+
+@router.post("/{simulation_id}/runs", response_model=RunRead, status_code=status.HTTP_202_ACCEPTED)
+async def enqueue_run(
+    simulation_id: int,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
+):
+    sim = await _get_visible_simulation(db, simulation_id, current_user)
+    key = params_key(SimulationParams.model_validate(sim.params))
+
+    # 같은 파라미터(+엔진 버전)의 결과가 있으면 큐를 거치지 않고 완료된 실행으로 기록
+    cached = await run_in_threadpool(result_cache.get, key)
+    if cached is not None:
+        now = datetime.utcnow()
+        run = SimulationRun(
+            simulation_id=sim.id,
+            user_id=current_user.id,
+            status=SUCCEEDED,
+            params=sim.params,
+            params_hash=key,
+            cached=True,
+            progress=1.0,
+            steps_done=cached["steps"],
+            result=cached,
+            started_at=now,
+            finished_at=now,
+        )
+        db.add(run)
+        await db.commit()
+        await db.refresh(run)
+        response.status_code = status.HTTP_200_OK
+        return _serialize_run(run)
+
+    active = await db.scalar(active_run_count(current_user.id))
+    if active >= MAX_ACTIVE_RUNS_PER_USER:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=f"대기/실행 중인 작업은 최대 {MAX_ACTIVE_RUNS_PER_USER}개까지 가능합니다.",
+        )
+
+    run = SimulationRun(
+        simulation_id=sim.id,
+        user_id=current_user.id,
+        status=QUEUED,
+        params=sim.params,
+        params_hash=key,
+    )
+    db.add(run)
+    await db.commit()
+    await db.refresh(run)
+    return _serialize_run(run)
+
+
+@router.get("/{simulation_id}/runs", response_model=List[RunRead])
+async def list_runs(
+    simulation_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
+    size: int = Query(20, ge=1, le=100),
+):
+    runs = (
+        await db.execute(
+            select(*_RUN_LIST_COLUMNS)
+            .where(
+                SimulationRun.simulation_id == simulation_id,
+                SimulationRun.user_id == current_user.id,
+            )
+            .order_by(SimulationRun.id.desc())
+            .limit(size)
+        )
+    ).all()
+    # 목록에서는 결과 본문(최종 상태)을 빼고 상태만
+    return ORJSONResponse([run._asdict() for run in runs])
+
+
+@router.get("/{simulation_id}/runs/{run_id}", response_model=RunRead)
+async def get_run(
+    simulation_id: int,
+    run_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
+):
+    run = await _get_own_run(db, simulation_id, run_id, current_user)
+    return _serialize_run(run)
+
+
+@router.post(
+    "/{simulation_id}/runs/{run_id}/cancel", response_model=RunRead, status_code=status.HTTP_202_ACCEPTED
+)
+async def cancel_run(
+    simulation_id: int,
+    run_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
+):
+    run = await _get_own_run(db, simulation_id, run_id, current_user)
+    if run.status in FINISHED_STATUSES:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="이미 종료된 실행입니다.")
+
+    # 대기 중이면 바로 취소, 실행 중이면 플래그만 세우고 worker 가 다음 frame 에서 멈춘다
+    if (await db.execute(cancel_queued(run_id))).rowcount == 0:
+        await db.execute(request_cancel(run_id))
+    await db.commit()
+    await db.refresh(run)
+    return _serialize_run(run)
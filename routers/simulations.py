@@ -1,189 +1,651 @@
+import asyncio
+import base64
+import json
+import os
+import uuid
+from datetime import datetime
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
-from sqlalchemy import func
-from sqlalchemy.orm import Session
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    WebSocket,
+    WebSocketDisconnect,
+    WebSocketException,
+    status,
+)
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from models.simulation_like import Simulation
-from models.simulation import SimulationLike
+from models.simulation_run import SimulationRun
+from models.simulation_trending import SimulationTrending
 from models.user import User
-from schemas.simulation import simulationResiter, simulation
-from utils.dependencies import get_db
-from utils.security import ALGORITHM, SECRET_KEY, get_current_user
+from jobs.queue import ACTIVE_STATUSES, SUCCEEDED
+from physics import run as run_nbody
+from physics.batch import expand_sweep, run_batch
+from schemas.simulation import (
+    LikeResponse,
+    SimulationBatchResponse,
+    SimulationParams,
+    SimulationRead,
+    SimulationUpdateResponse,
+    SweepResponse,
+    SyncRunResponse,
+    simulationResiter,
+    simulationResponse,
+    simulationSweep,
+    simulationUpdate,
+)
+from utils.batch import batch_results, parse_ids
+from utils.checkpoints import latest_checkpoint_step
+from utils.dependencies import get_async_db, get_read_db, replica_router
+from utils.export import NDJSON_MEDIA_TYPE, ndjson_export
+from utils.likes import submit_like_event
+from utils.metrics import InstrumentedRoute
+from utils.pagination import NEXT_CURSOR_HEADER, encode_cursor, seek_after
+from utils.response_cache import item_tag, list_tag, make_etag, render, response_cache
+from utils.responses import ORJSONResponse
+from utils.result_cache import params_key, trajectory_key
+from utils.security import get_current_user, get_optional_user, optional_oauth2_scheme, resolve_user
+from utils.streaming import FLAG_ABORTED, broadcaster, decode_header
+from utils.trajectory import FIELDS, TrajectoryReader, trajectory_path
 
-router = APIRouter()
+router = APIRouter(route_class=InstrumentedRoute)
 
-optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login", auto_error=False)
+# 요청 안에서 바로 계산하는 /run, /sweep 은 짧은 실행만 (대략 n_bodies^2 * steps, sweep 은 장면 수를 곱함)
+# 그 이상은 /runs 작업 큐로
+SYNC_RUN_MAX_WORK = 200_000_000
+# /frames 응답 한 번에 보내는 최대 바이트 (float32 기준)
+FRAMES_MAX_BYTES = 64 * 1024 * 1024
 
 
-def _serialize_simulation(sim: Simulation, like_count: Optional[int] = None) -> dict:
+# 목록은 ORM 객체를 만들지 않고 응답 필드 이름 그대로 Row 로 읽는다 (row._asdict() 가 곧 응답)
+_SIMULATION_COLUMNS = (
+    Simulation.id,
+    Simulation.title,
+    Simulation.params,
+    Simulation.is_public,
+    Simulation.owner_id,
+    Simulation.sweep_id,
+    Simulation.created_at,
+    Simulation.updated_at,
+    Simulation.like_count.label("likes"),
+)
+
+
+def _serialize_simulation(sim: Simulation) -> dict:
     return {
         "id": sim.id,
         "title": sim.title,
-        "data": sim.data,
-        "data2": sim.data2,
+        "params": sim.params,
         "is_public": sim.is_public,
         "owner_id": sim.owner_id,
+        "sweep_id": sim.sweep_id,
         "created_at": sim.created_at,
         "updated_at": sim.updated_at,
-        "likes": like_count if like_count is not None else len(sim.likes),
+        # 저장된 카운터를 사용 (sim.likes 를 건드리면 행마다 lazy load 가 발생)
+        "likes": sim.like_count,
     }
 
 
-def get_optional_user(
-    db: Session = Depends(get_db), token: Optional[str] = Depends(optional_oauth2_scheme)
-) -> Optional[User]:
-    if not token:
-        return None
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id = payload.get("sub")
-        if user_id is None:
-            return None
-    except JWTError:
-        return None
-    return db.query(User).filter(User.id == int(user_id)).first()
-
-
-@router.post("/", status_code=status.HTTP_201_CREATED)
-def create_simulation(
+@router.post("/", response_model=simulationResponse, status_code=status.HTTP_201_CREATED)
+async def create_simulation(
     sim_in: simulationResiter,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ):
     sim = Simulation(
         title=sim_in.title,
-        data=sim_in.data,
-        data2=sim_in.data2,
+        params=sim_in.params.model_dump(),
         is_public=sim_in.is_public,
         owner_id=current_user.id,
     )
     db.add(sim)
-    db.commit()
-    db.refresh(sim)
+    await db.commit()
+    await db.refresh(sim)
+    if sim.is_public:
+        response_cache.invalidate(list_tag("simulation"))
     return {"simulationId": sim.id}
 
 
-@router.get("/")
-def list_simulations(
-    db: Session = Depends(get_db),
+def _sweep_results(scenes: List[SimulationParams]):
+    results = run_batch(scenes)
+    # 결과 캐시에는 넣지 않는다: 배치 행렬곱은 단독 실행과 비트 단위로 같지 않고, 캐시 hit 이면
+    # /runs 가 worker 없이 끝나서 그 장면의 trajectory(/frames, /stream)가 영영 만들어지지 않는다
+    for result in results:
+        result["trajectory"] = False
+    return [params_key(params) for params in scenes], results
+
+
+@router.post("/sweep", response_model=SweepResponse, status_code=status.HTTP_201_CREATED)
+async def create_sweep(
+    sweep_in: simulationSweep,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Create one Simulation per point of the parameter grid and run them all as
+    a single batched computation (``physics.batch``).
+    """
+    try:
+        scenes, labels = expand_sweep(sweep_in.base, sweep_in.axes)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    base = scenes[0]
+    if len(scenes) * base.n_bodies**2 * base.steps > SYNC_RUN_MAX_WORK:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=(
+                "sweep 계산량이 너무 큽니다. 장면 수, n_bodies 또는 steps 를 줄이거나, "
+                "시뮬레이션을 따로 만들어 POST /api/simulations/{id}/runs 로 요청하세요."
+            ),
+        )
+
+    keys, results = await run_in_threadpool(_sweep_results, scenes)
+
+    # 장면 row 를 INSERT 한 번(executemany)으로 넣고, sweep_id 로 id 를 다시 읽는다
+    # (MySQL 은 RETURNING 이 없어서 ORM 이 row 마다 INSERT 하게 되는 것을 피함)
+    sweep_id = uuid.uuid4().hex
+    now = datetime.utcnow()
+    await db.execute(
+        insert(Simulation),
+        [
+            {
+                "title": f"{sweep_in.title} [{i + 1}/{len(scenes)}]",
+                "params": params.model_dump(),
+                "is_public": sweep_in.is_public,
+                "owner_id": current_user.id,
+                "sweep_id": sweep_id,
+                "sweep_index": i,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for i, params in enumerate(scenes)
+        ],
+    )
+    ids = (
+        await db.scalars(
+            select(Simulation.id)
+            .where(Simulation.sweep_id == sweep_id)
+            .order_by(Simulation.sweep_index)
+        )
+    ).all()
+    await db.execute(
+        insert(SimulationRun),
+        [
+            {
+                "simulation_id": sim_id,
+                "user_id": current_user.id,
+                "status": SUCCEEDED,
+                "params": params.model_dump(),
+                "params_hash": key,
+                "progress": 1.0,
+                "steps_done": result["steps"],
+                "result": result,
+                "started_at": now,
+                "finished_at": now,
+            }
+            for sim_id, params, key, result in zip(ids, scenes, keys, results)
+        ],
+    )
+    await db.commit()
+    if sweep_in.is_public:
+        response_cache.invalidate(list_tag("simulation"))
+
+    summary_keys = ("time", "energy_start", "energy_end", "energy_error")
+    return {
+        "sweepId": sweep_id,
+        "scenes": [
+            {
+                "simulationId": sim_id,
+                "values": values,
+                **{key: result[key] for key in summary_keys},
+            }
+            for sim_id, values, result in zip(ids, labels, results)
+        ],
+    }
+
+
+@router.get("/", response_model=List[SimulationRead])
+async def list_simulations(
+    request: Request,
+    db: AsyncSession = Depends(get_read_db),
     page: int = Query(1, ge=1),
     size: int = Query(10, ge=1, le=100),
-    sort: str = Query("latest", pattern="^(latest|likes)$"),
-) -> List[dict]:
+    sort: str = Query("latest", pattern="^(latest|likes|trending)$"),
+    cursor: Optional[str] = Query(None, description="이전 응답의 X-Next-Cursor 값 (있으면 page 무시)"),
+):
+    key = ("simulations", sort, page, size, cursor)
+    cached = response_cache.get(key)
+    if cached is not None:
+        return response_cache.respond(request, cached)
+    token = response_cache.begin()
+
     offset = (page - 1) * size
-    if sort == "likes":
+    query = select(*_SIMULATION_COLUMNS).where(Simulation.is_public.is_(True))
+    if sort == "trending":
+        # utils/trending.py 가 미리 계산한 순위표의 ix_simulation_trending_score 를 따라 읽고
+        # 시뮬레이션은 PK 로 조회 (최근 좋아요가 없는 시뮬레이션은 나오지 않음).
+        # 통계가 없으면 옵티마이저가 simulations 부터 읽고 정렬하므로 순위표를 바깥 루프로 고정
+        # (SQLite: LEFT JOIN, MySQL: STRAIGHT_JOIN)
+        order = [SimulationTrending.score, SimulationTrending.simulation_id]
         query = (
-            db.query(Simulation, func.count(SimulationLike.id).label("like_count"))
-            .outerjoin(SimulationLike, Simulation.id == SimulationLike.simulation_id)
-            .filter(Simulation.is_public.is_(True))
-            .group_by(Simulation.id)
-            .order_by(func.count(SimulationLike.id).desc(), Simulation.created_at.desc())
+            query.add_columns(SimulationTrending.score)
+            .select_from(SimulationTrending)
+            .outerjoin(Simulation, SimulationTrending.simulation_id == Simulation.id)
+            .prefix_with("STRAIGHT_JOIN", dialect="mysql")
         )
-        rows = query.offset(offset).limit(size).all()
-        return [
-            _serialize_simulation(sim, like_count=like_count) for sim, like_count in rows
-        ]
-
-    sims = (
-        db.query(Simulation)
-        .filter(Simulation.is_public.is_(True))
-        .order_by(Simulation.created_at.desc())
-        .offset(offset)
-        .limit(size)
-        .all()
+    elif sort == "likes":
+        # ix_simulations_public_likes 를 그대로 따라 읽는 range scan
+        order = [Simulation.like_count, Simulation.created_at, Simulation.id]
+    else:
+        order = [Simulation.created_at, Simulation.id]
+    query = query.order_by(*(column.desc() for column in order))
+    if cursor:
+        query = query.where(seek_after(order, cursor))
+    else:
+        query = query.offset(offset)
+
+    sims = (await db.execute(query.limit(size))).all()
+    headers = {}
+    if len(sims) == size:
+        last = sims[-1]
+        if sort == "trending":
+            values = [last.score, last.id]
+        else:
+            values = ([last.likes] if sort == "likes" else []) + [last.created_at, last.id]
+        headers[NEXT_CURSOR_HEADER] = encode_cursor(values)
+    items = [sim._asdict() for sim in sims]
+    if sort == "trending":
+        for item in items:
+            del item["score"]
+    cached = render(
+        items,
+        make_etag((sim.id, sim.updated_at, sim.likes) for sim in sims),
+        headers,
+    )
+    response_cache.store(
+        key,
+        cached,
+        [
+            list_tag("simulation"),
+            list_tag("simulation", sort),
+            *(item_tag("simulation", sim.id) for sim in sims),
+        ],
+        token,
+        max_lag=replica_router.lag_window(db),
     )
-    return [_serialize_simulation(sim) for sim in sims]
+    return response_cache.respond(request, cached, hit=False)
 
 
-@router.get("/{simulation_id}")
-def get_simulation(
+@router.get("/export", response_model=None, response_class=StreamingResponse)
+async def export_simulations(
+    updated_since: Optional[datetime] = Query(None, description="이 시각 이후 수정된 시뮬레이션만"),
+    cursor: Optional[str] = Query(None, description="이전 export 마지막 줄의 next_cursor (이어받기)"),
+    gzip: bool = Query(False),
+):
+    """
+    Every public simulation as NDJSON, oldest ``updated_at`` first.
+
+    Likes do not touch ``updated_at``, so incremental pulls do not pick up
+    ``likes`` changes on their own.
+    """
+    query = (
+        select(*_SIMULATION_COLUMNS)
+        .where(Simulation.is_public.is_(True))
+        .order_by(Simulation.updated_at, Simulation.id)
+    )
+    if updated_since is not None:
+        query = query.where(Simulation.updated_at >= updated_since)
+    if cursor:
+        query = query.where(
+            seek_after([Simulation.updated_at, Simulation.id], cursor, descending=False)
+        )
+    return StreamingResponse(
+        ndjson_export(query, ("updated_at", "id"), gzip, cursor),
+        media_type=NDJSON_MEDIA_TYPE,
+        headers={"Content-Encoding": "gzip"} if gzip else None,
+    )
+
+
+@router.get("/batch", response_model=SimulationBatchResponse)
+async def get_simulations_batch(
+    ids: str = Query(..., description="쉼표로 구분한 시뮬레이션 id (요청 순서대로 응답)"),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Optional[User] = Depends(get_optional_user),
+):
+    # 피드 화면의 시뮬레이션들을 IN 쿼리 한 번으로, 공개/소유자 규칙은 get_simulation 과 같다
+    simulation_ids = parse_ids(ids)
+    rows = await db.execute(
+        select(*_SIMULATION_COLUMNS).where(Simulation.id.in_(sorted(set(simulation_ids))))
+    )
+    viewer = current_user.id if current_user else None
+    results = batch_results(
+        simulation_ids,
+        {row.id: row._asdict() for row in rows},
+        "시뮬레이션을 찾을 수 없습니다.",
+        lambda row: row["is_public"] or (viewer is not None and row["owner_id"] == viewer),
+        "비공개 시뮬레이션입니다.",
+    )
+    return ORJSONResponse({"results": results})
+
+
+@router.get("/{simulation_id}", response_model=SimulationRead)
+async def get_simulation(
     simulation_id: int,
-    db: Session = Depends(get_db),
+    request: Request,
+    db: AsyncSession = Depends(get_read_db),
     current_user: Optional[User] = Depends(get_optional_user),
 ):
-    sim = db.query(Simulation).filter(Simulation.id == simulation_id).first()
+    # 공개 시뮬레이션만 캐시에 들어가므로 hit 이면 권한 확인도 필요 없다
+    key = item_tag("simulation", simulation_id)
+    cached = response_cache.get(key)
+    if cached is not None:
+        return response_cache.respond(request, cached)
+    token = response_cache.begin()
+
+    sim = await db.get(Simulation, simulation_id)
     if not sim:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="시뮬레이션을 찾을 수 없습니다.")
     if not sim.is_public and (not current_user or current_user.id != sim.owner_id):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="비공개 시뮬레이션입니다.")
-    return _serialize_simulation(sim)
+    if not sim.is_public:
+        return _serialize_simulation(sim)
+
+    cached = render(
+        _serialize_simulation(sim), make_etag([(sim.id, sim.updated_at, sim.like_count)])
+    )
+    response_cache.store(key, cached, [key], token, max_lag=replica_router.lag_window(db))
+    return response_cache.respond(request, cached, hit=False)
+
+
+async def _active_run_id(db: AsyncSession, simulation_id: int) -> int:
+    """Newest queued/running run of the simulation; every viewer shares its frames."""
+    run_id = await db.scalar(
+        select(SimulationRun.id)
+        .where(
+            SimulationRun.simulation_id == simulation_id,
+            SimulationRun.status.in_(ACTIVE_STATUSES),
+        )
+        .order_by(SimulationRun.id.desc())
+        .limit(1)
+    )
+    if run_id is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="진행 중인 실행이 없습니다.")
+    return run_id
 
 
-@router.patch("/{simulation_id}")
-def update_simulation(
+@router.websocket("/{simulation_id}/stream")
+async def stream_simulation(
+    websocket: WebSocket,
     simulation_id: int,
-    sim_in: simulation,
-    db: Session = Depends(get_db),
+    fps: float = Query(15, gt=0, le=60),
+    token: Optional[str] = Query(None, description="비공개 시뮬레이션이면 access token"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Push binary frames of the simulation's active run.
+
+    Each message is ``utils.streaming.FRAME_HEADER`` followed by float32
+    positions. The stream ends after a frame flagged final (or aborted).
+    """
+    sim = await db.get(Simulation, simulation_id)
+    if not sim:
+        raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION, reason="시뮬레이션을 찾을 수 없습니다.")
+    if not sim.is_public:
+        user = await resolve_user(db, token)
+        if not user or user.id != sim.owner_id:
+            raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION, reason="비공개 시뮬레이션입니다.")
+    try:
+        run_id = await _active_run_id(db, simulation_id)
+    except HTTPException as e:
+        raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION, reason=e.detail)
+    # 스트리밍 동안 커넥션을 붙잡지 않도록 세션을 먼저 닫는다
+    await db.close()
+
+    await websocket.accept()
+    sub = broadcaster.subscribe(run_id, fps)
+    # 클라이언트가 보내는 것은 없지만, 끊김을 알아채려면 receive 를 같이 기다려야 한다
+    disconnected = asyncio.create_task(websocket.receive())
+    try:
+        while True:
+            next_frame = asyncio.create_task(sub.queue.get())
+            done, _ = await asyncio.wait(
+                {next_frame, disconnected}, return_when=asyncio.FIRST_COMPLETED
+            )
+            if disconnected in done:
+                next_frame.cancel()
+                return
+            frame = next_frame.result()
+            if frame is None:
+                await websocket.close()
+                return
+            await websocket.send_bytes(frame)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        disconnected.cancel()
+        broadcaster.unsubscribe(run_id, sub)
+
+
+@router.get("/{simulation_id}/stream/sse", response_model=None, response_class=StreamingResponse)
+async def stream_simulation_sse(
+    simulation_id: int,
+    request: Request,
+    fps: float = Query(15, gt=0, le=60),
+    db: AsyncSession = Depends(get_async_db),
+    token: Optional[str] = Depends(optional_oauth2_scheme),
+):
+    """SSE fallback: the same frames, base64 encoded, as ``event: frame``."""
+    sim = await db.get(Simulation, simulation_id)
+    if not sim:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="시뮬레이션을 찾을 수 없습니다.")
+    # 방금 들어간 실행을 찾아야 하므로 primary 세션 하나로 권한 확인까지 (WS 와 같은 방식)
+    if not sim.is_public:
+        user = await resolve_user(db, token)
+        if not user or user.id != sim.owner_id:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="비공개 시뮬레이션입니다.")
+    run_id = await _active_run_id(db, simulation_id)
+    await db.close()
+
+    async def events():
+        # 본문을 실제로 내보낼 때 구독: 응답이 한 번도 iterate 되지 않으면 (전송 전 끊김 등) 구독도 없다
+        sub = None
+        try:
+            sub = broadcaster.subscribe(run_id, fps)
+            yield f"event: run\ndata: {json.dumps({'runId': run_id})}\n\n"
+            while not await request.is_disconnected():
+                try:
+                    frame = await asyncio.wait_for(sub.queue.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                if frame is None:
+                    yield "event: end\ndata: {}\n\n"
+                    return
+                if decode_header(frame)["flags"] & FLAG_ABORTED:
+                    yield "event: aborted\ndata: {}\n\n"
+                    continue
+                yield f"event: frame\ndata: {base64.b64encode(frame).decode()}\n\n"
+        finally:
+            if sub is not None:
+                broadcaster.unsubscribe(run_id, sub)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.patch("/{simulation_id}", response_model=SimulationUpdateResponse)
+async def update_simulation(
+    simulation_id: int,
+    sim_in: simulationUpdate,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ):
-    sim = db.query(Simulation).filter(Simulation.id == simulation_id).first()
+    sim = await db.get(Simulation, simulation_id)
     if not sim:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="시뮬레이션을 찾을 수 없습니다.")
     if sim.owner_id != current_user.id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="수정 권한이 없습니다.")
 
-    sim.title = sim_in.title
+    if sim_in.title is not None:
+        sim.title = sim_in.title
+    visibility_changed = sim_in.is_public is not None and sim_in.is_public != sim.is_public
+    if sim_in.is_public is not None:
+        sim.is_public = sim_in.is_public
+
+    # 결과/trajectory 는 params 해시, 체크포인트는 trajectory_key 로 저장되므로 지울 것은 없다.
+    # 바뀐 키만 새로 계산이 필요하고, steps/output_stride 만 바뀌었으면 체크포인트를 이어 쓴다
+    invalidated = {"result": False, "checkpoints": False, "resume_from_step": None}
+    if sim_in.params is not None:
+        old = SimulationParams.model_validate(sim.params)
+        new = sim_in.params
+        if params_key(old) != params_key(new):
+            invalidated["result"] = True
+            if trajectory_key(old) != trajectory_key(new):
+                invalidated["checkpoints"] = True
+            else:
+                invalidated["resume_from_step"] = await run_in_threadpool(
+                    latest_checkpoint_step, trajectory_key(new), new.steps
+                )
+            sim.params = new.model_dump()
+
     db.add(sim)
-    db.commit()
-    db.refresh(sim)
-    return _serialize_simulation(sim)
+    await db.commit()
+    await db.refresh(sim)
+    # 공개 여부가 바뀌면 목록 구성 자체가 바뀐다
+    if visibility_changed:
+        response_cache.invalidate(item_tag("simulation", sim.id), list_tag("simulation"))
+    else:
+        response_cache.invalidate(item_tag("simulation", sim.id))
+    return {**_serialize_simulation(sim), "invalidated": invalidated}
 
 
-@router.post("/{simulation_id}/like")
-def like_simulation(
+@router.post("/{simulation_id}/run", response_model=SyncRunResponse)
+async def run_simulation(
     simulation_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ):
-    sim = db.query(Simulation).filter(Simulation.id == simulation_id).first()
+    sim = await db.get(Simulation, simulation_id)
     if not sim:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="시뮬레이션을 찾을 수 없습니다.")
+    if not sim.is_public and current_user.id != sim.owner_id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="비공개 시뮬레이션입니다.")
 
-    existing = (
-        db.query(SimulationLike)
-        .filter(
-            SimulationLike.simulation_id == simulation_id,
-            SimulationLike.user_id == current_user.id,
+    params = SimulationParams.model_validate(sim.params)
+    if params.n_bodies**2 * params.steps > SYNC_RUN_MAX_WORK:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="계산량이 큰 실행은 POST /api/simulations/{id}/runs 로 요청하세요.",
         )
-        .first()
-    )
-    if existing:
-        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="이미 좋아요를 눌렀습니다.")
+    # NumPy 연산은 GIL 을 놓지만 Python 루프 부분은 이벤트 루프를 막으므로 threadpool 에서 실행
+    result = await run_in_threadpool(run_nbody, params)
+    return {"simulationId": sim.id, **result}
 
-    like = SimulationLike(user_id=current_user.id, simulation_id=simulation_id)
-    db.add(like)
-    db.commit()
 
-    like_count = (
-        db.query(SimulationLike).filter(SimulationLike.simulation_id == simulation_id).count()
-    )
-    return {"simulationId": simulation_id, "likes": like_count}
+def _read_frames(path: str, start: int, stop: Optional[int], stride: int, fields: List[str]):
+    reader = TrajectoryReader(path)
+    frames = reader.frame_indices(start, stop, stride)
+    if len(frames) * len(fields) * reader.n_bodies * 3 * 4 > FRAMES_MAX_BYTES:
+        return reader, frames, None
+    return reader, frames, reader.read(frames, fields)
 
 
-@router.delete("/{simulation_id}/like")
-def unlike_simulation(
+@router.get("/{simulation_id}/frames", response_model=None, response_class=Response)
+async def get_frames(
     simulation_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Optional[User] = Depends(get_optional_user),
+    start: int = Query(0, ge=0),
+    stop: Optional[int] = Query(None, ge=0),
+    stride: int = Query(1, ge=1),
+    fields: str = Query("positions", description="positions,velocities 중 쉼표로 구분"),
+    format: str = Query("binary", pattern="^(binary|json)$"),
 ):
-    like = (
-        db.query(SimulationLike)
-        .filter(
-            SimulationLike.simulation_id == simulation_id,
-            SimulationLike.user_id == current_user.id,
+    sim = await db.get(Simulation, simulation_id)
+    if not sim:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="시뮬레이션을 찾을 수 없습니다.")
+    if not sim.is_public and (not current_user or current_user.id != sim.owner_id):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="비공개 시뮬레이션입니다.")
+
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    if not names or any(name not in FIELDS for name in names):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="fields 는 positions, velocities 만 가능합니다.")
+
+    # trajectory 는 params 해시로 저장되므로 같은 파라미터의 포크도 같은 파일을 읽는다
+    path = trajectory_path(params_key(SimulationParams.model_validate(sim.params)))
+    if not os.path.exists(path):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="저장된 trajectory 가 없습니다. 먼저 실행하세요.")
+
+    reader, frames, data = await run_in_threadpool(_read_frames, path, start, stop, stride, names)
+    if data is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="요청한 frame 범위가 너무 큽니다. stride 를 늘리거나 범위를 줄이세요.",
         )
-        .first()
-    )
-    if not like:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="좋아요한 기록이 없습니다.")
 
-    db.delete(like)
-    db.commit()
+    headers = {
+        "Accept-Ranges": "frames",
+        "Content-Range": (
+            f"frames {frames.start}-{frames[-1]}/{reader.n_frames}"
+            if len(frames)
+            else f"frames */{reader.n_frames}"
+        ),
+    }
+    if format == "json":
+        body = {
+            "simulationId": sim.id,
+            "n_bodies": reader.n_bodies,
+            "total_frames": reader.n_frames,
+            "frames": list(frames),
+            "steps": reader.steps[frames.start : frames.stop : frames.step].tolist(),
+            "times": reader.times[frames.start : frames.stop : frames.step].tolist(),
+            **{name: data[:, j].tolist() for j, name in enumerate(names)},
+        }
+        return Response(json.dumps(body), media_type="application/json", headers=headers)
+
+    # 바이너리: little-endian float32, shape (frames, fields, n_bodies, 3)
+    headers["X-Frame-Shape"] = ",".join(str(dim) for dim in data.shape)
+    headers["X-Frame-Fields"] = ",".join(names)
+    return Response(data.tobytes(), media_type="application/octet-stream", headers=headers)
 
-    like_count = (
-        db.query(SimulationLike).filter(SimulationLike.simulation_id == simulation_id).count()
-    )
+
+@router.post("/{simulation_id}/like", response_model=LikeResponse)
+async def like_simulation(
+    simulation_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
+):
+    # INSERT 한 번으로 처리: 중복은 unique 제약이 걸러서 무시된다
+    changed, like_count = await submit_like_event(db, current_user.id, simulation_id, True)
+    if like_count is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="시뮬레이션을 찾을 수 없습니다.")
+    if not changed:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="이미 좋아요를 눌렀습니다.")
+    # like_count 는 상세와 그 시뮬레이션이 든 목록, 그리고 좋아요순 정렬 전체에 영향
+    response_cache.invalidate(item_tag("simulation", simulation_id), list_tag("simulation", "likes"))
+    return {"simulationId": simulation_id, "likes": like_count}
+
+
+@router.delete("/{simulation_id}/like", response_model=LikeResponse)
+async def unlike_simulation(
+    simulation_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
+):
+    changed, like_count = await submit_like_event(db, current_user.id, simulation_id, False)
+    if not changed:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="좋아요한 기록이 없습니다.")
+    response_cache.invalidate(item_tag("simulation", simulation_id), list_tag("simulation", "likes"))
     return {"simulationId": simulation_id, "likes": like_count}
@@ -1,11 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from models.user import User
-from utils.dependencies import get_db
+from schemas.user import UserBatchRequest, UserBatchResponse, UserPurgeResponse, UserRead
+from utils.batch import batch_results, check_ids
+from utils.dependencies import get_async_db, get_read_db
+from utils.metrics import InstrumentedRoute
+from utils.purge import purge_user, purge_user_task, purges_in_progress
+from utils.responses import ORJSONResponse
 from utils.security import get_current_user
 
-router = APIRouter()
+router = APIRouter(route_class=InstrumentedRoute)
 
 
 def _serialize_user(user: User) -> dict:
@@ -17,14 +23,55 @@ def _serialize_user(user: User) -> dict:
     }
 
 
-@router.get("/me")
-def read_me(current_user: User = Depends(get_current_user)):
+@router.get("/me", response_model=UserRead)
+async def read_me(current_user: User = Depends(get_current_user)):
     return _serialize_user(current_user)
 
 
-@router.get("/{user_id}")
-def read_user(user_id: int, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.id == user_id).first()
+@router.delete("/me", response_model=UserPurgeResponse)
+async def delete_me(
+    response: Response,
+    background_tasks: BackgroundTasks,
+    # 큰 계정은 background=true: 응답(202) 뒤에 같은 프로세스에서 조각 단위로 지운다
+    background: bool = Query(False),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    user_id = current_user.id
+    if user_id in purges_in_progress:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="이미 삭제 중인 계정입니다.")
+    purges_in_progress.add(user_id)
+    if background:
+        # 요청 세션의 커넥션은 먼저 반납 (삭제 작업은 자기 세션을 연다)
+        await db.commit()
+        background_tasks.add_task(purge_user_task, user_id)
+        response.status_code = status.HTTP_202_ACCEPTED
+        return {"userId": user_id, "status": "scheduled"}
+    try:
+        deleted = await purge_user(db, user_id)
+    finally:
+        purges_in_progress.discard(user_id)
+    return {"userId": user_id, "status": "deleted", "deleted": deleted}
+
+
+@router.post("/batch", response_model=UserBatchResponse)
+async def read_users_batch(batch_in: UserBatchRequest, db: AsyncSession = Depends(get_read_db)):
+    # 피드의 작성자들을 IN 쿼리 한 번으로 (공개 프로필이라 권한 확인 없음)
+    user_ids = check_ids(batch_in.ids)
+    rows = await db.execute(
+        select(User.id, User.username, User.email, User.created_at).where(
+            User.id.in_(sorted(set(user_ids)))
+        )
+    )
+    results = batch_results(
+        user_ids, {row.id: row._asdict() for row in rows}, "사용자를 찾을 수 없습니다."
+    )
+    return ORJSONResponse({"results": results})
+
+
+@router.get("/{user_id}", response_model=UserRead)
+async def read_user(user_id: int, db: AsyncSession = Depends(get_read_db)):
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="사용자를 찾을 수 없습니다.")
     return _serialize_user(user)
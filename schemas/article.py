@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 from pydantic import BaseModel
 
 
@@ -17,4 +17,27 @@ class ArticleUpdate(ArticleBase):
     pass
 
 class Articleresponse(BaseModel):
-    articleId: int
\ No newline at end of file
+    articleId: int
+
+
+class ArticleRead(BaseModel):
+    # 목록/상세 응답
+    id: int
+    title: str
+    content: str
+    is_public: bool
+    author_id: Optional[int]
+    created_at: datetime
+    updated_at: datetime
+
+
+class ArticleBatchItem(BaseModel):
+    # 요청한 id 순서대로, 단건 조회와 같은 status / detail
+    id: int
+    status: int
+    data: Optional[ArticleRead] = None
+    detail: Optional[str] = None
+
+
+class ArticleBatchResponse(BaseModel):
+    results: List[ArticleBatchItem]
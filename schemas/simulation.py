@@ -1,16 +1,165 @@
 from datetime import datetime
-from typing import Optional
-from pydantic import BaseModel
+from typing import Any, Dict, List, Literal, Optional, Tuple, Union
+from pydantic import BaseModel, Field, model_validator
+
+Vector = Tuple[float, float, float]
+
+
+class Body(BaseModel):
+    mass: float = Field(..., gt=0)
+    position: Vector
+    velocity: Vector = (0.0, 0.0, 0.0)
+
+
+class SimulationParams(BaseModel):
+    # 초기 조건: bodies 를 직접 넘기거나, distribution 으로 n_bodies 개를 생성
+    bodies: Optional[List[Body]] = Field(None, max_length=200_000)  # n_bodies 와 같은 상한
+    n_bodies: int = Field(2, ge=1, le=200_000)
+    distribution: Literal["plummer", "uniform", "disk"] = "plummer"
+    seed: int = 0
+    total_mass: float = Field(1.0, gt=0)
+
+    # 적분 설정 (단위계는 G 로 조절, 기본 N-body 단위 G=1)
+    G: float = Field(1.0, gt=0)
+    dt: float = Field(0.01, gt=0)
+    steps: int = Field(1000, ge=1, le=1_000_000)
+    softening: float = Field(0.01, ge=0)
+    output_stride: int = Field(10, ge=1)
+
+    # 힘 계산: direct = O(N^2) 정확한 합, barnes_hut = O(N log N) 근사 (theta 가 클수록 빠르고 부정확)
+    method: Literal["direct", "barnes_hut"] = "direct"
+    theta: float = Field(0.5, ge=0, le=1.5)
+
+    @model_validator(mode="after")
+    def _sync_n_bodies(self):
+        if self.bodies is not None:
+            if not self.bodies:
+                raise ValueError("bodies 는 비어 있을 수 없습니다.")
+            self.n_bodies = len(self.bodies)
+        return self
+
 
 class simulation(BaseModel):
     title: str
 
 class simulationResiter(simulation):
-    #이건 너가 말했듯이 시뮬레이션 설정값을 받아와야 하는데 그거 어떻게 할지는 의논이 필요할거 같아서 ㅎㅎ
-    data: int
-    data2: int
+    # data/data2 대신 실제 시뮬레이션 설정값
+    params: SimulationParams
     is_public: bool
     pass
 
+class simulationUpdate(BaseModel):
+    # 보낸 필드만 변경
+    title: Optional[str] = None
+    params: Optional[SimulationParams] = None
+    is_public: Optional[bool] = None
+
+
+class SweepRange(BaseModel):
+    # numpy.linspace(start, stop, num)
+    start: float
+    stop: float
+    num: int = Field(..., ge=1, le=256)
+
+
+class simulationSweep(simulation):
+    # title 은 각 장면 제목의 접두어, axes 키는 params 경로 (예: "G", "bodies.1.mass")
+    base: SimulationParams
+    axes: Dict[str, Union[List[float], SweepRange]]
+    is_public: bool = True
+
+
 class simulationResponse(BaseModel):
-    simulationId: int
\ No newline at end of file
+    simulationId: int
+
+
+class SimulationRead(BaseModel):
+    id: int
+    title: str
+    # 저장할 때 이미 SimulationParams 로 검증했으므로 응답에서는 다시 검증하지 않는다
+    params: Dict[str, Any]
+    is_public: bool
+    owner_id: Optional[int]
+    sweep_id: Optional[str]
+    created_at: datetime
+    updated_at: datetime
+    likes: int
+
+
+class SimulationBatchItem(BaseModel):
+    # 요청한 id 순서대로, 단건 조회와 같은 status / detail
+    id: int
+    status: int
+    data: Optional[SimulationRead] = None
+    detail: Optional[str] = None
+
+
+class SimulationBatchResponse(BaseModel):
+    results: List[SimulationBatchItem]
+
+
+class InvalidatedResult(BaseModel):
+    # PATCH 로 params 가 바뀌었을 때 다시 계산해야 하는 것
+    result: bool
+    checkpoints: bool
+    resume_from_step: Optional[int]
+
+
+class SimulationUpdateResponse(SimulationRead):
+    invalidated: InvalidatedResult
+
+
+class LikeResponse(BaseModel):
+    simulationId: int
+    likes: int
+
+
+class SweepScene(BaseModel):
+    simulationId: int
+    values: Dict[str, float]
+    time: float
+    energy_start: float
+    energy_end: float
+    energy_error: Optional[float]
+
+
+class SweepResponse(BaseModel):
+    sweepId: str
+    scenes: List[SweepScene]
+
+
+class RunResult(BaseModel):
+    # physics.run 결과 (동기 /run, 완료된 작업의 result)
+    n_bodies: int
+    steps: int
+    resumed_from_step: int = 0
+    time: float
+    frames: int
+    elapsed_seconds: float
+    steps_per_second: Optional[float]
+    energy_start: float
+    energy_end: float
+    energy_error: Optional[float]
+    positions: List[Vector]
+    velocities: List[Vector]
+
+
+class SyncRunResponse(RunResult):
+    simulationId: int
+
+
+class RunRead(BaseModel):
+    id: int
+    simulation_id: int
+    status: str
+    cached: bool
+    progress: float
+    steps_done: int
+    resumed_from_step: int
+    cancel_requested: bool
+    error: Optional[str]
+    created_at: datetime
+    started_at: Optional[datetime]
+    finished_at: Optional[datetime]
+    # 성공한 실행의 상세 조회에서만 포함
+    result: Optional[Dict[str, Any]] = None
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Optional
+from typing import Dict, List, Literal, Optional
 from pydantic import BaseModel, EmailStr
 
 class userCreate(BaseModel):
@@ -7,3 +7,34 @@ class userCreate(BaseModel):
     username: str
     email: EmailStr
     created_at: datetime
+
+
+class UserRead(BaseModel):
+    # 공개 프로필 응답
+    id: int
+    username: str
+    email: EmailStr
+    created_at: datetime
+
+
+class UserBatchRequest(BaseModel):
+    ids: List[int]
+
+
+class UserBatchItem(BaseModel):
+    # 요청한 id 순서대로, 단건 조회와 같은 status / detail
+    id: int
+    status: int
+    data: Optional[UserRead] = None
+    detail: Optional[str] = None
+
+
+class UserBatchResponse(BaseModel):
+    results: List[UserBatchItem]
+
+
+class UserPurgeResponse(BaseModel):
+    # 계정 삭제: background 면 status="scheduled" 이고 deleted 는 없음
+    userId: int
+    status: Literal["deleted", "scheduled"]
+    deleted: Optional[Dict[str, int]] = None
@@ -0,0 +1,93 @@
+import itertools
+import os
+import tempfile
+
+import pytest
+
+# 모듈이 import 시점에 환경 변수를 읽으므로 앱을 import 하기 전에 설정
+_DB_DIR = tempfile.mkdtemp(prefix="gravity-test-")
+os.environ.update(
+    DB_MODE="async",
+    DATABASE_URL=f"sqlite:///{_DB_DIR}/test.db",
+    RESPONSE_CACHE_BYTES="0",
+    JOB_WORKER="off",
+    TRENDING_REFRESH_SECONDS="0",
+    BCRYPT_ROUNDS="4",
+    PASSWORD_POOL="thread",
+)
+
+
+@pytest.fixture(scope="session")
+def client():
+    from fastapi.testclient import TestClient
+
+    import main
+    from database import Base, engine
+
+    Base.metadata.create_all(bind=engine)
+    with TestClient(main.app) as client:
+        yield client
+
+
+@pytest.fixture(scope="session")
+def auth_headers(client) -> dict:
+    response = client.post(
+        "/api/auth/register",
+        json={
+            "user_in": {"username": "owner", "email": "owner@x.com", "created_at": "2024-01-01T00:00:00"},
+            "password": "secret1",
+        },
+    )
+    assert response.status_code == 201, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.fixture(scope="session")
+def simulation_ids(client, auth_headers) -> list:
+    ids = []
+    for i in range(30):
+        response = client.post(
+            "/api/simulations/",
+            json={"title": f"scene {i}", "params": {"n_bodies": 2}, "is_public": True},
+            headers=auth_headers,
+        )
+        assert response.status_code == 201, response.text
+        ids.append(response.json()["simulationId"])
+    return ids
+
+
+@pytest.fixture(scope="session")
+def new_user(client):
+    """Factory: register a fresh user, return ``(user_id, headers)``."""
+    numbers = itertools.count()
+
+    def register():
+        name = f"user{next(numbers)}"
+        response = client.post(
+            "/api/auth/register",
+            json={
+                "user_in": {"username": name, "email": f"{name}@x.com", "created_at": "2024-01-01T00:00:00"},
+                "password": "secret1",
+            },
+        )
+        assert response.status_code == 201, response.text
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        return client.get("/api/users/me", headers=headers).json()["id"], headers
+
+    return register
+
+
+@pytest.fixture(scope="session")
+def new_simulation(client):
+    """Factory: create a public simulation owned by ``headers``, return its id."""
+
+    def create(headers, title="scene", is_public=True):
+        response = client.post(
+            "/api/simulations/",
+            json={"title": title, "params": {"n_bodies": 2}, "is_public": is_public},
+            headers=headers,
+        )
+        assert response.status_code == 201, response.text
+        return response.json()["simulationId"]
+
+    return create
@@ -0,0 +1,101 @@
+"""
+Like/unlike guarantees (``utils.likes``): idempotent writes and a
+``like_count`` that always equals the number of ``simulation_likes`` rows.
+"""
+import asyncio
+
+from sqlalchemy import func, select
+
+from database import AsyncSessionLocal
+from models.simulation import SimulationLike
+from models.simulation_like import Simulation
+from utils.likes import LikeBatcher, apply_like_events
+
+
+def _counts(client, simulation_id):
+    """(stored like_count, actual simulation_likes rows)."""
+
+    async def read():
+        async with AsyncSessionLocal() as db:
+            stored = await db.scalar(select(Simulation.like_count).where(Simulation.id == simulation_id))
+            actual = await db.scalar(
+                select(func.count(SimulationLike.id)).where(SimulationLike.simulation_id == simulation_id)
+            )
+            return stored, actual
+
+    return client.portal.call(read)
+
+
+def test_double_like_is_idempotent(client, new_user, new_simulation):
+    _, headers = new_user()
+    simulation_id = new_simulation(headers)
+
+    first = client.post(f"/api/simulations/{simulation_id}/like", headers=headers)
+    assert first.status_code == 200
+    assert first.json()["likes"] == 1
+
+    second = client.post(f"/api/simulations/{simulation_id}/like", headers=headers)
+    assert second.status_code == 409
+    assert _counts(client, simulation_id) == (1, 1)
+
+
+def test_unlike_without_like_changes_nothing(client, new_user, new_simulation):
+    _, owner = new_user()
+    _, other = new_user()
+    simulation_id = new_simulation(owner)
+    client.post(f"/api/simulations/{simulation_id}/like", headers=owner)
+
+    response = client.delete(f"/api/simulations/{simulation_id}/like", headers=other)
+    assert response.status_code == 404
+    assert _counts(client, simulation_id) == (1, 1)
+
+
+def test_like_missing_simulation_is_404(client, new_user):
+    _, headers = new_user()
+    assert client.post("/api/simulations/999999/like", headers=headers).status_code == 404
+
+
+def test_interleaved_events_keep_like_count_exact(client, new_user, new_simulation):
+    users = [new_user()[0] for _ in range(3)]
+    _, headers = new_user()
+    simulation_id = new_simulation(headers)
+    a, b, c = users
+    events = [
+        (a, simulation_id, True),
+        (b, simulation_id, True),
+        (a, simulation_id, False),
+        (a, simulation_id, True),
+        (b, simulation_id, True),  # 중복
+        (c, simulation_id, False),  # 없는 좋아요
+        (c, simulation_id, True),
+        (b, simulation_id, False),
+    ]
+
+    async def apply():
+        async with AsyncSessionLocal() as db:
+            return await apply_like_events(db, events)
+
+    changed, counts = client.portal.call(apply)
+    assert changed == [True, True, True, True, False, False, True, True]
+    assert counts == {simulation_id: 2}
+    assert _counts(client, simulation_id) == (2, 2)
+
+
+def test_batcher_close_writes_queued_events(client, new_user, new_simulation):
+    users = [new_user()[0] for _ in range(4)]
+    _, headers = new_user()
+    simulation_id = new_simulation(headers)
+
+    async def submit_then_close():
+        # 간격이 길어서 close 전에는 flush 되지 않는다
+        batcher = LikeBatcher(interval_ms=60_000)
+        waiters = [asyncio.create_task(batcher.submit(user_id, simulation_id, True)) for user_id in users]
+        await asyncio.sleep(0)
+        await batcher.close()
+        # close 뒤에도 응답 못 받은 submit 이 있으면 멈추지 않고 실패하도록
+        return await asyncio.wait_for(asyncio.gather(*waiters), 5)
+
+    results = client.portal.call(submit_then_close)
+    assert [changed for changed, _ in results] == [True] * len(users)
+    assert results[-1][1] == len(users)
+    assert _counts(client, simulation_id) == (len(users), len(users))
@@ -0,0 +1,151 @@
+"""
+Keyset cursors (``utils.pagination``): following ``X-Next-Cursor`` visits
+every public row exactly once in the listing order, ties included, and a
+cursor that does not fit the requested sort is a 400.
+"""
+import base64
+import json
+from datetime import datetime
+
+from sqlalchemy import select, update
+
+from database import AsyncSessionLocal
+from models.article import Article
+from models.simulation_like import Simulation
+from utils.pagination import NEXT_CURSOR_HEADER, encode_cursor
+
+# 시드 데이터끼리 created_at 이 겹치도록 한 시각으로 고정
+_TIE = datetime(2020, 1, 1, 12, 0, 0)
+
+
+def _run(client, statement):
+    async def execute():
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(statement)
+            await db.commit()
+            return result
+
+    return client.portal.call(execute)
+
+
+def _rows(client, statement):
+    async def execute():
+        async with AsyncSessionLocal() as db:
+            return (await db.execute(statement)).all()
+
+    return client.portal.call(execute)
+
+
+def _page_through(client, path, params, size=4):
+    """Follow X-Next-Cursor until it disappears; return ids in visit order."""
+    ids = []
+    response = client.get(path, params={**params, "size": size})
+    while True:
+        assert response.status_code == 200, response.text
+        ids += [item.get("simulationId", item.get("id")) for item in response.json()]
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if cursor is None:
+            return ids
+        response = client.get(path, params={**params, "size": size, "cursor": cursor})
+
+
+def _seed_simulations(client, new_user, new_simulation):
+    """Seven public scenes sharing one created_at, with like_count ties (2, 2, 1, 1, 1, 0, 0)."""
+    _, owner = new_user()
+    ids = [new_simulation(owner, title=f"tie {i}") for i in range(7)]
+    _run(client, update(Simulation).where(Simulation.id.in_(ids)).values(created_at=_TIE))
+    likers = [new_user()[1] for _ in range(2)]
+    for simulation_id, likes in zip(ids, (2, 2, 1, 1, 1, 0, 0)):
+        for headers in likers[:likes]:
+            response = client.post(f"/api/simulations/{simulation_id}/like", headers=headers)
+            assert response.status_code == 200, response.text
+    return ids
+
+
+def test_latest_cursor_visits_every_simulation_once(client, new_user, new_simulation):
+    seeded = _seed_simulations(client, new_user, new_simulation)
+    expected = _rows(
+        client,
+        select(Simulation.id)
+        .where(Simulation.is_public.is_(True))
+        .order_by(Simulation.created_at.desc(), Simulation.id.desc()),
+    )
+
+    ids = _page_through(client, "/api/simulations/", {"sort": "latest"})
+
+    assert len(ids) == len(set(ids))
+    assert ids == [row.id for row in expected]
+    # created_at 이 같으면 id 내림차순
+    assert [i for i in ids if i in seeded] == sorted(seeded, reverse=True)
+
+
+def test_likes_cursor_visits_every_simulation_once(client, new_user, new_simulation):
+    seeded = _seed_simulations(client, new_user, new_simulation)
+    expected = _rows(
+        client,
+        select(Simulation.id)
+        .where(Simulation.is_public.is_(True))
+        .order_by(Simulation.like_count.desc(), Simulation.created_at.desc(), Simulation.id.desc()),
+    )
+
+    ids = _page_through(client, "/api/simulations/", {"sort": "likes"}, size=3)
+
+    assert len(ids) == len(set(ids))
+    assert ids == [row.id for row in expected]
+    # like_count 와 created_at 이 모두 같으면 id 내림차순
+    a, b, c, d, e, f, g = seeded
+    assert [i for i in ids if i in seeded] == [b, a, e, d, c, g, f]
+
+
+def test_article_cursor_visits_every_article_once(client, auth_headers):
+    created = []
+    for i in range(5):
+        response = client.post(
+            "/api/articles/",
+            json={"title": f"tie {i}", "content": "body", "is_public": True},
+            headers=auth_headers,
+        )
+        assert response.status_code == 201, response.text
+        created.append(response.json()["articleId"])
+    _run(client, update(Article).where(Article.id.in_(created)).values(created_at=_TIE))
+    expected = _rows(
+        client,
+        select(Article.id)
+        .where(Article.is_public.is_(True))
+        .order_by(Article.created_at.desc(), Article.id.desc()),
+    )
+
+    ids = _page_through(client, "/api/articles/", {}, size=2)
+
+    assert len(ids) == len(set(ids))
+    assert ids == [row.id for row in expected]
+
+
+def test_cursor_from_another_sort_is_rejected(client, simulation_ids):
+    first = client.get("/api/simulations/", params={"sort": "latest", "size": 2})
+    latest_cursor = first.headers[NEXT_CURSOR_HEADER]
+    trending_cursor = encode_cursor([0.5, simulation_ids[0]])
+
+    for sort, cursor in (
+        ("likes", latest_cursor),  # 길이가 다름
+        ("trending", latest_cursor),  # 길이는 같지만 created_at 자리에 score
+        ("latest", trending_cursor),
+    ):
+        response = client.get("/api/simulations/", params={"sort": sort, "size": 2, "cursor": cursor})
+        assert response.status_code == 400, (sort, response.text)
+        assert response.json()["detail"] == "잘못된 cursor 입니다."
+
+
+def test_malformed_cursor_is_rejected(client, simulation_ids):
+    def b64(payload):
+        return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+    for cursor in ("!!!", "bm90IGpzb24", b64({"dt": "2020-01-01"}), b64([{"dt": "yesterday"}, 1]), b64([1, 2])):
+        for path in ("/api/simulations/", "/api/articles/"):
+            response = client.get(path, params={"cursor": cursor})
+            assert response.status_code == 400, (path, cursor, response.text)
+
+
+def test_search_with_cursor_is_rejected(client):
+    response = client.get("/api/articles/", params={"q": "tie", "cursor": encode_cursor([_TIE, 1])})
+    assert response.status_code == 400
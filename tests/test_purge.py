@@ -0,0 +1,151 @@
+"""
+Chunked account deletion (``utils.purge``). ``batch_size=1`` puts a chunk
+boundary between every row.
+"""
+from sqlalchemy import func, select
+
+import utils.purge
+from database import AsyncSessionLocal
+from models.article import Article
+from models.simulation import SimulationLike
+from models.simulation_like import Simulation
+from models.simulation_run import SimulationRun
+from models.user import User
+from utils.likes import delete_like, like_count_delta
+from utils.purge import PURGE_KINDS, purge_user
+
+
+def _run(client, fn, *args):
+    async def call():
+        async with AsyncSessionLocal() as db:
+            return await fn(db, *args)
+
+    return client.portal.call(call)
+
+
+async def _add_run(db, simulation_id, user_id):
+    db.add(
+        SimulationRun(
+            simulation_id=simulation_id, user_id=user_id, status="queued", params={}, params_hash="x"
+        )
+    )
+    await db.commit()
+
+
+async def _like_counts(db, simulation_ids):
+    """{simulation_id: (stored like_count, actual rows)}."""
+    actual = (
+        select(func.count(SimulationLike.id))
+        .where(SimulationLike.simulation_id == Simulation.id)
+        .scalar_subquery()
+    )
+    rows = await db.execute(
+        select(Simulation.id, Simulation.like_count, actual).where(Simulation.id.in_(simulation_ids))
+    )
+    return {row[0]: (row[1], row[2]) for row in rows}
+
+
+async def _remaining(db, user_id, simulation_ids):
+    return {
+        "user": await db.scalar(select(func.count(User.id)).where(User.id == user_id)),
+        "simulations": await db.scalar(select(func.count(Simulation.id)).where(Simulation.id.in_(simulation_ids))),
+        "articles": await db.scalar(select(func.count(Article.id)).where(Article.author_id == user_id)),
+        "runs": await db.scalar(
+            select(func.count(SimulationRun.id)).where(
+                (SimulationRun.user_id == user_id) | SimulationRun.simulation_id.in_(simulation_ids)
+            )
+        ),
+        "likes": await db.scalar(
+            select(func.count(SimulationLike.id)).where(
+                (SimulationLike.user_id == user_id) | SimulationLike.simulation_id.in_(simulation_ids)
+            )
+        ),
+    }
+
+
+def _account(client, new_user, new_simulation):
+    """A user with 2 simulations, 1 article, likes and runs both ways with another user."""
+    user_id, headers = new_user()
+    other_id, other = new_user()
+    own = [new_simulation(headers), new_simulation(headers)]
+    theirs = [new_simulation(other), new_simulation(other)]
+    response = client.post(
+        "/api/articles/", json={"title": "purge me", "content": "body", "is_public": True}, headers=headers
+    )
+    assert response.status_code in (200, 201), response.text
+    for simulation_id in theirs:
+        assert client.post(f"/api/simulations/{simulation_id}/like", headers=headers).status_code == 200
+    for simulation_id in own + theirs[:1]:
+        assert client.post(f"/api/simulations/{simulation_id}/like", headers=other).status_code == 200
+    _run(client, _add_run, theirs[0], user_id)
+    _run(client, _add_run, own[0], other_id)
+    return user_id, headers, own, theirs
+
+
+def test_purge_deletes_everything_in_single_row_chunks(client, new_user, new_simulation):
+    user_id, _, own, theirs = _account(client, new_user, new_simulation)
+
+    counts = _run(client, purge_user, user_id, 1)
+
+    # 다른 유저가 이 계정의 시뮬레이션에 남긴 좋아요 2개/실행 1개도 포함
+    assert counts == {"users": 1, "articles": 1, "simulations": 2, "runs": 2, "likes": 4}
+    assert _run(client, _remaining, user_id, own) == dict.fromkeys(
+        ["user", "simulations", "articles", "runs", "likes"], 0
+    )
+    # 이 계정이 누른 좋아요만 빠지고, 다른 유저의 좋아요는 남는다
+    assert _run(client, _like_counts, theirs) == {theirs[0]: (1, 1), theirs[1]: (0, 0)}
+
+
+def test_purge_recounts_when_a_like_vanished_meanwhile(client, new_user, new_simulation, monkeypatch):
+    user_id, _, _, theirs = _account(client, new_user, new_simulation)
+    delete_ids = utils.purge._delete_ids
+
+    async def unlike_first(db, model, ids):
+        # 고른 좋아요를 지우기 직전에 같은 좋아요의 unlike 가 먼저 끝난 상황 (그 요청이 like_count 를 이미 1 뺌)
+        if model is SimulationLike:
+            for simulation_id in theirs:
+                if (await db.execute(delete_like(user_id, simulation_id))).rowcount:
+                    await db.execute(like_count_delta(simulation_id, -1))
+        return await delete_ids(db, model, ids)
+
+    monkeypatch.setattr(utils.purge, "_delete_ids", unlike_first)
+    counts = _run(client, purge_user, user_id, 1)
+
+    assert counts["likes"] == 2  # 이 계정 시뮬레이션에 남은 다른 유저의 좋아요만
+    # 1 을 한 번 더 빼지 않고 실제 행 수로 다시 셈
+    assert _run(client, _like_counts, theirs) == {theirs[0]: (1, 1), theirs[1]: (0, 0)}
+
+
+def test_purge_of_empty_account_reports_every_kind(client, new_user):
+    user_id, _ = new_user()
+    counts = _run(client, purge_user, user_id, 1)
+    assert set(counts) == set(PURGE_KINDS)
+    assert counts == {"users": 1, "articles": 0, "simulations": 0, "runs": 0, "likes": 0}
+
+
+def test_delete_me(client, new_user, new_simulation):
+    user_id, headers = new_user()
+    new_simulation(headers)
+    response = client.delete("/api/users/me", headers=headers)
+    assert response.status_code == 200
+    assert response.json() == {
+        "userId": user_id,
+        "status": "deleted",
+        "deleted": {"users": 1, "articles": 0, "simulations": 1, "runs": 0, "likes": 0},
+    }
+    assert client.get("/api/users/me", headers=headers).status_code == 401
+
+
+def test_delete_me_in_background(client, new_user, new_simulation):
+    user_id, headers, own, _ = _account(client, new_user, new_simulation)
+
+    response = client.delete("/api/users/me", params={"background": "true"}, headers=headers)
+    assert response.status_code == 202
+    assert response.json() == {"userId": user_id, "status": "scheduled", "deleted": None}
+
+    # TestClient 는 background task 가 끝난 뒤에 돌아온다
+    assert _run(client, _remaining, user_id, own) == dict.fromkeys(
+        ["user", "simulations", "articles", "runs", "likes"], 0
+    )
+    assert user_id not in utils.purge.purges_in_progress
+    assert client.get(f"/api/users/{user_id}").status_code == 404
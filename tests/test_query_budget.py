@@ -0,0 +1,60 @@
+"""
+Per-endpoint SQL statement budgets (``utils.query_counter``).
+
+A page of 100 rows must cost the same single statement as a page of 1, so
+an N+1 (lazy loads, per-row lookups) fails here instead of showing up as
+latency. Budgets allow one extra statement where the endpoint may resolve
+the caller's token on an auth cache miss.
+"""
+import pytest
+
+from database import async_engine, engine
+from utils.query_counter import assert_max_queries
+
+
+@pytest.mark.parametrize("sort", ["latest", "likes"])
+def test_list_simulations_is_one_query(client, simulation_ids, sort):
+    with assert_max_queries(async_engine, 1):
+        response = client.get("/api/simulations/", params={"size": 100, "sort": sort})
+    assert response.status_code == 200
+    # 다른 테스트가 만든 시뮬레이션도 같은 DB 에 있다
+    assert set(simulation_ids) <= {row["id"] for row in response.json()}
+
+
+def test_get_simulation(client, simulation_ids, auth_headers):
+    with assert_max_queries(async_engine, 1):
+        response = client.get(f"/api/simulations/{simulation_ids[0]}")
+    assert response.status_code == 200
+
+    with assert_max_queries(async_engine, 2):
+        response = client.get(f"/api/simulations/{simulation_ids[0]}", headers=auth_headers)
+    assert response.status_code == 200
+
+
+def test_update_simulation(client, simulation_ids, auth_headers):
+    # SELECT, UPDATE, refresh (+ 토큰 사용자 조회)
+    with assert_max_queries(async_engine, 4):
+        response = client.patch(
+            f"/api/simulations/{simulation_ids[1]}", json={"title": "renamed"}, headers=auth_headers
+        )
+    assert response.status_code == 200
+    assert response.json()["title"] == "renamed"
+
+
+def test_budget_violation_lists_statements(client, simulation_ids):
+    with pytest.raises(AssertionError, match="expected at most 0 queries, got 1"):
+        with assert_max_queries(async_engine, 0):
+            client.get("/api/simulations/")
+
+
+def test_metrics_scrape_reuses_resume_totals(client):
+    from routers.runs import _resume_totals
+
+    _resume_totals.clear()
+    with assert_max_queries(engine, 1):
+        first = client.get("/metrics")
+    # TTL 안의 다음 scrape 는 simulation_runs 를 다시 집계하지 않는다
+    with assert_max_queries(engine, 0):
+        second = client.get("/metrics")
+    assert "simulation_runs_resumed" in first.text
+    assert "simulation_runs_resumed" in second.text
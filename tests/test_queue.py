@@ -0,0 +1,88 @@
+"""
+Run ownership (``jobs.queue``): once a run is requeued and claimed by another
+worker, the previous worker's progress and finish writes match no rows.
+"""
+from database import AsyncSessionLocal
+from jobs.queue import (
+    FAILED,
+    SUCCEEDED,
+    claim_run,
+    finish_run,
+    report_progress,
+    requeue_stale,
+    resumed_from,
+)
+from models.simulation_run import SimulationRun
+
+
+def _run(client, fn):
+    async def call():
+        async with AsyncSessionLocal() as db:
+            return await fn(db)
+
+    return client.portal.call(call)
+
+
+def test_stale_worker_cannot_write_after_requeue(client, new_user, new_simulation, monkeypatch):
+    user_id, headers = new_user()
+    simulation_id = new_simulation(headers)
+
+    async def scenario(db):
+        run = SimulationRun(
+            simulation_id=simulation_id, user_id=user_id, status="queued", params={}, params_hash="x"
+        )
+        db.add(run)
+        await db.commit()
+        rowcounts = {"claim old": (await db.execute(claim_run(run.id, "old"))).rowcount}
+        await db.commit()
+
+        # heartbeat 가 끊긴 old 의 작업을 new 가 다시 가져감
+        monkeypatch.setattr("jobs.queue.JOB_STALE_SECONDS", -1)
+        await db.execute(requeue_stale("new"))
+        rowcounts["claim new"] = (await db.execute(claim_run(run.id, "new"))).rowcount
+        await db.commit()
+
+        for name, statement in (
+            ("old resumed", resumed_from(run.id, 50, 100, "old")),
+            ("old progress", report_progress(run.id, 90, 100, "old")),
+            ("old finish", finish_run(run.id, FAILED, "old", error="late")),
+            ("new progress", report_progress(run.id, 100, 100, "new")),
+            ("new finish", finish_run(run.id, SUCCEEDED, "new", result={"steps": 100})),
+        ):
+            rowcounts[name] = (await db.execute(statement)).rowcount
+            await db.commit()
+        await db.refresh(run)
+        return rowcounts, (run.status, run.worker, run.steps_done, run.resumed_from_step, run.error)
+
+    rowcounts, row = _run(client, scenario)
+
+    assert rowcounts == {
+        "claim old": 1,
+        "claim new": 1,
+        "old resumed": 0,
+        "old progress": 0,
+        "old finish": 0,
+        "new progress": 1,
+        "new finish": 1,
+    }
+    assert row == (SUCCEEDED, "new", 100, 0, None)
+
+
+def test_finish_only_once(client, new_user, new_simulation):
+    user_id, headers = new_user()
+    simulation_id = new_simulation(headers)
+
+    async def scenario(db):
+        run = SimulationRun(
+            simulation_id=simulation_id, user_id=user_id, status="queued", params={}, params_hash="x"
+        )
+        db.add(run)
+        await db.commit()
+        await db.execute(claim_run(run.id, "w"))
+        first = (await db.execute(finish_run(run.id, SUCCEEDED, "w"))).rowcount
+        second = (await db.execute(finish_run(run.id, FAILED, "w"))).rowcount
+        await db.commit()
+        await db.refresh(run)
+        return first, second, run.status
+
+    assert _run(client, scenario) == (1, 0, SUCCEEDED)
@@ -0,0 +1,24 @@
+"""
+``SimulationParams`` limits: explicit ``bodies`` are bounded like ``n_bodies``.
+"""
+import pytest
+from pydantic import ValidationError
+
+from schemas.simulation import SimulationParams
+
+_BODY = {"mass": 1.0, "position": (0.0, 0.0, 0.0)}
+
+
+def test_bodies_set_n_bodies():
+    params = SimulationParams(bodies=[_BODY] * 3, n_bodies=99)
+    assert params.n_bodies == 3
+
+
+def test_bodies_over_limit_are_rejected():
+    with pytest.raises(ValidationError):
+        SimulationParams(bodies=[_BODY] * 200_001)
+
+
+def test_empty_bodies_are_rejected():
+    with pytest.raises(ValidationError):
+        SimulationParams(bodies=[])
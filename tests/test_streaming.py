@@ -0,0 +1,46 @@
+"""
+Live stream subscriptions (``utils.streaming.broadcaster``): the SSE route only
+holds a subscription while its response body is being iterated.
+"""
+from database import AsyncSessionLocal
+from models.simulation_run import SimulationRun
+from routers.simulations import stream_simulation_sse
+from utils.streaming import broadcaster
+
+
+def _viewers(run_id):
+    channel = broadcaster.channels.get(run_id)
+    return 0 if channel is None else len(channel.subscribers)
+
+
+def test_sse_subscribes_only_while_iterated(client, new_user, new_simulation):
+    user_id, headers = new_user()
+    simulation_id = new_simulation(headers)
+
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            run = SimulationRun(
+                simulation_id=simulation_id, user_id=user_id, status="running", params={}, params_hash="x"
+            )
+            db.add(run)
+            await db.commit()
+            run_id = run.id
+
+        async with AsyncSessionLocal() as db:
+            # request 는 첫 frame 을 기다릴 때부터 쓰이므로 여기서는 필요 없다
+            response = await stream_simulation_sse(simulation_id, request=None, fps=15, db=db, token=None)
+        # 응답을 만들기만 하고 보내지 않은 경우 (전송 전에 끊김)
+        not_sent = _viewers(run_id)
+
+        events = response.body_iterator
+        first = await events.__anext__()
+        streaming = _viewers(run_id)
+        await events.aclose()
+        return run_id, not_sent, first, streaming, _viewers(run_id)
+
+    run_id, not_sent, first, streaming, closed = client.portal.call(scenario)
+
+    assert not_sent == 0
+    assert first == f'event: run\ndata: {{"runId": {run_id}}}\n\n'
+    assert streaming == 1
+    assert closed == 0
@@ -0,0 +1,55 @@
+import os
+from typing import Callable, Dict, List, Optional
+
+from fastapi import HTTPException, status
+
+# 배치 조회 한 번에 받는 id 수 상한 (IN 목록 길이)
+BATCH_MAX_IDS = int(os.getenv("BATCH_MAX_IDS", "100"))
+
+
+def check_ids(ids: List[int]) -> List[int]:
+    if not ids:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="ids 가 비어 있습니다.")
+    if len(ids) > BATCH_MAX_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"ids 는 한 번에 {BATCH_MAX_IDS}개까지 조회할 수 있습니다.",
+        )
+    return ids
+
+
+def parse_ids(raw: str) -> List[int]:
+    """Ids from ``?ids=1,2,3`` in request order, duplicates kept."""
+    try:
+        ids = [int(part) for part in raw.split(",") if part.strip()]
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="ids 는 쉼표로 구분한 숫자여야 합니다."
+        )
+    return check_ids(ids)
+
+
+def batch_results(
+    ids: List[int],
+    rows: Dict[int, dict],
+    not_found: str,
+    can_read: Optional[Callable[[dict], bool]] = None,
+    forbidden: Optional[str] = None,
+) -> List[dict]:
+    """
+    One entry per requested id, in request order.
+
+    ``rows`` maps id to the row loaded by a single ``IN`` query. Each entry
+    is ``{"id", "status": 200, "data"}``, or ``{"id", "status", "detail"}``
+    with the 404/403 and message the single-item endpoint would answer.
+    """
+    results = []
+    for item_id in ids:
+        row = rows.get(item_id)
+        if row is None:
+            results.append({"id": item_id, "status": status.HTTP_404_NOT_FOUND, "detail": not_found})
+        elif can_read is not None and not can_read(row):
+            results.append({"id": item_id, "status": status.HTTP_403_FORBIDDEN, "detail": forbidden})
+        else:
+            results.append({"id": item_id, "status": status.HTTP_200_OK, "data": row})
+    return results
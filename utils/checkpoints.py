@@ -0,0 +1,93 @@
+import json
+import os
+from typing import Optional, Tuple
+
+import numpy as np
+
+from physics.nbody import State
+
+CHECKPOINT_DIR = os.getenv("CHECKPOINT_DIR", "./data/checkpoints")
+# 실행 중 체크포인트 간격 (벽시계 초). 마지막 스텝은 항상 저장 (연장 실행용)
+CHECKPOINT_INTERVAL_SECONDS = float(os.getenv("CHECKPOINT_INTERVAL_SECONDS", "60"))
+# trajectory_key 별로 남겨 둘 체크포인트 수 (step 이 큰 것부터)
+CHECKPOINT_KEEP = int(os.getenv("CHECKPOINT_KEEP", "4"))
+
+
+def _directory(key: str) -> str:
+    return os.path.join(CHECKPOINT_DIR, key[:2], key)
+
+
+def save_checkpoint(key: str, state: State, meta: dict) -> str:
+    """
+    Snapshot the full integrator state (including the cached accelerations, so
+    the next kick is bit-identical) under ``trajectory_key`` ``key``.
+    """
+    directory = _directory(key)
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{state.step:012d}.npz")
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        np.savez(
+            f,
+            positions=state.positions,
+            velocities=state.velocities,
+            masses=state.masses,
+            accelerations=state.accelerations,
+            time=np.float64(state.time),
+            step=np.int64(state.step),
+            meta=np.frombuffer(json.dumps(meta).encode(), dtype=np.uint8),
+        )
+    os.replace(tmp, path)
+    _prune(directory)
+    return path
+
+
+def _prune(directory: str) -> None:
+    names = sorted(name for name in os.listdir(directory) if name.endswith(".npz"))
+    for name in names[:-CHECKPOINT_KEEP]:
+        try:
+            os.remove(os.path.join(directory, name))
+        except OSError:
+            pass
+
+
+def latest_checkpoint(key: str, max_step: int) -> Optional[Tuple[State, dict]]:
+    """Newest checkpoint of ``key`` at or before ``max_step``, or ``None``."""
+    directory = _directory(key)
+    try:
+        names = sorted(
+            (name for name in os.listdir(directory) if name.endswith(".npz")), reverse=True
+        )
+    except FileNotFoundError:
+        return None
+    for name in names:
+        if int(name[:-4]) > max_step:
+            continue
+        try:
+            with np.load(os.path.join(directory, name)) as data:
+                state = State(
+                    positions=data["positions"],
+                    velocities=data["velocities"],
+                    masses=data["masses"],
+                    time=float(data["time"]),
+                    step=int(data["step"]),
+                    accelerations=data["accelerations"],
+                )
+                meta = json.loads(data["meta"].tobytes())
+        except (OSError, ValueError, KeyError):
+            # 다른 프로세스가 방금 지웠거나 깨진 파일이면 그 이전 것을 본다
+            continue
+        return state, meta
+    return None
+
+
+def latest_checkpoint_step(key: str, max_step: int) -> Optional[int]:
+    try:
+        steps = [
+            int(name[:-4])
+            for name in os.listdir(_directory(key))
+            if name.endswith(".npz") and int(name[:-4]) <= max_step
+        ]
+    except FileNotFoundError:
+        return None
+    return max(steps) if steps else None
@@ -1,6 +1,29 @@
-from typing import Generator
+import threading
+import time
+from typing import Any, AsyncGenerator, Callable, Generator, List, Optional
 
-from database import SessionLocal
+from fastapi import Request
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import event
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.orm import Session
+
+from database import (
+    DB_MODE,
+    AsyncReplicaSessionLocal,
+    AsyncSessionLocal,
+    ReplicaSessionLocal,
+    SessionLocal,
+    async_replica_engine,
+    replica_engine,
+    settings,
+)
+from utils.cache import TTLCache
+from utils.metrics import registry
+
+# 최근에 쓴 토큰 수 상한 (넘치면 오래된 것부터 잊고 replica 로 읽는다)
+REPLICA_STICKY_MAX_ENTRIES = 100_000
 
 
 def get_db() -> Generator:
@@ -12,3 +35,209 @@ def get_db() -> Generator:
         yield db
     finally:
         db.close()
+
+
+class ThreadpoolSession:
+    """
+    Awaitable facade over a blocking ``Session``.
+
+    Exposes the subset of the ``AsyncSession`` API the routers use, running
+    every call that may touch the database on Starlette's threadpool. This is
+    what ``DB_MODE=sync`` hands to the routers, so the same endpoint code can
+    be benchmarked against both drivers.
+    """
+
+    def __init__(self, session: Session):
+        self.sync_session = session
+
+    async def run_sync(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        return await run_in_threadpool(fn, self.sync_session, *args, **kwargs)
+
+    async def execute(self, statement, params=None, **kwargs):
+        return await run_in_threadpool(self.sync_session.execute, statement, params, **kwargs)
+
+    async def scalar(self, statement, params=None, **kwargs):
+        return await run_in_threadpool(self.sync_session.scalar, statement, params, **kwargs)
+
+    async def scalars(self, statement, params=None, **kwargs):
+        return await run_in_threadpool(self.sync_session.scalars, statement, params, **kwargs)
+
+    async def get(self, entity, ident, **kwargs):
+        return await run_in_threadpool(self.sync_session.get, entity, ident, **kwargs)
+
+    def add(self, instance) -> None:
+        self.sync_session.add(instance)
+
+    def add_all(self, instances) -> None:
+        self.sync_session.add_all(instances)
+
+    async def delete(self, instance) -> None:
+        await run_in_threadpool(self.sync_session.delete, instance)
+
+    async def flush(self) -> None:
+        await run_in_threadpool(self.sync_session.flush)
+
+    async def commit(self) -> None:
+        await run_in_threadpool(self.sync_session.commit)
+
+    async def rollback(self) -> None:
+        await run_in_threadpool(self.sync_session.rollback)
+
+    async def refresh(self, instance, attribute_names=None) -> None:
+        await run_in_threadpool(self.sync_session.refresh, instance, attribute_names)
+
+    async def close(self) -> None:
+        await run_in_threadpool(self.sync_session.close)
+
+    async def connection(self):
+        return await run_in_threadpool(self.sync_session.connection)
+
+    @property
+    def info(self) -> dict:
+        return self.sync_session.info
+
+    def get_bind(self):
+        return self.sync_session.get_bind()
+
+
+def _open_session(replica: bool = False):
+    if DB_MODE == "async":
+        return (AsyncReplicaSessionLocal if replica else AsyncSessionLocal)()
+    return ThreadpoolSession((ReplicaSessionLocal if replica else SessionLocal)(expire_on_commit=False))
+
+
+async def get_async_db() -> AsyncGenerator:
+    """
+    Async counterpart of ``get_db``.
+
+    Yields an ``AsyncSession`` when ``DB_MODE=async`` and a
+    ``ThreadpoolSession`` wrapping the pymysql session when ``DB_MODE=sync``.
+    """
+    db = _open_session()
+    try:
+        yield db
+    finally:
+        await db.close()
+
+
+class ReplicaRouter:
+    """
+    Decides whether a read goes to the replica or the primary.
+
+    Reads fall back to the primary when no replica is configured, when the
+    caller's token wrote within ``sticky_seconds`` (read-your-writes), or
+    for ``retry_seconds`` after the replica failed to connect or dropped a
+    connection. Stickiness is per process, so with several uvicorn workers
+    it only holds if the write and the read land on the same worker; keep
+    ``sticky_seconds`` above the replica lag either way.
+    """
+
+    def __init__(self, enabled: bool, sticky_seconds: float, retry_seconds: float):
+        self.enabled = enabled
+        self.sticky_seconds = sticky_seconds
+        self.retry_seconds = retry_seconds
+        self._writers = TTLCache(REPLICA_STICKY_MAX_ENTRIES, sticky_seconds)
+        self._down_until = 0.0
+        self._lock = threading.Lock()
+        self.replica_reads = 0
+        self.primary_reads = {"sticky": 0, "down": 0, "unconfigured": 0}
+        self.failures = 0
+
+    def mark_write(self, token: Optional[str]) -> None:
+        if self.enabled and token and self.sticky_seconds > 0:
+            self._writers.set(token, True)
+
+    def mark_down(self) -> None:
+        with self._lock:
+            self._down_until = time.monotonic() + self.retry_seconds
+            self.failures += 1
+
+    def available(self) -> bool:
+        return self.enabled and time.monotonic() >= self._down_until
+
+    def _primary_reason(self, token: Optional[str]) -> Optional[str]:
+        if not self.enabled:
+            return "unconfigured"
+        if token and self._writers.get(token) is not None:
+            return "sticky"
+        if not self.available():
+            return "down"
+        return None
+
+    async def open(self, token: Optional[str]):
+        """Session for a read-only request, replica when it is safe to use."""
+        reason = self._primary_reason(token)
+        if reason is None:
+            db = _open_session(replica=True)
+            try:
+                # 연결을 미리 받아 두어, 연결이 안 되면 이 요청부터 primary 로 읽는다
+                await db.connection()
+            except (DBAPIError, PoolTimeoutError):
+                await db.close()
+                self.mark_down()
+                reason = "down"
+            else:
+                db.info["replica"] = True
+                self.replica_reads += 1
+                return db
+        self.primary_reads[reason] += 1
+        return _open_session()
+
+    def lag_window(self, db) -> float:
+        """How stale ``db`` may be: ``sticky_seconds`` for a replica session, else 0."""
+        return self.sticky_seconds if db.info.get("replica") else 0.0
+
+    def metric_lines(self) -> List[str]:
+        lines = [
+            "# HELP db_replica_up Whether reads are currently routed to the replica.",
+            "# TYPE db_replica_up gauge",
+            f"db_replica_up {int(self.available())}",
+            "# HELP db_read_sessions_total Read-only sessions by target and reason.",
+            "# TYPE db_read_sessions_total counter",
+            f'db_read_sessions_total{{target="replica",reason="healthy"}} {self.replica_reads}',
+        ]
+        for reason, count in self.primary_reads.items():
+            lines.append(f'db_read_sessions_total{{target="primary",reason="{reason}"}} {count}')
+        lines += [
+            "# HELP db_replica_failures_total Replica connect/disconnect errors that paused replica reads.",
+            "# TYPE db_replica_failures_total counter",
+            f"db_replica_failures_total {self.failures}",
+        ]
+        return lines
+
+
+replica_router = ReplicaRouter(
+    enabled=AsyncReplicaSessionLocal is not None,
+    sticky_seconds=settings.replica_sticky_seconds,
+    retry_seconds=settings.replica_retry_seconds,
+)
+registry.add_collector(replica_router.metric_lines)
+
+for _engine in (replica_engine, async_replica_engine):
+    if _engine is not None:
+        # 요청 도중 replica 연결이 끊기면 그 요청은 실패하지만 이후 읽기는 primary 로
+        event.listen(
+            getattr(_engine, "sync_engine", _engine),
+            "handle_error",
+            lambda context: context.is_disconnect and replica_router.mark_down(),
+        )
+
+
+def _bearer_token(request: Request) -> Optional[str]:
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    return token if scheme.lower() == "bearer" and token else None
+
+
+async def get_read_db(request: Request) -> AsyncGenerator:
+    """
+    Read-only counterpart of ``get_async_db`` for GET endpoints.
+
+    Yields a replica session when one is configured and healthy, otherwise
+    a primary session (see ``ReplicaRouter``). Replica connections reject
+    writes, so endpoints using this must not modify data.
+    """
+    db = await replica_router.open(_bearer_token(request))
+    try:
+        yield db
+    finally:
+        await db.close()
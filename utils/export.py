@@ -0,0 +1,83 @@
+import os
+import zlib
+from typing import AsyncIterator, Optional, Sequence
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.engine import Row
+
+from database import DB_MODE, AsyncReplicaSessionLocal, AsyncSessionLocal, ReplicaSessionLocal, SessionLocal
+from utils.dependencies import replica_router
+from utils.pagination import encode_cursor
+from utils.responses import dumps
+
+# 서버 측 cursor 에서 한 번에 가져오는 행 수 (= 응답 chunk 하나)
+EXPORT_BATCH_ROWS = int(os.getenv("EXPORT_BATCH_ROWS", "1000"))
+EXPORT_GZIP_LEVEL = int(os.getenv("EXPORT_GZIP_LEVEL", "6"))
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+async def stream_partitions(statement, batch_size: int = EXPORT_BATCH_ROWS) -> AsyncIterator[Sequence[Row]]:
+    """
+    Rows of ``statement`` in partitions of ``batch_size`` from a server-side
+    cursor (``yield_per``), so only one partition is in memory at a time.
+
+    Opens its own session, on the replica when it is available: a streaming
+    response outlives the request's session.
+    """
+    statement = statement.execution_options(yield_per=batch_size)
+    replica = replica_router.available()
+    if DB_MODE == "async":
+        async with (AsyncReplicaSessionLocal if replica else AsyncSessionLocal)() as db:
+            result = await db.stream(statement)
+            async for partition in result.partitions():
+                yield partition
+        return
+
+    db = (ReplicaSessionLocal if replica else SessionLocal)()
+    try:
+        result = await run_in_threadpool(db.execute, statement)
+        while True:
+            partition = await run_in_threadpool(result.fetchmany, batch_size)
+            if not partition:
+                break
+            yield partition
+    finally:
+        await run_in_threadpool(db.close)
+
+
+async def ndjson_export(
+    statement, cursor_fields: Sequence[str], gzip: bool = False, cursor: Optional[str] = None
+) -> AsyncIterator[bytes]:
+    """
+    One JSON object per line for every row of ``statement``, then a trailer
+    line ``{"next_cursor": ..., "rows": n}``.
+
+    ``next_cursor`` encodes ``cursor_fields`` of the last row (the ORDER BY
+    key), so passing it back resumes right after that row, or keeps
+    ``cursor`` when nothing new was exported. Without a trailer the stream
+    was cut; resuming with ``updated_since`` = the last row's ``updated_at``
+    repeats at most the rows sharing that timestamp.
+
+    With ``gzip`` the bytes form one gzip member, flushed after every
+    partition so the client can decode as it goes.
+    """
+    compressor = zlib.compressobj(EXPORT_GZIP_LEVEL, zlib.DEFLATED, 31) if gzip else None
+    rows = 0
+    last = None
+    async for partition in stream_partitions(statement):
+        chunk = b"".join(dumps(row._asdict()) + b"\n" for row in partition)
+        rows += len(partition)
+        last = partition[-1]
+        if compressor is not None:
+            chunk = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        yield chunk
+
+    trailer = {
+        "next_cursor": encode_cursor([getattr(last, name) for name in cursor_fields]) if last else cursor,
+        "rows": rows,
+    }
+    chunk = dumps(trailer) + b"\n"
+    if compressor is not None:
+        chunk = compressor.compress(chunk) + compressor.flush()
+    yield chunk
@@ -0,0 +1,244 @@
+import argparse
+import asyncio
+import os
+from collections import Counter
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, func, insert, literal, select, update
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from models.simulation import SimulationLike
+from models.simulation_like import Simulation
+from utils.dependencies import get_async_db
+
+# 0 이면 요청마다 바로 처리, 양수면 like/unlike 를 이 간격(ms)으로 모아서 한 트랜잭션에 기록
+LIKE_BATCH_MS = float(os.getenv("LIKE_BATCH_MS", "0"))
+# 이만큼 쌓이면 간격을 기다리지 않고 바로 기록
+LIKE_BATCH_MAX = int(os.getenv("LIKE_BATCH_MAX", "500"))
+
+# (user_id, simulation_id, liked)
+LikeEvent = Tuple[int, int, bool]
+
+
+def like_count_delta(simulation_id: int, delta: int):
+    """
+    UPDATE that moves ``Simulation.like_count`` by ``delta`` in the database.
+
+    The increment is evaluated by the database, so it is safe under concurrent
+    likes as long as it runs in the same transaction as the ``SimulationLike``
+    insert/delete. ``updated_at`` is pinned so a like does not count as an edit.
+    """
+    return (
+        update(Simulation)
+        .where(Simulation.id == simulation_id)
+        .values(like_count=Simulation.like_count + delta, updated_at=Simulation.updated_at)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def insert_like(user_id: int, simulation_id: int):
+    """
+    INSERT that adds the like unless it already exists or the simulation is gone.
+
+    ``uq_user_simulation_like`` is the idempotency check: a duplicate is
+    ignored by the database (``rowcount == 0``) instead of raising, so
+    concurrent double-clicks cannot fail. Selecting from ``simulations``
+    makes a missing simulation a no-op too.
+    """
+    source = select(literal(user_id), Simulation.id, literal(datetime.utcnow())).where(
+        Simulation.id == simulation_id
+    )
+    return (
+        insert(SimulationLike)
+        .from_select(["user_id", "simulation_id", "created_at"], source)
+        .prefix_with("IGNORE", dialect="mysql")
+        .prefix_with("OR IGNORE", dialect="sqlite")
+    )
+
+
+def delete_like(user_id: int, simulation_id: int):
+    return delete(SimulationLike).where(
+        SimulationLike.user_id == user_id, SimulationLike.simulation_id == simulation_id
+    )
+
+
+async def apply_like_events(db, events: List[LikeEvent]) -> Tuple[List[bool], Dict[int, int]]:
+    """
+    Write ``events`` in order in one transaction and commit.
+
+    Returns whether each event changed anything and the committed
+    ``like_count`` of every simulation touched (missing simulations are
+    absent). Counters move by the rows actually inserted/deleted, in the same
+    transaction, so they stay exact however events interleave.
+    """
+    changed = []
+    deltas = Counter()
+    for user_id, simulation_id, liked in events:
+        statement = insert_like(user_id, simulation_id) if liked else delete_like(user_id, simulation_id)
+        result = await db.execute(statement)
+        changed.append(result.rowcount > 0)
+        if result.rowcount > 0:
+            deltas[simulation_id] += 1 if liked else -1
+    # 시뮬레이션마다 UPDATE 한 번 (id 순서로 잠가서 batch 끼리 deadlock 방지)
+    for simulation_id in sorted(deltas):
+        if deltas[simulation_id]:
+            await db.execute(like_count_delta(simulation_id, deltas[simulation_id]))
+    counts = dict(
+        (
+            await db.execute(
+                select(Simulation.id, Simulation.like_count).where(
+                    Simulation.id.in_({simulation_id for _, simulation_id, _ in events})
+                )
+            )
+        ).all()
+    )
+    await db.commit()
+    return changed, counts
+
+
+class LikeBatcher:
+    """
+    Group commit for like/unlike events.
+
+    ``submit`` queues an event and waits until the transaction holding it has
+    committed, so a like is only acknowledged once it is durable. Events are
+    flushed every ``interval_ms`` (or as soon as ``max_events`` are waiting)
+    by a single task on the event loop, in submission order, through
+    ``apply_like_events``. If the transaction fails every waiting caller gets
+    the error and nothing from the batch is acknowledged.
+    """
+
+    def __init__(self, interval_ms: float = LIKE_BATCH_MS, max_events: int = LIKE_BATCH_MAX):
+        self.interval = interval_ms / 1000.0
+        self.max_events = max_events
+        self._pending: List[Tuple[LikeEvent, asyncio.Future]] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+
+    @property
+    def enabled(self) -> bool:
+        return self.interval > 0
+
+    async def submit(self, user_id: int, simulation_id: int, liked: bool) -> Tuple[bool, Optional[int]]:
+        """(changed, like_count after the batch committed; None if the simulation is missing)."""
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append(((user_id, simulation_id, liked), future))
+        if len(self._pending) >= self.max_events:
+            self._wakeup.set()
+        return await future
+
+    async def _run(self) -> None:
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            if self._pending:
+                await self.flush()
+
+    async def flush(self) -> None:
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        events = [event for event, _ in batch]
+        try:
+            async with asynccontextmanager(get_async_db)() as db:
+                changed, counts = await apply_like_events(db, events)
+        except Exception as exc:
+            self._fail(batch, exc)
+            return
+        except BaseException:
+            # CancelledError 등: 이 batch 는 이미 _pending 에서 빠졌으니 여기서 실패시키지 않으면 영영 응답이 없다
+            self._fail(batch, RuntimeError("좋아요 기록이 중단되었습니다."))
+            raise
+        for (event, future), did_change in zip(batch, changed):
+            if not future.done():
+                future.set_result((did_change, counts.get(event[1])))
+
+    @staticmethod
+    def _fail(batch, exc: BaseException) -> None:
+        for _, future in batch:
+            if not future.done():
+                future.set_exception(exc)
+
+    async def close(self) -> None:
+        """Stop the flush task once its in-flight batch is written, then write whatever is still queued."""
+        if self._task is not None:
+            # cancel 하면 commit 중인 batch 가 끊기므로 루프만 멈추고 끝나기를 기다린다
+            self._closing = True
+            self._wakeup.set()
+            try:
+                await self._task
+            finally:
+                self._task = None
+                self._closing = False
+        await self.flush()
+
+
+like_batcher = LikeBatcher()
+
+
+async def submit_like_event(db, user_id: int, simulation_id: int, liked: bool) -> Tuple[bool, Optional[int]]:
+    """Apply one like/unlike, through ``like_batcher`` when batching is on."""
+    if like_batcher.enabled:
+        # flush 가 커넥션을 얻을 수 있도록, 기다리는 동안 요청 세션의 커넥션은 반납
+        await db.commit()
+        return await like_batcher.submit(user_id, simulation_id, liked)
+    changed, counts = await apply_like_events(db, [(user_id, simulation_id, liked)])
+    return changed[0], counts.get(simulation_id)
+
+
+def reconcile_like_counts(db: Session, batch_size: int = 1000) -> int:
+    """
+    Recompute ``Simulation.like_count`` from ``simulation_likes`` in id batches.
+
+    Only rows whose stored counter drifted are written, and each batch is its
+    own transaction so locks are held briefly. Returns the number of rows fixed.
+    """
+    actual = (
+        select(func.count(SimulationLike.id))
+        .where(SimulationLike.simulation_id == Simulation.id)
+        .scalar_subquery()
+    )
+    max_id = db.scalar(select(func.max(Simulation.id))) or 0
+
+    fixed = 0
+    for start in range(0, max_id, batch_size):
+        result = db.execute(
+            update(Simulation)
+            .where(
+                Simulation.id > start,
+                Simulation.id <= start + batch_size,
+                Simulation.like_count != actual,
+            )
+            .values(like_count=actual, updated_at=Simulation.updated_at)
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        fixed += result.rowcount
+    return fixed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="simulations.like_count 재계산")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        fixed = reconcile_like_counts(db, batch_size=args.batch_size)
+    finally:
+        db.close()
+    print(f"like_count 보정: {fixed}건")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,451 @@
+import bisect
+import functools
+import inspect
+import logging
+import os
+import random
+import threading
+import time
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Tuple
+
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import QueuePool
+
+# 이 시간(초) 이상 걸린 SQL 을 SLOW_QUERY_SAMPLE_RATE 비율로 로그 (echo 대신)
+SLOW_QUERY_SECONDS = float(os.getenv("SLOW_QUERY_SECONDS", "0.2"))
+SLOW_QUERY_SAMPLE_RATE = float(os.getenv("SLOW_QUERY_SAMPLE_RATE", "1.0"))
+SLOW_QUERY_MAX_CHARS = 1000
+# 응답에 Server-Timing 헤더를 붙일지 (DB/직렬화 시간이 클라이언트에 보임)
+SERVER_TIMING = os.getenv("SERVER_TIMING", "true").lower() == "true"
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+POOL_WAIT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0)
+
+slow_query_log = logging.getLogger("gravity.sql.slow")
+
+
+class RequestMetrics:
+    """
+    Counters for one HTTP request, shared by everything that runs inside it
+    (threadpool calls and stream tasks copy the context, not the object).
+    """
+
+    __slots__ = ("route", "statements", "db_seconds", "pool_wait_seconds", "serialization_seconds", "_endpoint_done")
+
+    def __init__(self) -> None:
+        self.route: Optional[str] = None
+        self.statements = 0
+        self.db_seconds = 0.0
+        self.pool_wait_seconds = 0.0
+        self.serialization_seconds = 0.0
+        # endpoint 가 반환한 시각. response_model 직렬화가 끝나면 None 으로 되돌린다
+        self._endpoint_done: Optional[float] = None
+
+
+_current: ContextVar[Optional[RequestMetrics]] = ContextVar("request_metrics", default=None)
+
+
+def record_serialization(seconds: float) -> None:
+    """Count explicit rendering (``dumps``) done by the request's own code."""
+    metrics = _current.get()
+    # endpoint 반환 뒤의 렌더링은 InstrumentedRoute 가 통째로 재므로 중복 집계하지 않는다
+    if metrics is not None and metrics._endpoint_done is None:
+        metrics.serialization_seconds += seconds
+
+
+class _Histogram:
+    __slots__ = ("buckets", "counts", "total", "count")
+
+    def __init__(self, buckets: Tuple[float, ...]) -> None:
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.counts):
+            self.counts[index] += 1
+        self.total += value
+        self.count += 1
+
+    def lines(self, name: str, labels: str) -> List[str]:
+        out = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            out.append(f'{name}_bucket{{{labels},le="{bound:g}"}} {cumulative}')
+        out.append(f'{name}_bucket{{{labels},le="+Inf"}} {self.count}')
+        out.append(f"{name}_sum{{{labels}}} {self.total:.6f}")
+        out.append(f"{name}_count{{{labels}}} {self.count}")
+        return out
+
+
+class _RouteStats:
+    __slots__ = ("statuses", "duration", "statements", "db_seconds", "pool_wait_seconds", "serialization_seconds", "response_bytes")
+
+    def __init__(self) -> None:
+        self.statuses: Dict[int, int] = {}
+        self.duration = _Histogram(DURATION_BUCKETS)
+        self.statements = _Histogram(STATEMENT_BUCKETS)
+        self.db_seconds = 0.0
+        self.pool_wait_seconds = 0.0
+        self.serialization_seconds = 0.0
+        self.response_bytes = 0
+
+
+class _PoolStats:
+    __slots__ = ("engine", "wait", "timeouts", "disconnects")
+
+    def __init__(self, engine) -> None:
+        # engine.dispose() 가 pool 을 새로 만들므로 pool 이 아니라 engine 을 들고 있는다
+        self.engine = engine
+        self.wait = _Histogram(POOL_WAIT_BUCKETS)
+        self.timeouts = 0
+        self.disconnects = 0
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def exposition(name: str, kind: str, description: str, samples) -> List[str]:
+    """
+    ``# HELP``/``# TYPE`` and sample lines for one metric, for collectors.
+
+    ``samples`` is a single value, or a dict from a label string such as
+    ``'result="hit"'`` to its value.
+    """
+    out = [f"# HELP {name} {description}", f"# TYPE {name} {kind}"]
+    if not isinstance(samples, dict):
+        return out + [f"{name} {samples}"]
+    return out + [f"{name}{{{labels}}} {value}" for labels, value in samples.items()]
+
+
+class MetricsRegistry:
+    """
+    Per-route aggregates in Prometheus text exposition format.
+
+    Labels are the route template (``/api/simulations/{simulation_id}``), not
+    the raw path, so cardinality is bounded by the number of routes.
+    Counters are per process; with several workers scrape each one.
+    """
+
+    def __init__(self) -> None:
+        self._routes: Dict[Tuple[str, str], _RouteStats] = {}
+        self._pools: Dict[str, _PoolStats] = {}
+        self._collectors: List[Callable[[], List[str]]] = []
+        self._lock = threading.Lock()
+        self.slow_queries = 0
+
+    def observe(self, method: str, route: str, status: int, seconds: float, metrics: RequestMetrics, size: int) -> None:
+        with self._lock:
+            stats = self._routes.get((method, route))
+            if stats is None:
+                stats = self._routes[(method, route)] = _RouteStats()
+            stats.statuses[status] = stats.statuses.get(status, 0) + 1
+            stats.duration.observe(seconds)
+            stats.statements.observe(metrics.statements)
+            stats.db_seconds += metrics.db_seconds
+            stats.pool_wait_seconds += metrics.pool_wait_seconds
+            stats.serialization_seconds += metrics.serialization_seconds
+            stats.response_bytes += size
+
+    def add_collector(self, collect: Callable[[], List[str]]) -> None:
+        """Extra exposition lines (``# HELP``/``# TYPE`` included) rendered on every scrape."""
+        self._collectors.append(collect)
+
+    def add_pool(self, label: str, engine) -> None:
+        with self._lock:
+            self._pools[label] = _PoolStats(engine)
+
+    def observe_checkout(self, label: str, seconds: float, timed_out: bool) -> None:
+        with self._lock:
+            stats = self._pools.get(label)
+            if stats is None:
+                return
+            stats.wait.observe(seconds)
+            if timed_out:
+                stats.timeouts += 1
+
+    def count_disconnect(self, label: str) -> None:
+        with self._lock:
+            stats = self._pools.get(label)
+            if stats is not None:
+                stats.disconnects += 1
+
+    def _pool_lines(self) -> List[str]:
+        out = []
+        pools = sorted(self._pools.items())
+        gauges = [
+            ("db_pool_size", "Connections the pool keeps open.", lambda p: p.size()),
+            ("db_pool_checked_out", "Connections currently in use.", lambda p: p.checkedout()),
+            ("db_pool_checked_in", "Idle connections in the pool.", lambda p: p.checkedin()),
+            # overflow() 는 pool 이 다 차기 전에는 음수
+            ("db_pool_overflow", "Connections open beyond pool_size.", lambda p: max(p.overflow(), 0)),
+        ]
+        for name, description, value in gauges:
+            out += [f"# HELP {name} {description}", f"# TYPE {name} gauge"]
+            for label, stats in pools:
+                pool = stats.engine.pool
+                if isinstance(pool, QueuePool):
+                    out.append(f'{name}{{pool="{label}"}} {value(pool)}')
+        out += [
+            "# HELP db_pool_checkout_wait_seconds Time to get a connection from the pool.",
+            "# TYPE db_pool_checkout_wait_seconds histogram",
+        ]
+        for label, stats in pools:
+            out += stats.wait.lines("db_pool_checkout_wait_seconds", f'pool="{label}"')
+        for name, description, attr in (
+            ("db_pool_timeouts_total", "Checkouts that gave up after pool_timeout.", "timeouts"),
+            ("db_disconnects_total", "Disconnect errors that invalidated the pool.", "disconnects"),
+        ):
+            out += [f"# HELP {name} {description}", f"# TYPE {name} counter"]
+            for label, stats in pools:
+                out.append(f'{name}{{pool="{label}"}} {getattr(stats, attr)}')
+        return out
+
+    def render(self) -> str:
+        counters: List[Tuple[str, str, Callable[[_RouteStats], float]]] = [
+            ("http_request_db_seconds_total", "Time spent executing SQL.", lambda s: s.db_seconds),
+            ("http_request_pool_wait_seconds_total", "Time spent waiting for a pooled DB connection.", lambda s: s.pool_wait_seconds),
+            ("http_request_serialization_seconds_total", "Time spent rendering response bodies.", lambda s: s.serialization_seconds),
+            ("http_response_size_bytes_total", "Response body bytes sent.", lambda s: s.response_bytes),
+        ]
+        with self._lock:
+            routes = sorted(self._routes.items())
+            out = [
+                "# HELP http_requests_total HTTP requests by route template and status.",
+                "# TYPE http_requests_total counter",
+            ]
+            for (method, route), stats in routes:
+                for status, count in sorted(stats.statuses.items()):
+                    out.append(f'http_requests_total{{method="{method}",route="{_escape(route)}",status="{status}"}} {count}')
+            for name, description, buckets in (
+                ("http_request_duration_seconds", "Request latency until the last body byte.", "duration"),
+                ("http_request_db_statements", "SQL statements per request.", "statements"),
+            ):
+                out += [f"# HELP {name} {description}", f"# TYPE {name} histogram"]
+                for (method, route), stats in routes:
+                    out += getattr(stats, buckets).lines(name, f'method="{method}",route="{_escape(route)}"')
+            for name, description, value in counters:
+                out += [f"# HELP {name} {description}", f"# TYPE {name} counter"]
+                for (method, route), stats in routes:
+                    out.append(f'{name}{{method="{method}",route="{_escape(route)}"}} {value(stats)}')
+            out += [
+                "# HELP db_slow_queries_total SQL statements slower than SLOW_QUERY_SECONDS.",
+                "# TYPE db_slow_queries_total counter",
+                f"db_slow_queries_total {self.slow_queries}",
+            ]
+            out += self._pool_lines()
+        for collect in self._collectors:
+            out += collect()
+        return "\n".join(out) + "\n"
+
+
+registry = MetricsRegistry()
+
+PROMETHEUS_MEDIA_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    elapsed = time.perf_counter() - conn.info["query_started"].pop()
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.statements += 1
+        metrics.db_seconds += elapsed
+    if elapsed >= SLOW_QUERY_SECONDS:
+        registry.slow_queries += 1
+        if random.random() < SLOW_QUERY_SAMPLE_RATE:
+            # 파라미터에는 비밀번호 해시 등이 있을 수 있으므로 SQL 문만 남긴다
+            slow_query_log.warning(
+                "slow query %.1fms route=%s: %s",
+                elapsed * 1000.0,
+                metrics.route if metrics is not None else "-",
+                " ".join(statement.split())[:SLOW_QUERY_MAX_CHARS],
+            )
+
+
+def _handle_error(context) -> None:
+    # 실패한 문장은 after_cursor_execute 가 불리지 않으므로 시작 시각만 버린다
+    connection = context.connection
+    if connection is not None and connection.info.get("query_started"):
+        connection.info["query_started"].pop()
+
+
+def instrument_engine(engine, label: str) -> None:
+    """
+    Per-request statement count / DB time, slow-query logging and pool
+    gauges (under ``pool="<label>"``) for ``engine``.
+    """
+    sync_engine = engine.sync_engine if isinstance(engine, AsyncEngine) else engine
+    registry.add_pool(label, sync_engine)
+
+    def _on_error(context) -> None:
+        _handle_error(context)
+        if context.is_disconnect:
+            registry.count_disconnect(label)
+
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(sync_engine, "handle_error", _on_error)
+
+
+@functools.lru_cache(maxsize=None)
+def timed_pool_class(pool_class: type, label: str) -> type:
+    """
+    ``pool_class`` that records checkout time for the current request and
+    the ``label`` pool's wait histogram.
+
+    The pool has no "before checkout" event, so this overrides ``_do_get``
+    (the wait for a free connection, or opening a new one). A subclass
+    rather than a patched instance so ``engine.dispose()`` keeps it.
+    """
+
+    def _do_get(self):
+        started = time.perf_counter()
+        timed_out = False
+        try:
+            return pool_class._do_get(self)
+        except PoolTimeoutError:
+            timed_out = True
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            registry.observe_checkout(label, elapsed, timed_out)
+            metrics = _current.get()
+            if metrics is not None:
+                metrics.pool_wait_seconds += elapsed
+
+    return type(f"Timed{pool_class.__name__}", (pool_class,), {"_do_get": _do_get})
+
+
+class InstrumentedRoute(APIRoute):
+    """
+    ``APIRoute`` that splits the endpoint from the response rendering
+    FastAPI does after it (``response_model`` validation + JSON dump), and
+    counts the latter as serialization time.
+    """
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs) -> None:
+        if inspect.iscoroutinefunction(endpoint):
+            endpoint = _timed_endpoint(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def timed_handler(request):
+            metrics = _current.get()
+            if metrics is not None:
+                metrics.route = route_template(request.scope)
+            response = await handler(request)
+            if metrics is not None and metrics._endpoint_done is not None:
+                metrics.serialization_seconds += time.perf_counter() - metrics._endpoint_done
+                metrics._endpoint_done = None
+            return response
+
+        return timed_handler
+
+
+def _timed_endpoint(endpoint: Callable) -> Callable:
+    # FastAPI 가 signature 를 읽으므로 functools.wraps 로 원래 함수의 인자/반환 타입을 유지
+    @functools.wraps(endpoint)
+    async def timed_endpoint(*args, **kwargs):
+        try:
+            return await endpoint(*args, **kwargs)
+        finally:
+            metrics = _current.get()
+            if metrics is not None:
+                metrics._endpoint_done = time.perf_counter()
+
+    return timed_endpoint
+
+
+_templates: Dict[int, str] = {}
+
+
+def _build_templates(app) -> Dict[int, str]:
+    try:
+        from fastapi.routing import iter_route_contexts
+    except ImportError:
+        # include_router 가 prefix 를 붙인 route 복사본을 등록하는 FastAPI
+        return {id(route): route.path for route in app.routes if hasattr(route, "path")}
+    # include_router 가 원래 route 를 그대로 두는 FastAPI: 앱 기준 전체 경로는 route context 에만 있다
+    return {
+        id(context.original_route): context.path_format
+        for context in iter_route_contexts(app.routes)
+        if context.path_format
+    }
+
+
+def route_template(scope) -> str:
+    """Full path template of the matched route, e.g. ``/api/simulations/{simulation_id}``."""
+    route = scope.get("route")
+    if route is None:
+        # 매칭되지 않은 경로(404)는 하나로 묶어 라벨 수를 제한
+        return "unmatched"
+    template = _templates.get(id(route))
+    if template is None:
+        _templates.update(_build_templates(scope["app"]))
+        template = _templates.setdefault(id(route), getattr(route, "path", "unmatched"))
+    return template
+
+
+def _server_timing(metrics: RequestMetrics, total: float) -> bytes:
+    return (
+        f"db;dur={metrics.db_seconds * 1000:.1f};desc=\"{metrics.statements} queries\", "
+        f"pool;dur={metrics.pool_wait_seconds * 1000:.1f}, "
+        f"ser;dur={metrics.serialization_seconds * 1000:.1f}, "
+        f"total;dur={total * 1000:.1f}"
+    ).encode("latin-1")
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording one ``RequestMetrics`` per HTTP request.
+
+    ``Server-Timing`` reflects the work done before the response started;
+    for streamed bodies (export, SSE) the rest only shows up in ``/metrics``.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        started = time.perf_counter()
+        status = 500
+        size = 0
+
+        async def send_wrapper(message) -> None:
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if SERVER_TIMING:
+                    timing = _server_timing(metrics, time.perf_counter() - started)
+                    message = {**message, "headers": [*message.get("headers", []), (b"server-timing", timing)]}
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            template = metrics.route or route_template(scope)
+            registry.observe(scope["method"], template, status, time.perf_counter() - started, metrics, size)
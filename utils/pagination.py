@@ -0,0 +1,65 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Sequence, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import tuple_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """
+    Pack the sort key of the last row on a page into an opaque cursor.
+
+    Datetimes are tagged so ``decode_cursor`` can restore them exactly.
+    """
+    payload = [
+        {"dt": value.isoformat()} if isinstance(value, datetime) else value
+        for value in values
+    ]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str, length: int) -> Tuple[Any, ...]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        if not isinstance(payload, list) or len(payload) != length:
+            raise ValueError(cursor)
+        return tuple(
+            datetime.fromisoformat(value["dt"]) if isinstance(value, dict) else value
+            for value in payload
+        )
+    except (ValueError, TypeError, KeyError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="잘못된 cursor 입니다.")
+
+
+def _matches(column: Any, value: Any) -> bool:
+    try:
+        expected = column.type.python_type
+    except NotImplementedError:
+        return True
+    if expected is float:
+        expected = (int, float)
+    # bool 은 int 의 하위 타입이라 따로 거른다
+    return isinstance(value, expected) and (expected is bool or not isinstance(value, bool))
+
+
+def seek_after(columns: Sequence[Any], cursor: str, descending: bool = True):
+    """
+    WHERE clause for the rows after ``cursor`` when ordering by ``columns``
+    (DESC by default, ASC with ``descending=False``).
+
+    Uses a row-value comparison so MySQL can turn it into a range scan on a
+    composite index with the same column order.
+    """
+    values = decode_cursor(cursor, len(columns))
+    # 길이가 같은 다른 정렬의 cursor (trending 의 score 를 latest 의 created_at 자리에) 도 거부
+    if not all(_matches(column, value) for column, value in zip(columns, values)):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="잘못된 cursor 입니다.")
+    if descending:
+        return tuple_(*columns) < tuple_(*values)
+    return tuple_(*columns) > tuple_(*values)
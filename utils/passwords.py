@@ -0,0 +1,119 @@
+"""
+bcrypt hashing off the request path.
+
+``hash_password_async`` / ``verify_password_async`` send the work to a small
+dedicated process pool (lower CPU priority than the API process), so a
+burst of logins queues behind ``PASSWORD_POOL_WORKERS`` hashes instead of
+occupying every threadpool thread and the GIL. At most
+``PASSWORD_POOL_MAX_PENDING`` calls may wait; beyond that callers get 503.
+"""
+import asyncio
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+
+from utils.metrics import exposition, registry
+
+# bcrypt cost (2^rounds). 바꾸면 기존 해시는 다음 로그인 때 새 cost 로 다시 해시된다
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# process: 전용 프로세스 풀 / thread: 스레드 풀 (fork 가 안 되는 환경, 비교용)
+PASSWORD_POOL = os.getenv("PASSWORD_POOL", "process")
+PASSWORD_POOL_WORKERS = int(os.getenv("PASSWORD_POOL_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))
+PASSWORD_POOL_MAX_PENDING = int(os.getenv("PASSWORD_POOL_MAX_PENDING", "256"))
+# 해시 프로세스의 nice 값: CPU 가 부족하면 API 프로세스가 먼저 돈다
+PASSWORD_POOL_NICE = int(os.getenv("PASSWORD_POOL_NICE", "10"))
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(plain_password, hashed_password)
+
+
+def hash_password(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def verify_and_rehash(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify, and if the stored hash uses outdated settings return a fresh hash too."""
+    if not pwd_context.verify(plain_password, hashed_password):
+        return False, None
+    if pwd_context.needs_update(hashed_password):
+        return True, pwd_context.hash(plain_password)
+    return True, None
+
+
+def _init_worker() -> None:
+    try:
+        os.nice(PASSWORD_POOL_NICE)
+    except OSError:
+        pass
+
+
+class PasswordPool:
+    def __init__(self, kind: str, workers: int, max_pending: int):
+        self.kind = kind
+        self.workers = workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self.rejected = 0
+        self.completed = 0
+        self._executor: Optional[Executor] = None
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(self.workers, initializer=_init_worker)
+            else:
+                self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="bcrypt")
+        return self._executor
+
+    async def submit(self, fn, *args):
+        # 이벤트 루프 스레드에서만 호출되므로 카운터에 락이 필요 없다
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="요청이 많아 처리할 수 없습니다. 잠시 후 다시 시도하세요.",
+                headers={"Retry-After": "1"},
+            )
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            self.pending -= 1
+            self.completed += 1
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def metric_lines(self) -> List[str]:
+        return [
+            *exposition("password_pool_workers", "gauge", "bcrypt workers (PASSWORD_POOL_WORKERS).", self.workers),
+            *exposition("password_pool_pending", "gauge", "Hash/verify calls queued or running.", self.pending),
+            *exposition("password_pool_max_pending", "gauge", "PASSWORD_POOL_MAX_PENDING.", self.max_pending),
+            *exposition("password_pool_completed_total", "counter", "Hash/verify calls finished.", self.completed),
+            *exposition("password_pool_rejected_total", "counter", "Calls refused with 503 (queue full).", self.rejected),
+            *exposition("password_bcrypt_rounds", "gauge", "BCRYPT_ROUNDS cost.", BCRYPT_ROUNDS),
+        ]
+
+
+password_pool = PasswordPool(PASSWORD_POOL, PASSWORD_POOL_WORKERS, PASSWORD_POOL_MAX_PENDING)
+registry.add_collector(password_pool.metric_lines)
+
+
+async def hash_password_async(password: str) -> str:
+    return await password_pool.submit(hash_password, password)
+
+
+async def verify_password_async(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """(matches, new hash if the cost/scheme changed) computed in the password pool."""
+    return await password_pool.submit(verify_and_rehash, plain_password, hashed_password)
@@ -0,0 +1,178 @@
+import argparse
+import asyncio
+import logging
+import os
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Set
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.engine import Row
+
+from database import DB_MODE, async_engine
+from models.article import Article
+from models.simulation import SimulationLike
+from models.simulation_like import Simulation
+from models.simulation_run import SimulationRun
+from models.user import User
+from utils.dependencies import get_async_db
+from utils.response_cache import item_tag, list_tag, response_cache
+from utils.search import get_search_backend
+from utils.security import invalidate_user
+
+# 계정 삭제 때 한 트랜잭션에서 지우는 행 수 (잠금 시간과 메모리가 이 크기에 묶인다)
+PURGE_BATCH_ROWS = int(os.getenv("PURGE_BATCH_ROWS", "1000"))
+
+# purge_user 가 돌려주는 삭제 건수의 키 (응답 모양이 계정마다 달라지지 않게 0 건도 포함)
+PURGE_KINDS = ("users", "articles", "simulations", "runs", "likes")
+
+purge_log = logging.getLogger("gravity.purge")
+
+# 이 프로세스에서 삭제 중인 user id (같은 계정을 두 번 지우지 않게)
+purges_in_progress: Set[int] = set()
+
+
+async def _chunks(db, model, where, batch_size: int, *columns) -> AsyncIterator[List[Row]]:
+    """
+    ``(id, *columns)`` of the ``model`` rows matching ``where``, lowest ids
+    first, ``batch_size`` at a time.
+
+    The caller must delete each chunk and commit before asking for the next
+    one, so only a chunk of ids is in memory and each chunk is its own
+    short transaction.
+    """
+    while True:
+        rows = (
+            await db.execute(
+                select(model.id, *columns).where(where).order_by(model.id).limit(batch_size)
+            )
+        ).all()
+        if not rows:
+            return
+        yield rows
+
+
+async def _delete_ids(db, model, ids: List[int]) -> int:
+    result = await db.execute(
+        delete(model).where(model.id.in_(ids)).execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+
+async def purge_user(db, user_id: int, batch_size: int = PURGE_BATCH_ROWS) -> Dict[str, int]:
+    """
+    Delete ``user_id`` and everything it owns in chunks of ``batch_size`` rows.
+
+    Children go first, a chunk per transaction: the user's runs, the user's
+    likes (moving ``like_count`` of the liked simulations), every like and
+    run on the user's simulations, the simulations, then the articles and
+    their search index rows. The final ``DELETE`` of the user row is left
+    with almost nothing to cascade, so no single transaction grows with the
+    account; whatever was created meanwhile goes with ``ON DELETE CASCADE``.
+    Returns the number of rows deleted per kind (every kind, 0 included).
+    """
+    counts = dict.fromkeys(PURGE_KINDS, 0)
+
+    # 진행 중인 실행은 worker 가 행이 사라진 걸 보고 멈춘다
+    async for rows in _chunks(db, SimulationRun, SimulationRun.user_id == user_id, batch_size):
+        counts["runs"] += await _delete_ids(db, SimulationRun, [row.id for row in rows])
+        await db.commit()
+
+    async for rows in _chunks(
+        db, SimulationLike, SimulationLike.user_id == user_id, batch_size, SimulationLike.simulation_id
+    ):
+        deleted = await _delete_ids(db, SimulationLike, [row.id for row in rows])
+        counts["likes"] += deleted
+        simulation_ids = sorted(row.simulation_id for row in rows)
+        if deleted == len(rows):
+            # 고른 행을 모두 이 트랜잭션이 지웠다. uq_user_simulation_like 때문에 시뮬레이션마다 한 행이므로
+            # UPDATE 한 번으로 1씩 뺀다 (id 순서로 잠금)
+            like_count = Simulation.like_count - 1
+        else:
+            # 그 사이 취소된 좋아요가 있다 (그 요청이 이미 1 뺐음). 어느 행인지 모르므로 실제 행 수로 다시 센다
+            like_count = (
+                select(func.count(SimulationLike.id))
+                .where(SimulationLike.simulation_id == Simulation.id)
+                .scalar_subquery()
+            )
+        await db.execute(
+            update(Simulation)
+            .where(Simulation.id.in_(simulation_ids))
+            .values(like_count=like_count, updated_at=Simulation.updated_at)
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        response_cache.invalidate(
+            *(item_tag("simulation", simulation_id) for simulation_id in simulation_ids),
+            list_tag("simulation", "likes"),
+        )
+
+    async for rows in _chunks(db, Simulation, Simulation.owner_id == user_id, batch_size):
+        simulation_ids = [row.id for row in rows]
+        # 다른 유저가 남긴 좋아요/실행도 조각으로 먼저 지워서 시뮬레이션 DELETE 가 CASCADE 를 떠안지 않게
+        for model, key in ((SimulationLike, "likes"), (SimulationRun, "runs")):
+            where = model.simulation_id.in_(simulation_ids)
+            async for children in _chunks(db, model, where, batch_size):
+                counts[key] += await _delete_ids(db, model, [row.id for row in children])
+                await db.commit()
+        counts["simulations"] += await _delete_ids(db, Simulation, simulation_ids)
+        await db.commit()
+        response_cache.invalidate(
+            *(item_tag("simulation", simulation_id) for simulation_id in simulation_ids),
+            list_tag("simulation"),
+            list_tag("simulation", "likes"),
+        )
+
+    search = get_search_backend(db)
+    async for rows in _chunks(db, Article, Article.author_id == user_id, batch_size):
+        article_ids = [row.id for row in rows]
+        await search.remove_many(db, article_ids)
+        counts["articles"] += await _delete_ids(db, Article, article_ids)
+        await db.commit()
+        response_cache.invalidate(
+            *(item_tag("article", article_id) for article_id in article_ids), list_tag("article")
+        )
+
+    result = await db.execute(
+        delete(User).where(User.id == user_id).execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    counts["users"] = result.rowcount
+    invalidate_user(user_id)
+    return counts
+
+
+async def purge_user_task(user_id: int, batch_size: int = PURGE_BATCH_ROWS) -> None:
+    """``purge_user`` on its own session, for ``BackgroundTasks``; releases ``purges_in_progress``."""
+    try:
+        async with asynccontextmanager(get_async_db)() as db:
+            counts = await purge_user(db, user_id, batch_size)
+        purge_log.info("user %s purged: %s", user_id, counts)
+    except Exception:
+        # 중간에 실패해도 지운 조각은 commit 됐으니 다시 실행하면 남은 것부터 이어서 지운다
+        purge_log.exception("user %s purge failed", user_id)
+    finally:
+        purges_in_progress.discard(user_id)
+
+
+async def _purge(user_id: int, batch_size: int) -> Dict[str, int]:
+    async with asynccontextmanager(get_async_db)() as db:
+        counts = await purge_user(db, user_id, batch_size)
+    if DB_MODE == "async":
+        await async_engine.dispose()
+    return counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="계정과 그 계정의 모든 데이터 삭제")
+    parser.add_argument("user_id", type=int)
+    parser.add_argument("--batch-size", type=int, default=PURGE_BATCH_ROWS)
+    args = parser.parse_args()
+
+    counts = asyncio.run(_purge(args.user_id, args.batch_size))
+    if not counts.get("users"):
+        print(f"user {args.user_id} 없음 (남아 있던 데이터만 정리)")
+    print("삭제:", ", ".join(f"{kind} {count}건" for kind, count in sorted(counts.items())))
+
+
+if __name__ == "__main__":
+    main()
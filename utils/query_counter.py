@@ -0,0 +1,52 @@
+from contextlib import contextmanager
+from typing import Iterator, List
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+class QueryCounter:
+    def __init__(self) -> None:
+        self.statements: List[str] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        self.statements.append(statement)
+
+
+@contextmanager
+def count_queries(engine) -> Iterator[QueryCounter]:
+    """
+    Record every SQL statement sent through ``engine`` inside the block.
+
+    Accepts both ``Engine`` and ``AsyncEngine``; works for requests made with
+    ``TestClient`` because it hooks the engine, not the session.
+    """
+    sync_engine: Engine = engine.sync_engine if isinstance(engine, AsyncEngine) else engine
+    counter = QueryCounter()
+    event.listen(sync_engine, "before_cursor_execute", counter._on_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", counter._on_execute)
+
+
+@contextmanager
+def assert_max_queries(engine, limit: int) -> Iterator[QueryCounter]:
+    """
+    Fail if the block issues more than ``limit`` statements.
+
+    Meant for tests that pin an endpoint's query budget, e.g.::
+
+        with assert_max_queries(async_engine, 1):
+            client.get("/api/simulations/?size=100")
+    """
+    with count_queries(engine) as counter:
+        yield counter
+    if counter.count > limit:
+        listing = "\n".join(f"  {i}. {sql}" for i, sql in enumerate(counter.statements, 1))
+        raise AssertionError(f"expected at most {limit} queries, got {counter.count}:\n{listing}")
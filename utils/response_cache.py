@@ -0,0 +1,210 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Hashable, Iterable, List, NamedTuple, Optional
+
+from fastapi import Request, Response
+
+from utils.metrics import exposition, registry
+from utils.responses import dumps
+
+# 렌더링된 공개 응답 본문 메모리 예산 / 프로세스 간 무효화가 없으므로 TTL 로 최대 지연을 제한
+RESPONSE_CACHE_BYTES = int(os.getenv("RESPONSE_CACHE_BYTES", str(32 * 1024 * 1024)))
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "30"))
+# 클라이언트/프록시가 재검증 없이 쓸 수 있는 시간 (0 이면 매번 If-None-Match 로 재검증)
+RESPONSE_CACHE_MAX_AGE = int(os.getenv("RESPONSE_CACHE_MAX_AGE", "0"))
+
+# 읽는 중 무효화 감지를 위해 기억하는 태그 수 상한
+MAX_TRACKED_TAGS = 100_000
+
+PUBLIC_CACHE_CONTROL = f"public, max-age={RESPONSE_CACHE_MAX_AGE}, must-revalidate"
+
+
+class CachedResponse(NamedTuple):
+    body: bytes
+    etag: str
+    headers: dict
+
+
+def make_etag(versions: Iterable) -> str:
+    """
+    Weak ETag over resource versions, e.g. ``(id, updated_at, like_count)``
+    per item. A like changes the tag without touching ``updated_at``.
+    """
+    digest = hashlib.sha1(repr(list(versions)).encode()).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # 약한 비교: W/ 접두어는 무시
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in header.split(","))
+
+
+class ResponseCache:
+    """
+    In-process cache of rendered JSON for public GET responses.
+
+    Entries are LRU-evicted beyond ``max_bytes`` of body and expire after
+    ``ttl`` seconds. Each entry carries tags (``"simulation:3"``,
+    ``"simulation:list:likes"``, ...) and writers call ``invalidate`` with the
+    tags they affect, so only those entries are dropped. ``begin`` /
+    ``store`` guard against a reader caching data it loaded before a write
+    that invalidated it in the meantime.
+    """
+
+    def __init__(self, max_bytes: int, ttl: float):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._tags: dict = {}
+        self._used = 0
+        # 무효화마다 1 증가. 태그별로 마지막 무효화 시점을 기억 (너무 많아지면 _floor 로 접는다)
+        self._generation = 0
+        self._invalidated_at: dict = {}
+        self._floor = 0
+        # 태그별 마지막 무효화 시각 (replica 에서 읽은 응답이 복제 지연으로 오래된 값일 수 있는지 판단)
+        self._invalidated_time: dict = {}
+        self._floor_time = float("-inf")
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.bytes_served = 0
+        self.bytes_saved = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] <= time.monotonic():
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def begin(self) -> int:
+        """Token to pass to ``store`` once the response has been built."""
+        return self._generation
+
+    def store(
+        self, key: Hashable, cached: CachedResponse, tags: List[str], token: int, max_lag: float = 0.0
+    ) -> None:
+        """
+        Cache ``cached`` under ``key`` unless a tag was invalidated after
+        ``token`` was taken, or, for data read from a replica that may lag
+        by ``max_lag`` seconds, within the last ``max_lag`` seconds.
+        """
+        with self._lock:
+            # 읽는 사이에 관련 태그가 무효화됐으면 오래된 데이터일 수 있으므로 저장하지 않는다
+            if token < self._floor or len(cached.body) > self.max_bytes:
+                return
+            if any(self._invalidated_at.get(tag, -1) >= token for tag in tags):
+                return
+            if max_lag > 0:
+                recent = time.monotonic() - max_lag
+                if self._floor_time >= recent or any(
+                    self._invalidated_time.get(tag, float("-inf")) >= recent for tag in tags
+                ):
+                    return
+            self._remove(key)
+            self._entries[key] = (cached, time.monotonic() + self.ttl, tags)
+            self._used += len(cached.body)
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while self._used > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self._used -= len(entry[0].body)
+        for tag in entry[2]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def invalidate(self, *tags: str) -> None:
+        with self._lock:
+            now = time.monotonic()
+            if len(self._invalidated_at) > MAX_TRACKED_TAGS:
+                self._invalidated_at.clear()
+                self._invalidated_time.clear()
+                self._floor = self._generation + 1
+                self._floor_time = now
+            for tag in tags:
+                self._invalidated_at[tag] = self._generation
+                self._invalidated_time[tag] = now
+                for key in list(self._tags.get(tag, ())):
+                    self._remove(key)
+                    self.invalidations += 1
+            self._generation += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._floor = self._generation
+            self._floor_time = time.monotonic()
+            self._invalidated_at.clear()
+            self._invalidated_time.clear()
+            self._entries.clear()
+            self._tags.clear()
+            self._used = 0
+
+    def respond(self, request: Request, cached: CachedResponse, hit: bool = True) -> Response:
+        """200 with the rendered body, or 304 if the client already has this ETag."""
+        headers = {**cached.headers, "ETag": cached.etag, "Cache-Control": PUBLIC_CACHE_CONTROL}
+        if _etag_matches(request, cached.etag):
+            self.not_modified += 1
+            self.bytes_saved += len(cached.body)
+            return Response(status_code=304, headers=headers)
+        if hit:
+            self.bytes_served += len(cached.body)
+        return Response(cached.body, media_type="application/json", headers=headers)
+
+    def metric_lines(self) -> List[str]:
+        return [
+            *exposition("response_cache_entries", "gauge", "Rendered responses in the cache.", len(self._entries)),
+            *exposition("response_cache_bytes", "gauge", "Body bytes held by the cache.", self._used),
+            *exposition("response_cache_max_bytes", "gauge", "RESPONSE_CACHE_BYTES budget.", self.max_bytes),
+            *exposition(
+                "response_cache_lookups_total",
+                "counter",
+                "Cache lookups by result.",
+                {'result="hit"': self.hits, 'result="miss"': self.misses},
+            ),
+            *exposition("response_cache_not_modified_total", "counter", "304 responses to If-None-Match.", self.not_modified),
+            # 캐시에서 바로 보낸 본문 / 304 로 아예 보내지 않은 본문
+            *exposition("response_cache_served_bytes_total", "counter", "Body bytes sent from the cache.", self.bytes_served),
+            *exposition("response_cache_saved_bytes_total", "counter", "Body bytes not sent thanks to 304.", self.bytes_saved),
+            *exposition("response_cache_invalidations_total", "counter", "Entries dropped by write invalidation.", self.invalidations),
+        ]
+
+
+def render(content, etag: str, headers: Optional[dict] = None) -> CachedResponse:
+    return CachedResponse(dumps(content), etag, headers or {})
+
+
+def item_tag(kind: str, item_id: int) -> str:
+    return f"{kind}:{item_id}"
+
+
+def list_tag(kind: str, sort: Optional[str] = None) -> str:
+    return f"{kind}:list" if sort is None else f"{kind}:list:{sort}"
+
+
+response_cache = ResponseCache(RESPONSE_CACHE_BYTES, RESPONSE_CACHE_TTL)
+registry.add_collector(response_cache.metric_lines)
@@ -0,0 +1,31 @@
+import time
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+
+from utils.metrics import record_serialization
+
+
+def dumps(content: Any) -> bytes:
+    """
+    orjson encoding of plain rows: dicts, lists, datetimes (ISO 8601, same as
+    ``jsonable_encoder``) and numpy arrays, without a recursive Python walk.
+    """
+    started = time.perf_counter()
+    body = orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+    record_serialization(time.perf_counter() - started)
+    return body
+
+
+class ORJSONResponse(JSONResponse):
+    """
+    JSON response rendered by orjson.
+
+    For list pages built straight from ``Row`` tuples. Routes that return a
+    single validated model go through ``response_model`` instead, which
+    FastAPI already serializes in pydantic-core.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,197 @@
+import hashlib
+import json
+import os
+import threading
+import zlib
+from collections import OrderedDict
+from typing import List, Optional
+
+from physics import ENGINE_VERSION
+from schemas.simulation import SimulationParams
+from utils.metrics import exposition, registry
+
+# 메모리 계층 예산 (압축된 바이트 기준), 디스크 계층 위치/예산
+RESULT_CACHE_MEMORY_BYTES = int(os.getenv("RESULT_CACHE_MEMORY_BYTES", str(64 * 1024 * 1024)))
+RESULT_CACHE_DIR = os.getenv("RESULT_CACHE_DIR", "./.cache/results")
+RESULT_CACHE_DISK_BYTES = int(os.getenv("RESULT_CACHE_DISK_BYTES", str(1024 * 1024 * 1024)))
+
+
+# 궤적 자체에는 영향이 없는 필드 (실행 길이, frame 간격)
+TRAJECTORY_INDEPENDENT_FIELDS = {"steps", "output_stride"}
+
+
+def _digest(params: dict) -> str:
+    canonical = json.dumps(
+        {"engine": ENGINE_VERSION, "params": params},
+        sort_keys=True,
+        separators=(",", ":"),
+        allow_nan=False,
+    )
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def params_key(params: SimulationParams) -> str:
+    """
+    Content address of a run: sha256 over canonical JSON of the params and
+    ``ENGINE_VERSION``.
+
+    Keys are sorted and separators fixed, so forks that only differ in key
+    order or in fields left at their defaults hash the same.
+    """
+    return _digest(params.model_dump(mode="json"))
+
+
+def trajectory_key(params: SimulationParams) -> str:
+    """
+    Like ``params_key`` but ignoring ``steps`` and ``output_stride``: runs that
+    share it follow the same trajectory, so their checkpoints are interchangeable.
+    """
+    return _digest(params.model_dump(mode="json", exclude=TRAJECTORY_INDEPENDENT_FIELDS))
+
+
+class ResultCache:
+    """
+    Two-tier cache of run results keyed by ``params_key``.
+
+    Values are stored as zlib-compressed JSON. The memory tier is an LRU
+    bounded by ``memory_bytes`` of compressed payload; the disk tier keeps one
+    file per key under ``directory`` (shared by the API and worker processes)
+    and drops the least recently used files once ``disk_bytes`` is exceeded.
+    A disk hit is promoted to memory.
+    """
+
+    def __init__(self, memory_bytes: int, directory: str, disk_bytes: int):
+        self.memory_bytes = memory_bytes
+        self.directory = directory
+        self.disk_bytes = disk_bytes
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_used = 0
+        self._disk_used: Optional[int] = None  # 처음 쓸 때 디렉터리를 훑어서 계산
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.memory_evictions = 0
+        self.disk_evictions = 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.json.z")
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            blob = self._memory.get(key)
+            if blob is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return json.loads(zlib.decompress(blob))
+
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                blob = f.read()
+            os.utime(path)  # 디스크 계층의 LRU 순서는 mtime
+        except OSError:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.disk_hits += 1
+            self._remember(key, blob)
+        return json.loads(zlib.decompress(blob))
+
+    def set(self, key: str, value: dict, memory: bool = True) -> None:
+        """Store ``value``; ``memory=False`` writes the disk tier only (worker processes)."""
+        blob = zlib.compress(json.dumps(value, separators=(",", ":")).encode(), 1)
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(blob)
+        # 다른 프로세스가 같은 키를 동시에 써도 읽는 쪽은 항상 완성된 파일만 본다
+        os.replace(tmp, path)
+
+        with self._lock:
+            self.stores += 1
+            if memory:
+                self._remember(key, blob)
+            if self._disk_used is not None:
+                self._disk_used += len(blob)
+        self._prune_disk()
+
+    def _remember(self, key: str, blob: bytes) -> None:
+        if len(blob) > self.memory_bytes:
+            return
+        old = self._memory.pop(key, None)
+        if old is not None:
+            self._memory_used -= len(old)
+        self._memory[key] = blob
+        self._memory_used += len(blob)
+        while self._memory_used > self.memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_used -= len(evicted)
+            self.memory_evictions += 1
+
+    def _scan_disk(self) -> list:
+        files = []
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                if name.endswith(".json.z"):
+                    path = os.path.join(root, name)
+                    try:
+                        st = os.stat(path)
+                    except OSError:
+                        continue
+                    files.append((st.st_mtime, st.st_size, path))
+        return files
+
+    def _prune_disk(self) -> None:
+        if self._disk_used is not None and self._disk_used <= self.disk_bytes:
+            return
+        # 다른 프로세스도 같은 디렉터리에 쓰므로 예산을 넘었을 때만 실제 크기를 다시 센다
+        files = self._scan_disk()
+        used = sum(size for _, size, _ in files)
+        if used > self.disk_bytes:
+            files.sort()
+            for _, size, path in files:
+                if used <= self.disk_bytes * 0.9:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                used -= size
+                with self._lock:
+                    self.disk_evictions += 1
+        self._disk_used = used
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._memory_used = 0
+
+    def metric_lines(self) -> List[str]:
+        return [
+            *exposition(
+                "result_cache_engine_info", "gauge", "ENGINE_VERSION that cache keys are tied to.",
+                {f'engine_version="{ENGINE_VERSION}"': 1},
+            ),
+            *exposition("result_cache_memory_entries", "gauge", "Results held in memory.", len(self._memory)),
+            *exposition("result_cache_memory_bytes", "gauge", "Compressed bytes held in memory.", self._memory_used),
+            *exposition("result_cache_memory_budget_bytes", "gauge", "RESULT_CACHE_MEMORY_BYTES.", self.memory_bytes),
+            *exposition("result_cache_disk_budget_bytes", "gauge", "RESULT_CACHE_DISK_BYTES.", self.disk_bytes),
+            *exposition(
+                "result_cache_lookups_total", "counter", "Result cache lookups by where they were answered.",
+                {'result="memory_hit"': self.memory_hits, 'result="disk_hit"': self.disk_hits, 'result="miss"': self.misses},
+            ),
+            *exposition("result_cache_stores_total", "counter", "Results written to the cache.", self.stores),
+            *exposition(
+                "result_cache_evictions_total", "counter", "Results evicted over budget.",
+                {'tier="memory"': self.memory_evictions, 'tier="disk"': self.disk_evictions},
+            ),
+        ]
+
+
+result_cache = ResultCache(RESULT_CACHE_MEMORY_BYTES, RESULT_CACHE_DIR, RESULT_CACHE_DISK_BYTES)
+registry.add_collector(result_cache.metric_lines)
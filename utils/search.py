@@ -0,0 +1,173 @@
+from abc import ABC, abstractmethod
+from typing import List
+
+from sqlalchemy import DDL, column, delete, event, func, insert, inspect, literal_column, or_, select, table
+from sqlalchemy.engine import Connection
+from sqlalchemy.schema import CreateIndex
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.article import Article
+
+# SQLite 로컬 테스트용 FTS5 테이블 (rowid = articles.id)
+# trigram 토크나이저라 한글도 부분 문자열로 검색된다 (검색어 3글자 이상)
+articles_fts = table("articles_fts", column("rowid"), column("title"), column("content"))
+
+_CREATE_ARTICLES_FTS = DDL(
+    "CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts "
+    "USING fts5(title, content, tokenize='trigram')"
+)
+
+event.listen(Article.__table__, "after_create", _CREATE_ARTICLES_FTS.execute_if(dialect="sqlite"))
+event.listen(
+    Article.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS articles_fts").execute_if(dialect="sqlite"),
+)
+
+
+def _fulltext_index():
+    return next(index for index in Article.__table__.indexes if index.name == "ft_articles_title_content")
+
+
+def ensure_search_index(conn: Connection) -> int:
+    """
+    Create the search index if missing and index the articles it lacks.
+
+    ``create_all`` only builds it together with a new ``articles`` table, so
+    existing databases go through this at startup: MySQL gets
+    ``ft_articles_title_content`` (FULLTEXT, ngram), SQLite gets
+    ``articles_fts`` plus the rows it is missing. A no-op for other
+    dialects and before ``articles`` exists. Returns the number of articles
+    added to the index.
+    """
+    if conn.dialect.name not in ("mysql", "sqlite") or not inspect(conn).has_table(Article.__tablename__):
+        return 0
+    if conn.dialect.name == "mysql":
+        index = _fulltext_index()
+        if index.name in {existing["name"] for existing in inspect(conn).get_indexes(Article.__tablename__)}:
+            return 0
+        # 큰 테이블이면 시간이 걸린다 (MySQL 이 테이블을 다시 만들면서 색인)
+        conn.execute(CreateIndex(index))
+        return conn.scalar(select(func.count(Article.id)))
+    conn.execute(_CREATE_ARTICLES_FTS)
+    # 이미 색인된 글은 건너뛰므로 매번 실행해도 된다
+    return conn.execute(
+        insert(articles_fts).from_select(
+            ["rowid", "title", "content"],
+            select(Article.id, Article.title, Article.content).where(
+                Article.id.not_in(select(articles_fts.c.rowid))
+            ),
+        )
+    ).rowcount
+
+
+class SearchBackend(ABC):
+    """
+    Relevance-ranked search over public articles.
+
+    ``index``/``remove`` are called by the article router inside the same
+    transaction as the write, so backends with a separate index stay in sync.
+    """
+
+    @abstractmethod
+    async def search(self, db: AsyncSession, q: str, limit: int, offset: int) -> List[Article]:
+        ...
+
+    async def index(self, db: AsyncSession, article: Article) -> None:
+        pass
+
+    async def remove(self, db: AsyncSession, article_id: int) -> None:
+        pass
+
+    async def remove_many(self, db: AsyncSession, article_ids: List[int]) -> None:
+        for article_id in article_ids:
+            await self.remove(db, article_id)
+
+
+class MySQLFullTextBackend(SearchBackend):
+    """Uses ``ft_articles_title_content`` (FULLTEXT WITH PARSER ngram); MySQL maintains it."""
+
+    async def search(self, db: AsyncSession, q: str, limit: int, offset: int) -> List[Article]:
+        score = match(Article.title, Article.content, against=q).in_natural_language_mode()
+        result = await db.scalars(
+            select(Article)
+            .where(Article.is_public.is_(True), score > 0)
+            .order_by(score.desc(), Article.id.desc())
+            .offset(offset)
+            .limit(limit)
+        )
+        return list(result.all())
+
+
+class SQLiteFTS5Backend(SearchBackend):
+    # trigram 토크나이저는 3글자 미만 검색어를 매칭하지 못한다
+    MIN_TERM_LENGTH = 3
+
+    def _match_query(self, q: str) -> str:
+        # 사용자 입력을 FTS5 문법으로 해석하지 않도록 단어별 phrase 로 감싸고,
+        # MySQL natural language mode 처럼 OR 로 묶는다
+        return " OR ".join(
+            '"' + term.replace('"', '""') + '"'
+            for term in q.split()
+            if len(term) >= self.MIN_TERM_LENGTH
+        )
+
+    async def search(self, db: AsyncSession, q: str, limit: int, offset: int) -> List[Article]:
+        match_query = self._match_query(q)
+        if not match_query:
+            return await _FALLBACK.search(db, q, limit, offset)
+
+        fts = literal_column("articles_fts")
+        result = await db.scalars(
+            select(Article)
+            .join(articles_fts, articles_fts.c.rowid == Article.id)
+            .where(Article.is_public.is_(True), fts.op("MATCH")(match_query))
+            .order_by(func.bm25(fts), Article.id.desc())
+            .offset(offset)
+            .limit(limit)
+        )
+        return list(result.all())
+
+    async def index(self, db: AsyncSession, article: Article) -> None:
+        await self.remove(db, article.id)
+        await db.execute(
+            insert(articles_fts).values(
+                rowid=article.id, title=article.title, content=article.content
+            )
+        )
+
+    async def remove(self, db: AsyncSession, article_id: int) -> None:
+        await db.execute(delete(articles_fts).where(articles_fts.c.rowid == article_id))
+
+    async def remove_many(self, db: AsyncSession, article_ids: List[int]) -> None:
+        await db.execute(delete(articles_fts).where(articles_fts.c.rowid.in_(article_ids)))
+
+
+class LikeSearchBackend(SearchBackend):
+    """Fallback for other databases: unindexed ILIKE scan, newest first."""
+
+    async def search(self, db: AsyncSession, q: str, limit: int, offset: int) -> List[Article]:
+        like = f"%{q}%"
+        result = await db.scalars(
+            select(Article)
+            .where(
+                Article.is_public.is_(True),
+                or_(Article.title.ilike(like), Article.content.ilike(like)),
+            )
+            .order_by(Article.created_at.desc(), Article.id.desc())
+            .offset(offset)
+            .limit(limit)
+        )
+        return list(result.all())
+
+
+_BACKENDS = {
+    "mysql": MySQLFullTextBackend(),
+    "sqlite": SQLiteFTS5Backend(),
+}
+_FALLBACK = LikeSearchBackend()
+
+
+def get_search_backend(db: AsyncSession) -> SearchBackend:
+    return _BACKENDS.get(db.get_bind().dialect.name, _FALLBACK)
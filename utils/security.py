@@ -1,30 +1,40 @@
 import os
+import time
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import List, Optional
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
-from passlib.context import CryptContext
-from sqlalchemy.orm import Session
+from sqlalchemy import event, inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
+from sqlalchemy.orm.util import identity_key
 
 from models.user import User
-from utils.dependencies import get_db
+from utils.cache import TTLCache
+from utils.dependencies import get_async_db, get_read_db, replica_router
+from utils.metrics import exposition, registry
+from utils.passwords import hash_password, pwd_context, verify_password  # noqa: F401
 
 SECRET_KEY = os.getenv("SECRET_KEY", "CHANGE_ME")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
-
+# 토큰 -> user_id, user_id -> User 컬럼 스냅샷 캐시 (프로세스 로컬)
+# 무효화도 프로세스 로컬이라, 다른 uvicorn worker 가 바꾸거나 지운 유저는 이 worker 에서 TTL 동안 그대로 보인다.
+# 그래서 worker 가 여럿이면(WEB_CONCURRENCY, uvicorn --workers 기본값) 기본 TTL 을 짧게 잡는다
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1"))
+AUTH_CACHE_TTL_SECONDS = float(os.getenv("AUTH_CACHE_TTL_SECONDS", "60" if WEB_CONCURRENCY <= 1 else "5"))
+AUTH_CACHE_MAX_ENTRIES = int(os.getenv("AUTH_CACHE_MAX_ENTRIES", "10000"))
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login", auto_error=False)
 
+token_cache = TTLCache(AUTH_CACHE_MAX_ENTRIES, AUTH_CACHE_TTL_SECONDS)
+user_cache = TTLCache(AUTH_CACHE_MAX_ENTRIES, AUTH_CACHE_TTL_SECONDS)
 
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+_USER_COLUMNS = [column.key for column in inspect(User).column_attrs]
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -35,21 +45,130 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 
-def get_current_user(db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)) -> User:
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
+def invalidate_user(user_id: int) -> None:
+    """Drop the cached row for ``user_id``; call after changing a user outside the ORM."""
+    user_cache.pop(user_id)
+
+
+def invalidate_token(token: str) -> None:
+    """Forget a token so its next use is decoded and looked up again."""
+    token_cache.pop(token)
+
+
+def auth_cache_metric_lines() -> List[str]:
+    caches = {'cache="token"': token_cache, 'cache="user"': user_cache}
+    return [
+        *exposition(
+            "auth_cache_entries", "gauge", "Entries in the auth caches.",
+            {labels: len(cache) for labels, cache in caches.items()},
+        ),
+        *exposition(
+            "auth_cache_lookups_total", "counter", "Auth cache lookups by result.",
+            {
+                f'{labels},result="{result}"': getattr(cache, attr)
+                for labels, cache in caches.items()
+                for result, attr in (("hit", "hits"), ("miss", "misses"))
+            },
+        ),
+        *exposition(
+            "auth_cache_evictions_total", "counter", "Entries evicted by AUTH_CACHE_MAX_ENTRIES.",
+            {labels: cache.evictions for labels, cache in caches.items()},
+        ),
+    ]
+
+
+registry.add_collector(auth_cache_metric_lines)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_on_user_change(mapper, connection, target: User) -> None:
+    invalidate_user(target.id)
+
+
+def _decode_user_id(token: str) -> Optional[int]:
+    user_id = token_cache.get(token)
+    if user_id is not None:
+        return user_id
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         user_id = payload.get("sub")
         if user_id is None:
-            raise credentials_exception
-    except JWTError:
-        raise credentials_exception
+            return None
+        user_id = int(user_id)
+    except (JWTError, ValueError):
+        return None
 
-    user = db.query(User).filter(User.id == int(user_id)).first()
+    exp = payload.get("exp")
+    ttl = exp - time.time() if exp is not None else None
+    token_cache.set(token, user_id, ttl=ttl)
+    return user_id
+
+
+async def resolve_user(db: AsyncSession, token: Optional[str]) -> Optional[User]:
+    """
+    Map a bearer token to its ``User`` row, or ``None`` if it is invalid.
+
+    Cache hits are attached to ``db`` as persistent objects without issuing
+    a SELECT, so callers can treat them like any freshly loaded row.
+    Invalidation only reaches this process's cache: a user changed or
+    deleted through another worker is served from the snapshot here for up
+    to ``AUTH_CACHE_TTL_SECONDS``. Rows read from a replica session are not
+    cached, so a lagging replica cannot put back a snapshot just invalidated.
+    """
+    if not token:
+        return None
+    user_id = _decode_user_id(token)
+    if user_id is None:
+        return None
+
+    snapshot = user_cache.get(user_id)
+    if snapshot is None:
+        user = await db.get(User, user_id)
+        if user is not None and not db.info.get("replica"):
+            user_cache.set(user_id, {key: getattr(user, key) for key in _USER_COLUMNS})
+        return user
+
+    identity = db.sync_session.identity_map.get(identity_key(User, user_id))
+    if identity is not None:
+        return identity
+    user = User(**snapshot)
+    make_transient_to_detached(user)
+    db.add(user)
+    return user
+
+
+# 이 메서드로 인증된 요청은 쓰기로 보고, 잠시 그 토큰의 읽기를 primary 로 보낸다
+_WRITE_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+
+
+async def get_current_user(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    token: str = Depends(oauth2_scheme),
+) -> User:
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    user = await resolve_user(db, token)
     if user is None:
         raise credentials_exception
+    if request.method in _WRITE_METHODS:
+        replica_router.mark_write(token)
     return user
+
+
+async def get_optional_user(
+    db: AsyncSession = Depends(get_read_db),
+    token: Optional[str] = Depends(optional_oauth2_scheme),
+) -> Optional[User]:
+    """
+    The caller's ``User`` if a valid token was sent, else ``None``; for GET endpoints.
+
+    Resolves on the ``get_read_db`` session, which FastAPI shares with an
+    endpoint that also depends on ``get_read_db``, so no primary session is
+    opened just to authenticate a read.
+    """
+    return await resolve_user(db, token)
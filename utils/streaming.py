@@ -0,0 +1,211 @@
+"""
+Live frame fan-out for running simulations.
+
+The worker process that owns a run overwrites ``live_frame_path(run_id)``
+with the newest encoded frame (atomic rename, at most ``LIVE_MAX_FPS`` per
+second). In the API process one ``FrameChannel`` per run tails that file and
+fans each new frame out to every subscribed viewer. Each viewer gets its own
+frame rate (decimation) and a small bounded queue: when a client cannot
+keep up its oldest queued frame is dropped instead of buffering without
+limit.
+"""
+import asyncio
+import os
+import struct
+import time
+from typing import Dict, List, Optional, Set
+
+import numpy as np
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+
+from database import DB_MODE, AsyncSessionLocal, SessionLocal
+from models.simulation_run import SimulationRun
+from utils.metrics import exposition, registry
+
+LIVE_FRAME_DIR = os.getenv("LIVE_FRAME_DIR", "./data/live")
+# worker 가 live 파일을 갱신하는 최대 빈도 / API 가 파일을 확인하는 간격
+LIVE_MAX_FPS = 30
+LIVE_POLL_INTERVAL = 1 / 60
+# 시청자별로 쌓아 둘 frame 수 (넘치면 오래된 frame 부터 버림)
+SUBSCRIBER_QUEUE_FRAMES = 2
+# live 파일이 없을 때 실행 상태를 DB 에서 확인하는 간격
+STATUS_CHECK_INTERVAL = 2.0
+
+# magic, flags, frame index, step, time, n_bodies 뒤에 float32 positions[n_bodies, 3]
+FRAME_HEADER = struct.Struct("<4sIIQdI")
+FRAME_MAGIC = b"GRVF"
+FLAG_FINAL = 1  # 정상 종료된 실행의 마지막 frame
+FLAG_ABORTED = 2  # 취소/실패, payload 없음
+
+
+def live_frame_path(run_id: int) -> str:
+    return os.path.join(LIVE_FRAME_DIR, f"{run_id}.frame")
+
+
+def encode_frame(
+    index: int, step: int, time_: float, positions: Optional[np.ndarray], flags: int = 0
+) -> bytes:
+    n_bodies = 0 if positions is None else positions.shape[0]
+    header = FRAME_HEADER.pack(FRAME_MAGIC, flags, index, step, time_, n_bodies)
+    if positions is None:
+        return header
+    return header + positions.astype("<f4").tobytes()
+
+
+def decode_header(blob: bytes) -> dict:
+    magic, flags, index, step, time_, n_bodies = FRAME_HEADER.unpack_from(blob)
+    if magic != FRAME_MAGIC:
+        raise ValueError("not a frame")
+    return {"flags": flags, "index": index, "step": step, "time": time_, "n_bodies": n_bodies}
+
+
+def publish_live_frame(run_id: int, frame: bytes) -> None:
+    """Replace the run's live frame (worker side)."""
+    path = live_frame_path(run_id)
+    os.makedirs(LIVE_FRAME_DIR, exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(frame)
+    os.replace(tmp, path)
+
+
+def remove_live_frame(run_id: int) -> None:
+    try:
+        os.remove(live_frame_path(run_id))
+    except OSError:
+        pass
+
+
+class Subscription:
+    """One viewer: decimated to ``fps`` and bounded to ``SUBSCRIBER_QUEUE_FRAMES``."""
+
+    def __init__(self, fps: float):
+        self.interval = 1.0 / fps
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_FRAMES)
+        self.next_at = 0.0
+        self.sent = 0
+        self.dropped = 0
+
+    def offer(self, frame: Optional[bytes], force: bool = False) -> None:
+        """Queue ``frame`` (``None`` ends the stream); ``force`` skips decimation."""
+        now = time.monotonic()
+        if not force and now < self.next_at:
+            return
+        self.next_at = now + self.interval
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(frame)
+        self.sent += 1
+
+
+def _read_if_changed(path: str, last_mtime: int):
+    try:
+        mtime = os.stat(path).st_mtime_ns
+        if mtime == last_mtime:
+            return last_mtime, None
+        with open(path, "rb") as f:
+            return mtime, f.read()
+    except FileNotFoundError:
+        return None, None
+
+
+def _run_status_sync(run_id: int) -> Optional[str]:
+    with SessionLocal() as db:
+        return db.scalar(select(SimulationRun.status).where(SimulationRun.id == run_id))
+
+
+async def _run_finished(run_id: int) -> bool:
+    if DB_MODE == "async":
+        async with AsyncSessionLocal() as db:
+            status = await db.scalar(select(SimulationRun.status).where(SimulationRun.id == run_id))
+    else:
+        status = await run_in_threadpool(_run_status_sync, run_id)
+    # jobs.queue.ACTIVE_STATUSES (jobs -> utils.streaming 순환 import 를 피하려고 직접 씀)
+    return status not in ("queued", "running")
+
+
+class FrameChannel:
+    """Single producer for one run, shared by all of its viewers."""
+
+    def __init__(self, broadcaster: "FrameBroadcaster", run_id: int):
+        self.broadcaster = broadcaster
+        self.run_id = run_id
+        self.subscribers: Set[Subscription] = set()
+        self.frames_read = 0
+        self.task = asyncio.create_task(self._produce())
+
+    def _close(self, last: Optional[bytes] = None) -> None:
+        for sub in self.subscribers:
+            if last is not None:
+                sub.offer(last, force=True)
+            sub.offer(None, force=True)
+
+    async def _produce(self) -> None:
+        path = live_frame_path(self.run_id)
+        last_mtime, last_index = None, None
+        next_status_check = 0.0
+        try:
+            while self.subscribers:
+                mtime, blob = await run_in_threadpool(_read_if_changed, path, last_mtime)
+                if blob is not None:
+                    last_mtime = mtime
+                    header = decode_header(blob)
+                    if header["flags"]:
+                        # 마지막 frame / 중단 알림은 decimation 과 무관하게 모두에게 보낸다
+                        self._close(blob)
+                        return
+                    if header["index"] != last_index:
+                        last_index = header["index"]
+                        self.frames_read += 1
+                        for sub in self.subscribers:
+                            sub.offer(blob)
+                elif mtime is None and time.monotonic() >= next_status_check:
+                    # 아직 대기 중이거나 이미 끝나서 파일이 정리된 경우
+                    next_status_check = time.monotonic() + STATUS_CHECK_INTERVAL
+                    if await _run_finished(self.run_id):
+                        self._close()
+                        return
+                await asyncio.sleep(LIVE_POLL_INTERVAL)
+        finally:
+            self.broadcaster.channels.pop(self.run_id, None)
+
+
+class FrameBroadcaster:
+    def __init__(self):
+        self.channels: Dict[int, FrameChannel] = {}
+        # 나간 시청자의 버린 frame 수 (남아 있는 시청자 것은 metric_lines 에서 더함)
+        self.dropped = 0
+
+    def subscribe(self, run_id: int, fps: float) -> Subscription:
+        sub = Subscription(fps)
+        channel = self.channels.get(run_id)
+        if channel is None:
+            channel = FrameChannel(self, run_id)
+            self.channels[run_id] = channel
+        channel.subscribers.add(sub)
+        return sub
+
+    def unsubscribe(self, run_id: int, sub: Subscription) -> None:
+        channel = self.channels.get(run_id)
+        if channel is not None:
+            # 마지막 시청자가 나가면 producer 는 다음 루프에서 스스로 끝난다
+            channel.subscribers.discard(sub)
+        self.dropped += sub.dropped
+        sub.dropped = 0
+
+    def metric_lines(self) -> List[str]:
+        channels = list(self.channels.values())
+        dropped = self.dropped + sum(s.dropped for c in channels for s in c.subscribers)
+        return [
+            *exposition("live_stream_channels", "gauge", "Runs with a live frame producer.", len(channels)),
+            *exposition(
+                "live_stream_viewers", "gauge", "Subscribed live viewers.", sum(len(c.subscribers) for c in channels)
+            ),
+            *exposition("live_stream_dropped_frames_total", "counter", "Frames dropped for slow viewers.", dropped),
+        ]
+
+
+broadcaster = FrameBroadcaster()
+registry.add_collector(broadcaster.metric_lines)
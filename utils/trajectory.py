@@ -0,0 +1,261 @@
+"""
+Binary trajectory files (``.traj``).
+
+Layout (little endian)::
+
+    [0, HEADER_BYTES)   magic b"GRVTRAJ1", uint32 JSON length, JSON header
+    masses              float32[n_bodies]
+    data                compression "none": positions float32[frames, n, 3]
+                                            then velocities float32[frames, n, 3]
+                        compression "zlib": per chunk of ``chunk_frames`` frames,
+                                            zlib(positions chunk) + zlib(velocities chunk)
+    frame index         int64 steps[frames], float64 times[frames]
+    chunk index         int64[chunks, 5] (first frame, then offset, nbytes per
+                        field), zlib only
+
+The header stores the byte offset of every section, so readers map each
+one with ``numpy.memmap`` and a frame range only touches the pages (or
+chunks) it covers. ``TrajectoryWriter.sync()`` appends a fresh index and
+rewrites the header, so an in-progress file is itself a valid (shorter)
+trajectory; that is what a resumed run copies its early frames from.
+"""
+import json
+import os
+import struct
+import zlib
+from typing import Optional, Sequence
+
+import numpy as np
+
+MAGIC = b"GRVTRAJ1"
+HEADER_BYTES = 4096
+FIELDS = ("positions", "velocities")
+DTYPE = np.dtype("<f4")
+
+TRAJECTORY_DIR = os.getenv("TRAJECTORY_DIR", "./data/trajectories")
+# none: memmap 으로 바로 슬라이스 / zlib: chunk 단위 압축 (작지만 읽을 때 chunk 를 풀어야 함)
+TRAJECTORY_COMPRESSION = os.getenv("TRAJECTORY_COMPRESSION", "none")
+TRAJECTORY_CHUNK_FRAMES = int(os.getenv("TRAJECTORY_CHUNK_FRAMES", "16"))
+# 예상 크기가 이보다 크면 trajectory 를 저장하지 않는다 (output_stride 를 키우라는 의미)
+TRAJECTORY_MAX_BYTES = int(os.getenv("TRAJECTORY_MAX_BYTES", str(2 * 1024**3)))
+
+
+def trajectory_path(params_hash: str) -> str:
+    # 결과 캐시와 같은 키: 같은 파라미터의 포크는 파일 하나를 공유
+    return os.path.join(TRAJECTORY_DIR, params_hash[:2], f"{params_hash}.traj")
+
+
+def frame_count(steps: int, output_stride: int) -> int:
+    """Frames produced by a run: the initial state plus every leapfrog yield."""
+    return 1 + -(-steps // output_stride)
+
+
+def estimated_bytes(n_bodies: int, frames: int) -> int:
+    return HEADER_BYTES + n_bodies * DTYPE.itemsize * (1 + len(FIELDS) * 3 * frames)
+
+
+class TrajectoryWriter:
+    """
+    Streams frames into ``path`` through a temporary file.
+
+    ``close()`` writes the index and header and atomically moves the file into
+    place; ``abort()`` (or an exception inside ``with``) discards it, so
+    ``path`` never holds a partial trajectory. ``sync()`` makes the temporary
+    file readable as it stands (for checkpoints).
+    """
+
+    def __init__(
+        self,
+        path: str,
+        masses: np.ndarray,
+        max_frames: int,
+        compression: str = TRAJECTORY_COMPRESSION,
+        chunk_frames: int = TRAJECTORY_CHUNK_FRAMES,
+        meta: Optional[dict] = None,
+        tmp_path: Optional[str] = None,
+    ):
+        if compression not in ("none", "zlib"):
+            raise ValueError(f"unknown compression {compression!r}")
+        self.path = path
+        self.tmp_path = tmp_path or f"{path}.{os.getpid()}.tmp"
+        self.n_bodies = masses.shape[0]
+        self.max_frames = max_frames
+        self.compression = compression
+        self.chunk_frames = chunk_frames
+        self.meta = meta or {}
+        self.frame_bytes = self.n_bodies * 3 * DTYPE.itemsize
+        self.steps: list = []
+        self.times: list = []
+        self.chunks: list = []  # [first frame, (offset, nbytes) per field]
+        self._pending = {field: [] for field in FIELDS}
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._file = open(self.tmp_path, "wb+")
+        self._file.seek(HEADER_BYTES)
+        self._file.write(masses.astype(DTYPE).tobytes())
+        self.offsets = {"masses": HEADER_BYTES}
+        data_start = HEADER_BYTES + self.n_bodies * DTYPE.itemsize
+        if compression == "none":
+            region = max_frames * self.frame_bytes
+            self.offsets["positions"] = data_start
+            self.offsets["velocities"] = data_start + region
+            self._end = data_start + 2 * region
+        else:
+            self._end = data_start
+
+    def append(self, step: int, time: float, positions: np.ndarray, velocities: np.ndarray):
+        frame = len(self.steps)
+        if frame >= self.max_frames:
+            raise ValueError("trajectory is full")
+        self.steps.append(step)
+        self.times.append(time)
+        arrays = {"positions": positions, "velocities": velocities}
+        if self.compression == "none":
+            for field in FIELDS:
+                self._file.seek(self.offsets[field] + frame * self.frame_bytes)
+                self._file.write(arrays[field].astype(DTYPE).tobytes())
+            return
+        for field in FIELDS:
+            self._pending[field].append(arrays[field].astype(DTYPE))
+        if len(self._pending[FIELDS[0]]) == self.chunk_frames:
+            self._flush_chunk()
+
+    def _flush_chunk(self) -> None:
+        pending = len(self._pending[FIELDS[0]])
+        if not pending:
+            return
+        entry = [len(self.steps) - pending]
+        self._file.seek(self._end)
+        for field in FIELDS:
+            blob = zlib.compress(np.stack(self._pending[field]).tobytes(), 1)
+            self._file.write(blob)
+            entry += [self._end, len(blob)]
+            self._end += len(blob)
+            self._pending[field] = []
+        self.chunks.append(entry)
+
+    def _write_index(self) -> None:
+        if self.compression == "zlib":
+            self._flush_chunk()
+        n_frames = len(self.steps)
+        # 인덱스는 항상 끝에 새로 붙인다: 이전 sync 의 인덱스를 덮어쓰지 않으므로
+        # 헤더를 다시 쓰기 전에 죽어도 파일은 이전 sync 시점 그대로 유효하다
+        self._file.seek(self._end)
+        self.offsets["steps"] = self._end
+        self._file.write(np.asarray(self.steps, dtype="<i8").tobytes())
+        self.offsets["times"] = self._end + 8 * n_frames
+        self._file.write(np.asarray(self.times, dtype="<f8").tobytes())
+        self._end += 16 * n_frames
+        if self.compression == "zlib":
+            self.offsets["chunks"] = self._end
+            self._file.write(np.asarray(self.chunks, dtype="<i8").reshape(-1).tobytes())
+            self._end += 8 * 5 * len(self.chunks)
+
+        header = json.dumps(
+            {
+                "version": 1,
+                "n_bodies": self.n_bodies,
+                "n_frames": n_frames,
+                "max_frames": self.max_frames,
+                "dtype": DTYPE.str,
+                "fields": list(FIELDS),
+                "compression": self.compression,
+                "chunk_frames": self.chunk_frames,
+                "n_chunks": len(self.chunks),
+                "offsets": self.offsets,
+                "meta": self.meta,
+            }
+        ).encode()
+        if len(MAGIC) + 4 + len(header) > HEADER_BYTES:
+            raise ValueError("trajectory header too large")
+        self._file.seek(0)
+        self._file.write(MAGIC + struct.pack("<I", len(header)) + header)
+        self._file.flush()
+
+    def sync(self) -> None:
+        """Make the temporary file a valid trajectory of the frames so far."""
+        self._write_index()
+        os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        self._write_index()
+        self._file.close()
+        os.replace(self.tmp_path, self.path)
+
+    def abort(self) -> None:
+        self._file.close()
+        try:
+            os.remove(self.tmp_path)
+        except OSError:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class TrajectoryReader:
+    """Random access to frame ranges of a ``.traj`` file without loading it whole."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            prefix = f.read(len(MAGIC) + 4)
+            if prefix[: len(MAGIC)] != MAGIC:
+                raise ValueError(f"{path} is not a trajectory file")
+            (length,) = struct.unpack("<I", prefix[len(MAGIC) :])
+            self.header = json.loads(f.read(length))
+        self.n_bodies = self.header["n_bodies"]
+        self.n_frames = self.header["n_frames"]
+        self.compression = self.header["compression"]
+        self.chunk_frames = self.header["chunk_frames"]
+        offsets = self.header["offsets"]
+
+        self.masses = self._map(offsets["masses"], DTYPE, (self.n_bodies,))
+        self.steps = self._map(offsets["steps"], "<i8", (self.n_frames,))
+        self.times = self._map(offsets["times"], "<f8", (self.n_frames,))
+        if self.compression == "none":
+            shape = (self.header["max_frames"], self.n_bodies, 3)
+            self._fields = {field: self._map(offsets[field], DTYPE, shape) for field in FIELDS}
+        else:
+            self._chunks = self._map(offsets["chunks"], "<i8", (self.header["n_chunks"], 5))
+
+    def _map(self, offset: int, dtype, shape) -> np.ndarray:
+        if 0 in shape:
+            return np.empty(shape, dtype=dtype)
+        return np.memmap(self.path, dtype=dtype, mode="r", offset=offset, shape=shape)
+
+    def frame_indices(self, start: int = 0, stop: Optional[int] = None, stride: int = 1) -> range:
+        return range(*slice(start, stop, stride).indices(self.n_frames))
+
+    def read(self, frames: range, fields: Sequence[str] = FIELDS) -> np.ndarray:
+        """float32 array shaped (frames, fields, n_bodies, 3) for the given frame range."""
+        out = np.empty((len(frames), len(fields), self.n_bodies, 3), dtype=DTYPE)
+        if not len(frames):
+            return out
+        if self.compression == "none":
+            for j, field in enumerate(fields):
+                out[:, j] = self._fields[field][frames.start : frames.stop : frames.step]
+            return out
+
+        # 필요한 chunk 만 풀어서 해당 frame 을 골라 담는다
+        frame_list = np.asarray(frames)
+        first = self._chunks[:, 0]
+        chunk_of = np.searchsorted(first, frame_list, side="right") - 1
+        with open(self.path, "rb") as f:
+            for chunk in np.unique(chunk_of):
+                rows = np.flatnonzero(chunk_of == chunk)
+                local = frame_list[rows] - first[chunk]
+                for j, field in enumerate(fields):
+                    k = 1 + 2 * FIELDS.index(field)
+                    offset, nbytes = self._chunks[chunk, k], self._chunks[chunk, k + 1]
+                    f.seek(int(offset))
+                    data = np.frombuffer(zlib.decompress(f.read(int(nbytes))), dtype=DTYPE)
+                    out[rows, j] = data.reshape(-1, self.n_bodies, 3)[local]
+        return out
+
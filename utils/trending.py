@@ -0,0 +1,156 @@
+import argparse
+import math
+import os
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from models.simulation import SimulationLike
+from models.simulation_like import Simulation
+from models.simulation_trending import SimulationTrending, TrendingState
+from utils.response_cache import list_tag, response_cache
+
+# 좋아요 하나의 기여가 절반이 되는 시간
+TRENDING_HALF_LIFE_HOURS = float(os.getenv("TRENDING_HALF_LIFE_HOURS", "24"))
+# job worker 가 순위표를 갱신하는 간격(초). 0 이면 갱신하지 않음 (`python -m utils.trending` 을 cron 으로)
+TRENDING_REFRESH_SECONDS = float(os.getenv("TRENDING_REFRESH_SECONDS", "60"))
+# 지금 기준 점수(방금 누른 좋아요 1개 = 1.0)가 이보다 작아진 시뮬레이션은 순위표에서 뺀다
+TRENDING_MIN_SCORE = float(os.getenv("TRENDING_MIN_SCORE", "0.05"))
+# 아직 commit 되지 않은 좋아요를 건너뛰지 않도록 이만큼 전까지만 반영
+TRENDING_GRACE_SECONDS = 10.0
+
+# 점수의 시간 기준점: 바꾸면 순위표를 비우고 다시 계산해야 한다
+TRENDING_EPOCH = datetime(2024, 1, 1)
+_TAU_SECONDS = TRENDING_HALF_LIFE_HOURS * 3600.0 / math.log(2)
+
+
+def decay_exponent(at: datetime) -> float:
+    """``(at - TRENDING_EPOCH) / tau``: a like at ``at`` adds ``exp`` of this to the stored sum."""
+    return (at - TRENDING_EPOCH).total_seconds() / _TAU_SECONDS
+
+
+def current_score(score: float, now: datetime) -> float:
+    """Decayed score at ``now`` (sum of ``exp(-age / tau)`` over the likes) from a stored ``score``."""
+    return math.exp(score - decay_exponent(now))
+
+
+def _logaddexp(a: float, b: float) -> float:
+    high, low = max(a, b), min(a, b)
+    return high + math.log1p(math.exp(low - high))
+
+
+def refresh_trending(db: Session, now: Optional[datetime] = None, batch_size: int = 1000) -> Dict[str, int]:
+    """
+    Fold the likes created since the last refresh into ``simulation_trending``.
+
+    Scores are stored as ``log(sum(exp((liked_at - TRENDING_EPOCH) / tau)))``.
+    With the time origin fixed, ranking by the stored value equals ranking
+    by the exponentially decayed like count at any moment, so only
+    simulations with new likes are written. Likes are read by the
+    ``created_at`` range ``[liked_before, now - TRENDING_GRACE_SECONDS)``,
+    and each is counted once. Unlikes are not subtracted; they decay away
+    like any other like. Rows that decayed below ``TRENDING_MIN_SCORE`` are
+    pruned. Several workers may call this concurrently: a conditional
+    UPDATE of ``trending_state`` lets only one of them fold a given range.
+    Everything is one transaction.
+    """
+    now = now or datetime.utcnow()
+    until = now - timedelta(seconds=TRENDING_GRACE_SECONDS)
+    stats = {"likes": 0, "simulations": 0, "pruned": 0}
+
+    since = db.scalar(select(TrendingState.liked_before).where(TrendingState.id == 1))
+    if since is None:
+        # 첫 갱신: TRENDING_MIN_SCORE 아래로 감쇠하지 않은 만큼의 과거부터
+        since = until - timedelta(seconds=_TAU_SECONDS * math.log(1.0 / TRENDING_MIN_SCORE))
+        db.add(TrendingState(id=1, liked_before=until, refreshed_at=now))
+        try:
+            db.flush()
+        except IntegrityError:
+            db.rollback()
+            return stats
+    elif since >= until:
+        return stats
+    else:
+        # 다른 worker 가 같은 구간을 이미 가져갔으면 rowcount 0 (claim_run 과 같은 방식)
+        claimed = db.execute(
+            update(TrendingState)
+            .where(TrendingState.id == 1, TrendingState.liked_before == since)
+            .values(liked_before=until, refreshed_at=now)
+        ).rowcount
+        if not claimed:
+            db.rollback()
+            return stats
+
+    # 구간 끝을 기준으로 더하면 exp 의 인자가 0 이하라 넘치지 않는다
+    shift = decay_exponent(until)
+    sums: Dict[int, float] = {}
+    rows = db.execute(
+        select(SimulationLike.simulation_id, SimulationLike.created_at)
+        .where(SimulationLike.created_at >= since, SimulationLike.created_at < until)
+        .execution_options(yield_per=batch_size)
+    )
+    for simulation_id, created_at in rows:
+        sums[simulation_id] = sums.get(simulation_id, 0.0) + math.exp(decay_exponent(created_at) - shift)
+        stats["likes"] += 1
+
+    simulation_ids = sorted(sums)
+    for start in range(0, len(simulation_ids), batch_size):
+        chunk = simulation_ids[start:start + batch_size]
+        existing = dict(
+            db.execute(
+                select(SimulationTrending.simulation_id, SimulationTrending.score).where(
+                    SimulationTrending.simulation_id.in_(chunk)
+                )
+            ).all()
+        )
+        # 그 사이 지워진 시뮬레이션은 건너뛴다 (외래 키)
+        alive = set(db.scalars(select(Simulation.id).where(Simulation.id.in_(chunk))))
+        updates, inserts = [], []
+        for simulation_id in chunk:
+            if simulation_id not in alive:
+                continue
+            score = shift + math.log(sums[simulation_id])
+            if simulation_id in existing:
+                score = _logaddexp(existing[simulation_id], score)
+                updates.append({"simulation_id": simulation_id, "score": score, "updated_at": now})
+            else:
+                inserts.append({"simulation_id": simulation_id, "score": score, "updated_at": now})
+        if updates:
+            db.execute(update(SimulationTrending), updates)
+        if inserts:
+            db.execute(insert(SimulationTrending), inserts)
+        stats["simulations"] += len(updates) + len(inserts)
+
+    stats["pruned"] = db.execute(
+        delete(SimulationTrending)
+        .where(SimulationTrending.score < shift + math.log(TRENDING_MIN_SCORE))
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.commit()
+    # 같은 프로세스(JOB_WORKER=embedded)의 응답 캐시만, 다른 프로세스는 RESPONSE_CACHE_TTL 안에 반영
+    response_cache.invalidate(list_tag("simulation", "trending"))
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="sort=trending 순위표 갱신")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        stats = refresh_trending(db, batch_size=args.batch_size)
+    finally:
+        db.close()
+    print(
+        f"trending 갱신: 좋아요 {stats['likes']}건, 시뮬레이션 {stats['simulations']}개,"
+        f" 제외 {stats['pruned']}개"
+    )
+
+
+if __name__ == "__main__":
+    main()